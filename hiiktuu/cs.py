@@ -31,9 +31,31 @@
 # -- SearchState class created, so that Solver doesn't have to do double-duty.
 # 2014.05.15
 # -- Search implemented in Solver.
+# 2026.10.17
+# -- Variable and value selection heuristics can be selected by name: first-fail,
+#    dom/wdeg (counting failed constraints), impact-based, and random choices
+#    that are reproducible for a given seed. Values are split in the state's
+#    dstore rather than the root dstore, and states with the same value leave
+#    the search queue in the order they entered it. Heuristics that aren't
+#    given to set_heuristics() go back to the Solver's defaults. The names of
+#    the heuristics are the same as in l3xdg, and a seed always seeds the
+#    'random' heuristics.
+# 2026.10.17
+# -- Depth-first search without cloning dstores (generator(trail=True)):
+#    backtracking undoes the changes recorded on a TrailDStore, optionally
+#    recomputing states from stores saved every few levels. The search loop is
+#    l3xdg.trail.trail_dfs(), shared with l3xdg.
+# 2026.10.17
+# -- Searches can have a time limit (seconds) and a memory limit (megabytes of
+#    growth of the process). When one is exceeded the search stops; the
+#    solutions already generated stand, Solver.budget_hit says which limit was
+#    hit, and Solver.partial is the best incomplete state. Budget is the one in
+#    l3xdg.search.
 
 from .constraint import *
-import queue, random
+from l3xdg.search import Budget
+from l3xdg.trail import trail_dfs
+import queue, random, sys, time
 
 class Solver:
     """A solver for a constraint satisfaction problem, actually a state in the search space."""
@@ -46,8 +68,23 @@ class Solver:
     distributable = 3
     skipped = 4
 
+    # Heuristics that can be selected by name: names of the methods that select
+    # variables and values; the names are the same as those of
+    # l3xdg.solver.Distributor's heuristics.
+    var_heuristics = {'upper': 'select_variable',
+                      'first_fail': 'first_fail_select',
+                      'dom_wdeg': 'domwdeg_select',
+                      'impact': 'impact_select',
+                      'random': 'seeded_var_select'}
+    val_heuristics = {'smallest': 'smallest_select',
+                      'random': 'seeded_select'}
+
+    # Impact assumed for variables that haven't been branched on yet
+    init_impact = 1.0
+
     def __init__(self, constraints, dstore, name='',
-                 description='', verbosity=0):
+                 description='', var_heuristic='upper', val_heuristic='random',
+                 seed=None, verbosity=0):
         self.constraints = constraints
         # Used in solver's printname
         self.description = description
@@ -59,18 +96,61 @@ class Solver:
                                       constraints=constraints,
                                       verbosity=verbosity)
         Solver.id += 1
+        # Whether the last search used up its budget, and its best incomplete state
+        self.budget_hit = None
+        self.partial = None
+        # Heuristics used when set_heuristics() isn't given others
+        self.defaults = (var_heuristic, val_heuristic, seed)
+        self.set_heuristics()
 
     def __repr__(self):
         return "Solver{}".format(self.name)
 
+    def set_heuristics(self, var_heuristic=None, val_heuristic=None, seed=None):
+        """Select the variable and/or value selection heuristics by name, and forget
+        what was learned during earlier searches. seed seeds the choices of the
+        'random' heuristics, so they are reproducible. Heuristics and a seed that
+        aren't given are the ones the Solver was created with, not the ones from
+        an earlier call."""
+        default_var, default_val, default_seed = self.defaults
+        if seed is None:
+            seed = default_seed
+        var_heuristic = var_heuristic or default_var or 'upper'
+        val_heuristic = val_heuristic or default_val or 'random'
+        if var_heuristic not in Solver.var_heuristics:
+            raise ValueError('Unknown variable selection heuristic: {}'.format(var_heuristic))
+        self.var_select = getattr(self, Solver.var_heuristics[var_heuristic])
+        if val_heuristic not in Solver.val_heuristics:
+            raise ValueError('Unknown value selection heuristic: {}'.format(val_heuristic))
+        self.val_select = getattr(self, Solver.val_heuristics[val_heuristic])
+        self.seed = seed
+        # Number of times constraints of each variable have failed
+        self.failures = {}
+        # Running average impact of branching on each variable
+        self.impacts = {}
+        self.random = random.Random(self.seed)
+
     def generator(self, cutoff=100, initial=None,
                   test_verbosity=False, expand_verbosity=False,
-                  tracevar=None):
-        '''A generator for solutions. Uses best-first search.'''
+                  tracevar=None, trail=False, snapshot=0,
+                  time_limit=None, memory_limit=None):
+        '''A generator for solutions. Uses best-first search, or depth-first
+        search in a single TrailDStore if trail is True (see trail_search()).
+        Stops early if time_limit (seconds) or memory_limit (megabytes) is exceeded.'''
         tracevar = tracevar or []
+        if trail:
+            yield from self.trail_search(cutoff=cutoff, initial=initial, snapshot=snapshot,
+                                         test_verbosity=test_verbosity,
+                                         expand_verbosity=expand_verbosity,
+                                         tracevar=tracevar,
+                                         time_limit=time_limit, memory_limit=memory_limit)
+            return
+        budget = self.start_budget(time_limit, memory_limit)
         fringe = queue.PriorityQueue()
         init_state = initial or self.init_state
-        fringe.put((init_state.get_value(), init_state))
+        # States with the same value come out in the order they went in
+        order = 0
+        fringe.put((init_state.get_value(), order, init_state))
         n = 0
         solutions = []
         ambiguity = False
@@ -85,19 +165,96 @@ class Solver:
                 print('>>>> SEARCH STATE {} <<<<'.format(n+1))
             if n >= cutoff:
                 print('STOPPING AT CUTOFF')
-            priority, state = fringe.get()
+            if self.over_budget(budget):
+                break
+            priority, o, state = fringe.get()
             # Goal test for this state
-            state.run(verbosity=test_verbosity, tracevar=tracevar)
+            state.run(verbosity=test_verbosity, tracevar=tracevar, deadline=budget.deadline)
+            self.observe(state)
             if state.status == SearchState.succeeded:
                 # Return this state
                 yield state
             # Expand to next states if distributable
             if state.status == SearchState.distributable:
+                self.note_partial(state)
                 for attribs, next_state in self.distribute(state=state, verbosity=expand_verbosity):
                     val = next_state.get_value()
                     # Add next state where it belongs in the queue
-                    fringe.put((val, next_state))
+                    order += 1
+                    fringe.put((val, order, next_state))
             n += 1
+        self.end_budget(budget)
+        if test_verbosity or expand_verbosity:
+            print()
+            print('>>>> HALTED AT SEARCH STATE', n, '<<<<')
+
+    def start_budget(self, time_limit=None, memory_limit=None):
+        """Start the clock for a search."""
+        self.budget_hit = None
+        self.partial = None
+        return Budget(time_limit, memory_limit)
+
+    def over_budget(self, budget):
+        """Whether the search has to stop because its budget is used up."""
+        hit = budget.exceeded()
+        if hit:
+            self.budget_hit = hit
+        return hit
+
+    def end_budget(self, budget):
+        """States may have been skipped because the deadline passed while they
+        were running, so the budget counts as used up if the search ended late."""
+        if not self.budget_hit:
+            self.over_budget(budget)
+        if self.budget_hit and self.verbosity:
+            print('Search budget ({}) used up for {}'.format(self.budget_hit, self))
+
+    def note_partial(self, state):
+        """Remember state if it's the best incomplete state so far."""
+        if self.partial is None or state.get_value() < self.partial.get_value():
+            self.partial = state
+
+    def trail_search(self, cutoff=100, initial=None, snapshot=0,
+                     test_verbosity=False, expand_verbosity=False,
+                     tracevar=None, time_limit=None, memory_limit=None):
+        '''A generator for solutions (states with snapshots of the store) using
+        depth-first search in a single TrailDStore. Only the current path is kept:
+        for each level, the state and the constraint used to distribute, and for
+        each untried alternative, the position on the trail to return to. If
+        snapshot is n > 0, the store is saved every n levels and the trail is
+        cleared; backtracking above the latest saved store restores the nearest
+        one and recomputes the states below it.'''
+        tracevar = tracevar or []
+        init_state = initial or self.init_state
+        dstore = TrailDStore(name=self.name+'T', level=init_state.dstore.level+1,
+                             problem=init_state.dstore.problem, parent=init_state.dstore)
+        state = SearchState(solver=self, name=init_state.name, dstore=dstore,
+                            constraints=init_state.constraints, depth=0,
+                            verbosity=self.verbosity)
+        budget = self.start_budget(time_limit, memory_limit)
+
+        def examine(state):
+            state.run(verbosity=test_verbosity, tracevar=tracevar, deadline=budget.deadline)
+            self.observe(state)
+            if state.status == SearchState.succeeded:
+                return state.trail_copy(), False
+            if state.status == SearchState.distributable:
+                if self.partial is None or state.get_value() < self.partial.get_value():
+                    # Keep a copy; the state itself is going to change
+                    self.partial = state.trail_copy()
+                return None, True
+            return None, False
+
+        def select(dstore):
+            var = self.var_select(dstore.ess_undet, dstore=dstore, verbosity=expand_verbosity)
+            constraint1, constraint2 = self.select_constraints(var, dstore=dstore,
+                                                               verbosity=expand_verbosity)
+            return var, constraint1, constraint2
+
+        n = yield from trail_dfs(state, examine, select, cutoff, snapshot=snapshot,
+                                 snap_name=self.name+'T{}', tracevar=tracevar,
+                                 stop=lambda: self.over_budget(budget))
+        self.end_budget(budget)
         if test_verbosity or expand_verbosity:
             print()
             print('>>>> HALTED AT SEARCH STATE', n, '<<<<')
@@ -105,7 +262,54 @@ class Solver:
     def select_variable(self, variables, dstore=None, verbosity=0):
         """One possibility for selecting variables to branch on:
         prefer larger upper domains."""
-        return sorted(variables, key=lambda v: len(v.get_upper(dstore=dstore)))[0]
+        return min(variables, key=lambda v: len(v.get_upper(dstore=dstore)))
+
+    @staticmethod
+    def n_undecided(var, dstore):
+        """Number of undecided values, with variables that have none last."""
+        n = len(var.get_undecided(dstore=dstore))
+        return n or sys.maxsize
+
+    def first_fail_select(self, variables, dstore=None, verbosity=0):
+        """Prefer variables with fewer undecided values."""
+        return min(variables, key=lambda v: Solver.n_undecided(v, dstore))
+
+    def domwdeg_select(self, variables, dstore=None, verbosity=0):
+        """Prefer variables with a small ratio of undecided values to degree, where
+        each failure of one of the variable's constraints counts as another constraint."""
+        failures = self.failures
+        return min(variables,
+                   key=lambda v: Solver.n_undecided(v, dstore) / (len(v.constraints) + failures.get(v, 0) or 1))
+
+    def impact_select(self, variables, dstore=None, verbosity=0):
+        """Prefer variables whose distribution has reduced the search space the most
+        on average, then those with fewer undecided values."""
+        impacts = self.impacts
+        init = Solver.init_impact
+        return min(variables, key=lambda v: (-impacts.get(v, init), Solver.n_undecided(v, dstore)))
+
+    def seeded_var_select(self, variables, dstore=None, verbosity=0):
+        """Select a random variable, the same one for the same seed and variables."""
+        return self.random.choice(sorted(variables, key=repr))
+
+    def observe(self, state):
+        """Learn from a state that has just been run: count the constraints that
+        failed in it and, for impact-based selection, record how much the
+        distribution step that created it reduced the search space."""
+        failures = self.failures
+        for constraint in state.failed:
+            for var in constraint.variables:
+                failures[var] = failures.get(var, 0) + 1
+        parent = state.parent
+        if parent and state.branch_var is not None and self.var_select == self.impact_select:
+            if state.status == SearchState.failed:
+                impact = 1.0
+            else:
+                before = parent.get_size()
+                impact = 1.0 - state.get_size() / before if before else 0.0
+            var = state.branch_var
+            old = self.impacts.get(var)
+            self.impacts[var] = impact if old is None else (old + impact) / 2
 
     def split_var_values(self, variable, dstore=None, verbosity=0):
         """For a selected variable, select a value by calling the value selection function,
@@ -115,15 +319,10 @@ class Solver:
         # Split undecided into two non-empty subsets
         if not undecided:
             print("SOMETHING WRONG; {} HAS NO UNDECIDED VALUES".format(variable))
-        elem = Solver.ran_select(undecided)
+        elem = self.val_select(undecided)
         return {elem}, undecided - {elem}
         
-    ## Two variable value selection functions.
-
-    @staticmethod
-    def ran_select(values):
-        """Randomly select a value from a set of values."""
-        return random.choice(list(values))
+    ## Variable value selection functions.
 
     @staticmethod
     def smallest_select(values):
@@ -132,9 +331,14 @@ class Solver:
         value_list.sort()
         return value_list[0]
 
+    def seeded_select(self, values):
+        """Randomly select a value, the same one for the same seed and values
+        (a different one each time if there's no seed)."""
+        return self.random.choice(sorted(values, key=repr))
+
     def select_constraints(self, variable, dstore=None, verbosity=0):
         """Return a pair of constraints for the selected variable."""
-        subset1, subset2 = self.split_var_values(variable, verbosity=verbosity)
+        subset1, subset2 = self.split_var_values(variable, dstore=dstore, verbosity=verbosity)
         if isinstance(variable, IVar):
             if verbosity:
                 print(' values: {}, {}'.format(subset1, subset2))
@@ -163,7 +367,7 @@ class Solver:
             if ndet > 5:
                 print('...')
         # Select a variable and two disjoint basic constraints on it
-        var = self.select_variable(undet, dstore=state.dstore, verbosity=verbosity)
+        var = self.var_select(undet, dstore=state.dstore, verbosity=verbosity)
         constraint1, constraint2 = self.select_constraints(var, dstore=state.dstore,
                                                            verbosity=verbosity)
         if verbosity:
@@ -176,11 +380,11 @@ class Solver:
         # Create a new Solver for each dstore, preserving the accumulateod penalty
         state1 = SearchState(constraints=constraints, dstore=new_dstore1,
                              name=state.name+'a', depth=state.depth+1,
-                             parent=state,
+                             parent=state, branch_var=var,
                              verbosity=verbosity)
         state2 = SearchState(constraints=constraints, dstore=new_dstore2,
                              name=state.name+'b', depth=state.depth+1,
-                             parent=state,
+                             parent=state, branch_var=var,
                              verbosity=verbosity)
         state.children.extend([state, state2])
         return [((var, constraint2), state2), ((var, constraint1), state1)]
@@ -194,7 +398,7 @@ class SearchState:
     skipped = 4
 
     def __init__(self, solver=None, name='', dstore=None,
-                 constraints=None, parent=None,
+                 constraints=None, parent=None, branch_var=None,
                  depth=0, verbosity=0):
         self.solver = solver                                  
         self.name = name
@@ -203,6 +407,10 @@ class SearchState:
         self.failed = []
         self.constraints = constraints
         self.parent = parent
+        # Variable distributed on to create this state
+        self.branch_var = branch_var
+        # Size of the search space, computed when needed
+        self.size = None
         self.children = []
         self.depth = depth
         self.status = SearchState.running
@@ -216,8 +424,38 @@ class SearchState:
         essential variables there are."""
         return len(self.dstore.ess_undet)
 
+    def get_size(self):
+        """A measure of the size of the remaining search space: the number of
+        undecided values of the undetermined variables."""
+        if self.size is None:
+            dstore = self.dstore
+            self.size = sum(len(v.get_undecided(dstore=dstore)) for v in dstore.undetermined)
+        return self.size
+
+    def trail_child(self, var, constraint, suffix):
+        """Apply a distribution constraint to this state's TrailDStore in place,
+        returning the state for the result."""
+        dstore = self.dstore
+        # Needed for impact-based distribution, before the store changes
+        self.get_size()
+        constraint.infer(dstore=dstore, verbosity=0, tracevar=[])
+        for v in constraint.variables:
+            v.determined(dstore=dstore, verbosity=0)
+        return SearchState(solver=self.solver, constraints=var.constraints[:], dstore=dstore,
+                           name=self.name+suffix, depth=self.depth+1,
+                           parent=self, branch_var=var, verbosity=self.verbosity)
+
+    def trail_copy(self):
+        """A copy of this state with a snapshot of its TrailDStore."""
+        copy = SearchState(solver=self.solver, name=self.name, depth=self.depth,
+                           dstore=self.dstore.snapshot(name=self.name),
+                           constraints=self.constraints, verbosity=self.verbosity)
+        copy.status = self.status
+        return copy
+
     def exit(self, result, verbosity=0):
         if result == Constraint.failed:
+            self.status = SearchState.failed
             return True
         else:
             return self.fixed_point(result, verbosity=verbosity)
@@ -237,14 +475,20 @@ class SearchState:
         # Keep propagating
         return False
 
-    def run(self, verbosity=0, tracevar=[]):
-        """Run the constraints until CS fails or a fixed point is reached."""
+    def run(self, verbosity=0, tracevar=[], deadline=None):
+        """Run the constraints until CS fails or a fixed point is reached,
+        or until the deadline (a time.time()) passes."""
         if verbosity:
             s = "Running {} with {}|{} undetermined variables, {} constraints"
             print(s.format(self, len(self.dstore.ess_undet), len(self.dstore.undetermined), len(self.constraints)))
         awaken = set(self.constraints)
         it = 0
         while not self.exit(awaken, verbosity=verbosity):
+            if deadline and time.time() > deadline:
+                if verbosity:
+                    print("Deadline passed in {}".format(self))
+                self.status = SearchState.skipped
+                return
             if verbosity:
                 print("Running iteration {}".format(it))
             awaken = self.run_constraints(awaken, verbosity=verbosity, tracevar=tracevar)
@@ -266,6 +510,7 @@ class SearchState:
             if state == Constraint.failed:
                 if verbosity:
                     print("FAILED {}".format(constraint))
+                self.failed.append(constraint)
                 return Constraint.failed
 
             # Check whether any of the changed vars cannot possibly be determined; if so,
@@ -276,6 +521,7 @@ class SearchState:
                 except VarError:
                     if verbosity:
                         print("{} CAN'T BE DETERMINED, SO {} MUST FAIL".format(var, constraint))
+                    self.failed.append(constraint)
                     return Constraint.failed
 
             for var in changed_vars:
@@ -66,6 +66,15 @@
 # -- all_sols argument to solve() and other methods that search finds all
 #    solutions without querying user.
 # -- Alignments is inferred from lexicon if not explicit.
+# 2026.10.17
+# -- solve() can select the solver's variable and value heuristics by name
+#    and seed its random choices.
+# 2026.10.17
+# -- solve() takes a time_limit (seconds) and memory_limit (megabytes); when one
+#    is exceeded, the solutions found so far stand and budget_hit says which.
+# 2026.10.17
+# -- solve(interactive=False) never prompts for more analyses, translations,
+#    or realizations; with all_sols=False only the first of each is made.
 
 import itertools, copy
 from .ui import *
@@ -111,6 +120,8 @@ class Sentence:
                              description='group selection', verbosity=verbosity)
         # Solutions found during parsing
         self.solutions = []
+        # Whether solve() used up its time or memory budget
+        self.budget_hit = None
         if verbosity:
             print("Created Sentence object {}".format(self))
 
@@ -156,10 +167,21 @@ class Sentence:
             self.create_constraints(verbosity=verbosity)
             return True
 
-    def solve(self, translate=True, all_sols=False, verbosity=0):
-        """Generate solutions and translations."""
+    def solve(self, translate=True, all_sols=False, verbosity=0,
+              var_heuristic=None, val_heuristic=None, seed=None,
+              time_limit=None, memory_limit=None, interactive=True):
+        """Generate solutions and translations. var_heuristic and val_heuristic
+        name the heuristics in Solver.var_heuristics and Solver.val_heuristics;
+        seed makes the choice of values random but reproducible. If the search
+        exceeds time_limit (seconds) or memory_limit (megabytes), it stops and
+        self.budget_hit is 'time' or 'memory'. If all_sols is False and interactive
+        is False, only the first analysis, translation, and realization are made,
+        without asking whether to search for more."""
+        self.solver.set_heuristics(var_heuristic=var_heuristic, val_heuristic=val_heuristic,
+                                   seed=seed)
         generator = self.solver.generator(test_verbosity=verbosity,
-                                          expand_verbosity=verbosity)
+                                          expand_verbosity=verbosity,
+                                          time_limit=time_limit, memory_limit=memory_limit)
         try:
             proceed = True
             while proceed:
@@ -168,17 +190,21 @@ class Sentence:
                 if verbosity:
                     print('FOUND ANALYSIS', solution)
                 if translate:
-                    solution.translate(verbosity=verbosity, all_sols=all_sols)
+                    solution.translate(verbosity=verbosity, all_sols=all_sols,
+                                       interactive=interactive)
                 else:
                     # Display the parse
                     self.display()
                 if all_sols:
                     continue
-                if not input('SEARCH FOR ANOTHER ANALYSIS? [yes/NO] '):
+                if not interactive or not input('SEARCH FOR ANOTHER ANALYSIS? [yes/NO] '):
                     proceed = False
         except StopIteration:
             if verbosity:
                 print('No more solutions')
+        self.budget_hit = self.solver.budget_hit
+        if self.budget_hit:
+            print("SEARCH BUDGET ({}) USED UP for {}".format(self.budget_hit, self))
         if not self.solutions:
             print("NO SOLUTIONS FOUND for {}".format(self))
 
@@ -1014,14 +1040,16 @@ class Solution:
         for g in self.ginsts:
             g.display(word_width=word_width, s2gnodes=self.s2gnodes)
 
-    def translate(self, verbosity=0, all_sols=False):
+    def translate(self, verbosity=0, all_sols=False, interactive=True):
         """Do everything you need to create the translation."""
         self.merge_nodes(verbosity=verbosity)
         for ginst in self.ginsts:
             ginst.set_translations(verbosity=verbosity)
-        self.make_translations(verbosity=verbosity, all_sols=all_sols)
+        self.make_translations(verbosity=verbosity, all_sols=all_sols,
+                               interactive=interactive)
 
-    def make_translations(self, verbosity=0, display=True, all_sols=False):
+    def make_translations(self, verbosity=0, display=True, all_sols=False,
+                          interactive=True):
         """Combine GInsts for each translation in translation products, and
         separate gnodes into a dict for each translation."""
         if verbosity:
@@ -1030,13 +1058,14 @@ class Solution:
         for index, translation in enumerate(translations):
             t = Translation(self, translation, index, trees=copy.deepcopy(self.trees), verbosity=verbosity)
             t.initialize(verbosity=verbosity)
-            t.realize(verbosity=verbosity, display=display, all_sols=all_sols)
+            t.realize(verbosity=verbosity, display=display, all_sols=all_sols,
+                      interactive=interactive)
 #            if display:
 #                t.display_all()
             self.translations.append(t)
             if all_sols:
                 continue
-            if not input('SEARCH FOR ANOTHER TRANSLATION FOR THIS ANALYSIS? [yes/NO] '):
+            if not interactive or not input('SEARCH FOR ANOTHER TRANSLATION FOR THIS ANALYSIS? [yes/NO] '):
                 return
         if verbosity:
             print("No more translations for analysis")
@@ -1411,7 +1440,7 @@ class Translation:
 #        for c in self.constraints:
 #            print(c)
 
-    def realize(self, verbosity=0, display=True, all_sols=False):
+    def realize(self, verbosity=0, display=True, all_sols=False, interactive=True):
         """Run constraint satisfaction on the order and disjunction constraints,
         and convert variable values to sentence positions."""
         generator = self.solver.generator(test_verbosity=verbosity,
@@ -1431,7 +1460,7 @@ class Translation:
                     print('FOUND REALIZATION {}'.format(self.outputs[-1]))
                 if all_sols:
                     continue
-                if not input('SEARCH FOR ANOTHER REALIZATION FOR TRANSLATION? [yes/NO] '):
+                if not interactive or not input('SEARCH FOR ANOTHER REALIZATION FOR TRANSLATION? [yes/NO] '):
                     proceed = False
         except StopIteration:
             if verbosity:
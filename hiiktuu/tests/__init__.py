@@ -0,0 +1,5 @@
+# just the test suites.
+
+import unittest
+
+__all__ = ['testcs']
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+#   This file is part of the HLTDI L^3 project
+#   for parsing, generation, translation, and computer-assisted
+#   human translation.
+#
+#   Copyright (C) 2026, HLTDI <gasser@cs.indiana.edu>
+#
+#   This program is free software: you can redistribute it and/or
+#   modify it under the terms of the GNU General Public License as
+#   published by the Free Software Foundation, either version 3 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import unittest, io, contextlib
+from .. sentence import *
+from .. cs import Solver
+from l3xdg.solver import Distributor
+from .. language import Language
+
+### Constraint satisfaction for English sentences with Spanish as target.
+
+SENTENCE = 'John kicked the bucket'
+
+LANGUAGES = []
+
+def sentence(raw=SENTENCE):
+    """An initialized Sentence for raw."""
+    if not LANGUAGES:
+        LANGUAGES.extend(Language.load('eng', 'spa'))
+    eng, spa = LANGUAGES
+    s = Sentence(raw=raw, language=eng, target=spa, verbosity=0)
+    s.initialize(verbosity=0)
+    return s
+
+def analyses(s, **options):
+    """The groups and gnodes of each analysis found by solving s."""
+    start = len(s.solutions)
+    # solve() displays each analysis
+    with contextlib.redirect_stdout(io.StringIO()):
+        s.solve(translate=False, all_sols=True, **options)
+    return [(sorted(g.index for g in sol.ginsts), sol.s2gnodes) for sol in s.solutions[start:]]
+
+class TestHeuristics(unittest.TestCase):
+
+    def test_options(self):
+        """Other heuristics find the same analyses."""
+        expected = sorted(analyses(sentence()))
+        self.assertNotEqual(len(expected), 0)
+        for var_heuristic in Solver.var_heuristics:
+            found = analyses(sentence(), var_heuristic=var_heuristic, seed=2)
+            self.assertEqual(sorted(found), expected)
+
+    def test_defaults_restored(self):
+        """Heuristics given to one solve() aren't used by the next one."""
+        s = sentence()
+        solver = s.solver
+        default = (solver.var_select, solver.val_select, solver.seed)
+        analyses(s, var_heuristic='dom_wdeg', seed=5)
+        self.assertEqual(solver.var_select, solver.domwdeg_select)
+        self.assertEqual(solver.seed, 5)
+        analyses(s)
+        self.assertEqual((solver.var_select, solver.val_select, solver.seed), default)
+
+    def test_names(self):
+        """The heuristics have the same names as l3xdg's."""
+        self.assertEqual(set(Solver.var_heuristics), set(Distributor.var_heuristics))
+        self.assertEqual(set(Solver.val_heuristics), set(Distributor.val_heuristics))
+
+    def test_seed(self):
+        """A seed the Solver is created with makes its random choices reproducible."""
+        s = sentence()
+        solver = Solver(s.solver.constraints, s.dstore, seed=5)
+        self.assertEqual(solver.val_select, solver.seeded_select)
+        values = set(range(20))
+        chosen = [solver.val_select(values) for i in range(5)]
+        solver.set_heuristics()
+        self.assertEqual([solver.val_select(values) for i in range(5)], chosen)
+        other = Solver(s.solver.constraints, s.dstore, seed=5, var_heuristic='random')
+        self.assertEqual([other.val_select(values) for i in range(5)], chosen)
+
+class TestBudget(unittest.TestCase):
+
+    def test_time_limit(self):
+        expected = sorted(analyses(sentence()))
+        s = sentence()
+        found = analyses(s, time_limit=0.000001)
+        self.assertEqual(s.budget_hit, 'time')
+        self.assertLess(len(found), len(expected))
+        found = analyses(s)
+        self.assertIsNone(s.budget_hit)
+        self.assertEqual(sorted(found), expected)
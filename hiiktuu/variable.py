@@ -31,6 +31,13 @@
 # 2014.05.04-5
 # -- List variables; needed so they can include non-hashable elements,
 #    in particular, dicts and Features objects: LVar, DetLVar
+# 2026.10.17
+# -- TrailDStore: a single store for depth-first search that records changes
+#    on a trail so they can be undone on backtracking (as in l3xdg).
+# 2026.10.17
+# -- TrailDStore shares its trail code with l3xdg (l3xdg/trail.py).
+
+from l3xdg.trail import Trail
 
 # Maximum number of values for a variable.
 MAX = 200
@@ -41,6 +48,9 @@ class DStore:
     """Domain store holding domains for variables. (Really the domains are held in
     dicts kept by the variables.)"""
 
+    # Changes to undo on backtracking (see TrailDStore)
+    trail = None
+
     def __init__(self, name='', level=0, problem=None, parent=None):
         """This store is a strengthening of parent store if there is one."""
         self.problem = problem
@@ -85,6 +95,18 @@ class DStore:
             var.determined(dstore=new_store, verbosity=0)
         return new_store
 
+class TrailDStore(Trail, DStore):
+    """Domain store that search changes in place, recording each change on a
+    trail so that it can be undone back to a mark on backtracking (see
+    l3xdg/trail.py)."""
+
+    store_class = DStore
+    trail_lists = ('undetermined', 'ess_undet')
+
+    def __init__(self, name='', level=0, problem=None, parent=None):
+        DStore.__init__(self, name=name, level=level, problem=problem, parent=parent)
+        self.init_trail(parent)
+
 DS0 = DStore(name='top')
 
 class Var:
@@ -175,6 +197,8 @@ class Var:
         if dsdict == None:
             dsdict = {'value': None}
             self.dstores[dstore] = dsdict
+        if dstore.trail is not None:
+            dstore.record(self, dsdict, feature)
         dsdict[feature] = value
 
     def set_value(self, value, dstore=None):
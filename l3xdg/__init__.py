@@ -3,6 +3,7 @@
 
 __all__ = ['xdg', 'solver', 'language', 'lex', 'search', 'constraint', 'variable',
            'dimension', 'node', 'graph', 'crosslex', 'projector', 'tdict', 'utils',
-           'disambig', 'graphics', 'corpus']
+           'disambig', 'graphics', 'corpus', 'bitset', 'analcache', 'lexsnapshot',
+           'artifacts', 'server']
 
 from .corpus import *
@@ -0,0 +1,290 @@
+########################################################################
+#
+#   This file is part of the HLTDI L^3 project
+#       for parsing, generation, and translation within the
+#       framework of  Extensible Dependency Grammar.
+#
+#   Copyright (C) 2026
+#   The HLTDI L^3 Team <gasser@cs.indiana.edu>
+#
+#   This program is free software: you can redistribute it and/or
+#   modify it under the terms of the GNU General Public License as
+#   published by the Free Software Foundation, either version 3 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# 2026.10.17
+# -- Created.
+#    Persistent cache of morphological analyses (the output of
+#    Language.anal_word()), stored in an sqlite database so that it
+#    survives between runs and can be shared by several processes.
+#    Entries are keyed by language, a hash of the morphology's FST and
+#    lexicon files, word form, and analysis flags, so changing any of the
+#    files makes old entries unreachable; they are deleted when the cache
+#    is next opened.
+# -- The close() function is registered with atexit once for each cache,
+#    not each time it connects. If max_entries is set, the memo of decoded
+#    analyses holds at most max_entries of them, and trim() empties it.
+# -- trim() only deletes entries of the cache's own language.
+
+import os, time, json, hashlib, sqlite3, atexit
+from .morphology.fs import FeatStruct, FeatStructParser
+
+class AnalCache:
+    """sqlite database of word analyses for one language."""
+
+    # Change this when the format of stored analyses changes
+    version = 1
+
+    # Extensions of files that the analyses depend on
+    source_ext = ('.fst', '.cas', '.lex')
+
+    # Flags for analysis options
+    GUESS = 1
+    SIMPLIFIED = 2
+    POSTPROC = 4
+
+    def __init__(self, language, path=None, max_entries=0, batch=200):
+        """language is a Language with its morphology loaded. If max_entries
+        is not 0, trim() removes the least recently used entries beyond this
+        number, and at most this many decoded analyses are kept in memory.
+        Writes are committed batch at a time."""
+        self.lang = language.abbrev
+        self.path = path or os.path.join(language.get_dir(), 'anal_cache.db')
+        morphology = language.morphology
+        self.dirs = [morphology.directory, morphology.get_lex_dir()]
+        self.build = AnalCache.build_hash(self.dirs)
+        self.max_entries = max_entries
+        self.batch = batch
+        # Whether close() has been registered to run at exit
+        self.registered = False
+        self.reset()
+
+    def __repr__(self):
+        return 'AnalCache({}:{})'.format(self.lang, self.path)
+
+    def reset(self):
+        # Connections can't be shared by processes, so record whose this is
+        self.conn = None
+        self.pid = None
+        # Decoded analyses, by (form, flags)
+        self.memo = {}
+        # Rows waiting to be written and forms whose use time is to be updated
+        self.pending = []
+        self.touched = set()
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # Pickled with a Language; the connection and memo aren't saved
+        return {'lang': self.lang, 'path': self.path, 'dirs': self.dirs,
+                'build': self.build, 'max_entries': self.max_entries,
+                'batch': self.batch}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.registered = False
+        self.reset()
+
+    @staticmethod
+    def build_hash(dirs):
+        """A hash of the names, sizes, and modification times of the files
+        in dirs that analyses depend on."""
+        h = hashlib.sha1()
+        for d in dirs:
+            if not os.path.isdir(d):
+                continue
+            for name in sorted(os.listdir(d)):
+                if not name.endswith(AnalCache.source_ext):
+                    continue
+                st = os.stat(os.path.join(d, name))
+                h.update('{}:{}:{};'.format(name, st.st_size, st.st_mtime_ns).encode())
+        return h.hexdigest()
+
+    @staticmethod
+    def flags(guess=False, simplified=False, postproc=False):
+        return ((AnalCache.GUESS if guess else 0) |
+                (AnalCache.SIMPLIFIED if simplified else 0) |
+                (AnalCache.POSTPROC if postproc else 0))
+
+    ## Connection
+
+    def connect(self):
+        """The connection for this process, opening the database if necessary."""
+        if self.conn and self.pid == os.getpid():
+            return self.conn
+        if self.conn:
+            # Inherited from the parent process; start over
+            self.reset()
+        conn = sqlite3.connect(self.path, timeout=60)
+        # Let readers and a writer in other processes proceed together
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        row = conn.execute("SELECT value FROM meta WHERE key='version'").fetchone()
+        if not row or int(row[0]) != AnalCache.version:
+            conn.execute('DROP TABLE IF EXISTS anal')
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)",
+                         (str(AnalCache.version),))
+        conn.execute('''CREATE TABLE IF NOT EXISTS anal
+                        (lang TEXT, build TEXT, form TEXT, flags INTEGER,
+                         anals TEXT, used REAL,
+                         PRIMARY KEY (lang, build, form, flags))''')
+        conn.execute('CREATE INDEX IF NOT EXISTS anal_used ON anal (used)')
+        # Entries for earlier versions of this language's files
+        conn.execute('DELETE FROM anal WHERE lang=? AND build!=?', (self.lang, self.build))
+        conn.commit()
+        self.conn = conn
+        self.pid = os.getpid()
+        if not self.registered:
+            # A forked process inherits this, and close() closes its connection
+            atexit.register(self.close)
+            self.registered = True
+        return conn
+
+    def close(self):
+        """Write pending changes, trim, and close the database."""
+        if not self.conn or self.pid != os.getpid():
+            return
+        self.commit()
+        if self.max_entries:
+            self.trim()
+        self.conn.close()
+        self.conn = None
+
+    def commit(self):
+        """Write pending entries and use times."""
+        if not self.pending and not self.touched:
+            return
+        conn = self.connect()
+        now = time.time()
+        with conn:
+            conn.executemany('INSERT OR REPLACE INTO anal VALUES (?, ?, ?, ?, ?, ?)',
+                             [(self.lang, self.build, form, flags, anals, now)
+                              for form, flags, anals in self.pending])
+            conn.executemany('UPDATE anal SET used=? WHERE lang=? AND build=? AND form=? AND flags=?',
+                             [(now, self.lang, self.build, form, flags)
+                              for form, flags in self.touched])
+        self.pending = []
+        self.touched.clear()
+
+    def trim(self, max_entries=0):
+        """Delete all but the max_entries most recently used entries of this
+        language; other languages' entries in the same file are kept."""
+        max_entries = max_entries or self.max_entries
+        if not max_entries:
+            return 0
+        self.commit()
+        conn = self.connect()
+        with conn:
+            cur = conn.execute('''DELETE FROM anal WHERE rowid IN
+                                  (SELECT rowid FROM anal WHERE lang=? ORDER BY used DESC
+                                   LIMIT -1 OFFSET ?)''', (self.lang, max_entries))
+        self.memo.clear()
+        return cur.rowcount
+
+    def clear(self):
+        """Delete all of this language's entries."""
+        conn = self.connect()
+        with conn:
+            conn.execute('DELETE FROM anal WHERE lang=?', (self.lang,))
+        self.memo.clear()
+        self.pending = []
+        self.touched.clear()
+
+    def __len__(self):
+        self.commit()
+        return self.connect().execute('SELECT COUNT(*) FROM anal WHERE lang=? AND build=?',
+                                      (self.lang, self.build)).fetchone()[0]
+
+    ## Encoding of analyses: (pos, root, citation, FeatStruct) tuples
+
+    @staticmethod
+    def encode(analyses):
+        """A string representing analyses, or None if they can't be stored."""
+        for a in analyses:
+            if not isinstance(a[3], FeatStruct):
+                return None
+        return json.dumps([[a[0], a[1], a[2], a[3].__repr__()] for a in analyses],
+                          ensure_ascii=False)
+
+    @staticmethod
+    def decode(string):
+        parser = FeatStructParser()
+        analyses = []
+        for pos, root, cite, fs in json.loads(string):
+            fs = parser.parse(fs)
+            fs.freeze()
+            analyses.append((pos, root, cite, fs))
+        return analyses
+
+    ## Lookup
+
+    def get(self, form, flags=0):
+        """Stored analyses of form, or None if there are none."""
+        key = (form, flags)
+        analyses = self.memo.get(key)
+        if analyses is not None:
+            self.hits += 1
+            return analyses
+        row = self.connect().execute('SELECT anals FROM anal WHERE lang=? AND build=? AND form=? AND flags=?',
+                                     (self.lang, self.build, form, flags)).fetchone()
+        if not row:
+            self.misses += 1
+            return None
+        self.hits += 1
+        analyses = AnalCache.decode(row[0])
+        self.remember(key, analyses)
+        self.touched.add(key)
+        if len(self.touched) >= self.batch:
+            self.commit()
+        return analyses
+
+    def put(self, form, flags, analyses):
+        """Store the analyses of form."""
+        string = AnalCache.encode(analyses)
+        if string is None:
+            return
+        self.remember((form, flags), analyses)
+        self.pending.append((form, flags, string))
+        if len(self.pending) >= self.batch:
+            self.commit()
+
+    def remember(self, key, analyses):
+        """Keep decoded analyses in the memo, forgetting the earliest ones
+        if it would have more than max_entries."""
+        memo = self.memo
+        if self.max_entries:
+            while len(memo) >= self.max_entries:
+                del memo[next(iter(memo))]
+        memo[key] = analyses
+
+    def preload(self, forms, flags=0, analyze=None):
+        """Read the stored analyses of forms into memory. If analyze is a
+        function of a form, analyze and store the forms that aren't found.
+        Returns the forms that weren't found."""
+        conn = self.connect()
+        forms = [f for f in set(forms) if (f, flags) not in self.memo]
+        found = set()
+        # Stay within sqlite's limit on query parameters
+        for start in range(0, len(forms), 500):
+            chunk = forms[start:start+500]
+            query = 'SELECT form, anals FROM anal WHERE lang=? AND build=? AND flags=? AND form IN ({})'
+            for form, string in conn.execute(query.format(','.join('?' * len(chunk))),
+                                             [self.lang, self.build, flags] + chunk):
+                self.remember((form, flags), AnalCache.decode(string))
+                self.touched.add((form, flags))
+                found.add(form)
+        missing = [f for f in forms if f not in found]
+        if analyze:
+            for form in missing:
+                self.put(form, flags, analyze(form))
+        self.commit()
+        return missing
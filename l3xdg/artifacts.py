@@ -0,0 +1,225 @@
+########################################################################
+#
+#   This file is part of the HLTDI L^3 project
+#       for parsing, generation, and translation within the
+#       framework of  Extensible Dependency Grammar.
+#
+#   Copyright (C) 2026
+#   The HLTDI L^3 Team <gasser@cs.indiana.edu>
+#
+#   This program is free software: you can redistribute it and/or
+#   modify it under the terms of the GNU General Public License as
+#   published by the Free Software Foundation, either version 3 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# 2026.10.17
+# -- Created.
+#    Cache of the things built from a language's data files: pickled
+#    Language objects (without their lexicons), pickled Lexicons, lexicon
+#    snapshots, and compiled binary FSTs. They are kept in a cache
+#    directory (ArtifactCache.directory, L3_CACHE_DIR in the environment)
+#    instead of next to the data files, with a subdirectory for each
+#    language and grammar. Artifacts are named by a hash of the contents
+#    of all of the files they're made from, so changing any of the files
+#    makes the old ones unreachable; they're deleted when new ones are
+#    written. Writes go to a temporary file that is renamed into place,
+#    and lock() lets one of several processes starting at once build an
+#    artifact while the others wait for it.
+# -- The cache directory is only used if L3_CACHE_DIR is set or
+#    set_directory() is called; otherwise artifacts are kept in the
+#    language directories and binary FSTs next to their .fst files.
+#    Artifacts are named by a hash of the names, sizes, and modification
+#    times of the files (as in AnalCache) rather than their contents, and
+#    by a hash of the language directory, so that prune() only deletes
+#    versions made from the same directory and checkouts sharing a cache
+#    directory keep their own artifacts.
+# 2026.10.18
+# -- Artifacts are named by a hash of the contents of the files again,
+#    made by hash_files(), which LexSnapshot.source_hash() uses too.
+
+import os, pickle, hashlib, tempfile, contextlib
+try:
+    import fcntl
+except ImportError:
+    # No file locking; processes starting together may all build artifacts
+    fcntl = None
+from .morphology.fst import FST, LANGUAGE_DIR
+
+class ArtifactCache:
+    """Files built from language data, keyed by the contents of the data."""
+
+    # Change this when the way artifacts are made changes
+    version = 1
+
+    # Where artifacts are kept; if None, in the language directories
+    directory = os.environ.get('L3_CACHE_DIR') or None
+    # The cache directory used by set_directory() if none is given
+    default_directory = os.path.join(os.path.expanduser('~'), '.cache', 'l3')
+
+    # Files in language directories that languages and lexicons are made from
+    source_ext = ('.yaml', '.py', '.lex', '.gr', '.tok', '.inst', '.cls')
+    # Modules defining the classes of pickled objects
+    source_modules = ('language.py', 'lexicon.py', 'lex.py', 'crosslex.py',
+                      'dimension.py', 'tdict.py', 'morphology/morphology.py')
+
+    EXT = '.pkl'
+
+    @staticmethod
+    def set_directory(directory=default_directory):
+        """Keep artifacts in directory; compiled binary FSTs go in its fst
+        subdirectory. If directory is None, artifacts are kept in the language
+        directories and FSTs are compiled next to their .fst files, as they
+        were before there was a cache."""
+        ArtifactCache.directory = directory
+        FST.BIN_DIR = os.path.join(directory, 'fst') if directory else None
+
+    @staticmethod
+    def get_dir(lang_abbrev, grammar):
+        """The directory for artifacts of lang_abbrev with grammar, created if
+        it doesn't exist."""
+        if not ArtifactCache.directory:
+            return os.path.join(LANGUAGE_DIR, lang_abbrev)
+        path = os.path.join(ArtifactCache.directory, lang_abbrev, grammar or lang_abbrev)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @staticmethod
+    def get_path(lang_abbrev, grammar, kind, key, ext=EXT):
+        """The path of artifact kind with key. In a language directory, the
+        name starts with the grammar."""
+        name = '{}.{}{}'.format(kind, key, ext)
+        if not ArtifactCache.directory:
+            name = '{}.{}'.format(grammar or lang_abbrev, name)
+        return os.path.join(ArtifactCache.get_dir(lang_abbrev, grammar), name)
+
+    @staticmethod
+    def scope(langdir):
+        """A short hash of the absolute path of langdir, so that artifacts made
+        from different copies of a language's files have different names."""
+        return hashlib.sha1(os.path.abspath(langdir).encode('utf-8')).hexdigest()[:12]
+
+    @staticmethod
+    def hash_files(h, dirs, ext, modules=()):
+        """Update the hashlib object h with the names and contents of modules
+        (paths relative to this package) and of the files in dirs whose names
+        end in ext, and return its hex digest. Used for lexicon snapshots as
+        well as for artifacts."""
+        here = os.path.dirname(__file__)
+        paths = [os.path.join(here, m) for m in modules]
+        for d in dirs:
+            if os.path.isdir(d):
+                paths.extend(os.path.join(d, name) for name in sorted(os.listdir(d))
+                             if name.endswith(ext))
+        for path in paths:
+            h.update(os.path.basename(path).encode())
+            with open(path, 'rb') as stream:
+                h.update(stream.read())
+        return h.hexdigest()
+
+    @staticmethod
+    def source_hash(langdir, lang_abbrev, grammar):
+        """A key for artifacts made from the data files in langdir: the scope of
+        langdir and a hash of the contents of the files and of the modules
+        defining the classes of pickled objects, and of the language and grammar."""
+        h = hashlib.sha1('{}:{}:{}'.format(ArtifactCache.version, lang_abbrev, grammar).encode())
+        digest = ArtifactCache.hash_files(h, [langdir], ArtifactCache.source_ext,
+                                          ArtifactCache.source_modules)
+        return '{}.{}'.format(ArtifactCache.scope(langdir), digest)
+
+    ## Reading and writing
+
+    @staticmethod
+    def load(lang_abbrev, grammar, kind, key, resolve=None):
+        """The object stored as artifact kind with key, or None if there isn't
+        one. resolve is a function returning the object for each persistent
+        id that was written in place of an object (see write())."""
+        path = ArtifactCache.get_path(lang_abbrev, grammar, kind, key)
+        try:
+            stream = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        with stream:
+            unpickler = pickle.Unpickler(stream)
+            if resolve:
+                unpickler.persistent_load = resolve
+            try:
+                return unpickler.load()
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+                # Made by a different version of something that isn't hashed
+                print('Could not load {}: {}'.format(path, e))
+                return None
+
+    @staticmethod
+    def write(lang_abbrev, grammar, kind, key, obj, external=None):
+        """Store obj as artifact kind with key, replacing any other version.
+        external is a dict of persistent ids of objects that are stored
+        separately, by the objects' ids."""
+        path = ArtifactCache.get_path(lang_abbrev, grammar, kind, key)
+        ArtifactCache.write_atomic(path, lambda stream: ArtifactCache.dump(obj, stream, external))
+        ArtifactCache.prune(os.path.dirname(path), kind, path)
+        return path
+
+    @staticmethod
+    def dump(obj, stream, external=None):
+        pickler = pickle.Pickler(stream, pickle.HIGHEST_PROTOCOL)
+        if external:
+            pickler.persistent_id = lambda o: external.get(id(o))
+        pickler.dump(obj)
+
+    @staticmethod
+    def write_atomic(path, write):
+        """Call write on a stream for a temporary file in path's directory,
+        then rename the file to path, so other processes never see part of it."""
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp',
+                                   dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as stream:
+                write(stream)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    @staticmethod
+    def prune(directory, kind, keep):
+        """Delete versions of artifact kind in directory other than keep that
+        were made from the same language directory: those whose names differ
+        from keep's only in the hash of the files."""
+        prefix = os.path.basename(keep).rsplit('.', 2)[0] + '.'
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.startswith(prefix) and name.endswith(ArtifactCache.EXT) and path != keep \
+               and name.count('.') == prefix.count('.') + 1:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # Another process got to it first
+                    pass
+
+    @staticmethod
+    @contextlib.contextmanager
+    def lock(lang_abbrev, grammar, enabled=True):
+        """Hold an exclusive lock on the artifacts of lang_abbrev and grammar,
+        waiting for any other process holding it."""
+        if not enabled or not fcntl:
+            yield
+            return
+        name = 'lock' if ArtifactCache.directory else '{}.lock'.format(grammar or lang_abbrev)
+        path = os.path.join(ArtifactCache.get_dir(lang_abbrev, grammar), name)
+        with open(path, 'a') as stream:
+            fcntl.flock(stream, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(stream, fcntl.LOCK_UN)
+
+if ArtifactCache.directory:
+    ArtifactCache.set_directory(ArtifactCache.directory)
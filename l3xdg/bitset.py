@@ -0,0 +1,291 @@
+#   Integer bitmask representation of set variable domains.
+#
+########################################################################
+#
+#   This file is part of the HLTDI L^3 project
+#       for parsing, generation, and translation within the
+#       framework of  Extensible Dependency Grammar.
+#
+#   Copyright (C) 2010, 2011, 2012, 2013, 2014
+#   The HLTDI L^3 Team <gasser@cs.indiana.edu>
+#
+#   This program is free software: you can redistribute it and/or
+#   modify it under the terms of the GNU General Public License as
+#   published by the Free Software Foundation, either version 3 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# 2026.10.17
+# -- Created. Most domains of IVars and SVars (node indices, arc label
+#    indices, lexical entry indices) are small sets of non-negative ints.
+#    A BitSet stores such a set as a single int, so subset tests,
+#    intersections and unions are bitwise operations and cardinality is
+#    a popcount. BitSets are immutable and behave like sets wherever the
+#    constraint code uses them; mixing them with ordinary sets (or with
+#    sets of agreement tuples) gives the same results as sets would.
+
+class BitSet:
+    """Immutable set of non-negative ints represented as an int bitmask."""
+
+    __slots__ = ('mask',)
+
+    def __init__(self, elements=(), mask=0):
+        if elements:
+            m, pure = BitSet.int_mask(elements)
+            if not pure:
+                raise ValueError('BitSet elements must be non-negative ints: {}'.format(elements))
+            mask |= m
+        self.mask = mask
+
+    @staticmethod
+    def int_mask(values):
+        """Mask for the non-negative ints in values, and whether values contains
+        nothing else."""
+        if isinstance(values, BitSet):
+            return values.mask, True
+        if isinstance(values, range) and values.step == 1:
+            start, stop = values.start, values.stop
+            if stop <= start:
+                return 0, True
+            pure = start >= 0
+            start = max(start, 0)
+            if stop <= start:
+                return 0, pure
+            return ((1 << (stop - start)) - 1) << start, pure
+        mask = 0
+        pure = True
+        for x in values:
+            if isinstance(x, int) and x >= 0:
+                mask |= 1 << x
+            else:
+                pure = False
+        return mask, pure
+
+    @staticmethod
+    def encode(values):
+        """A BitSet for values if it is a set of non-negative ints; otherwise values."""
+        if isinstance(values, (set, frozenset)):
+            mask, pure = BitSet.int_mask(values)
+            if pure:
+                return BitSet(mask=mask)
+        return values
+
+    @staticmethod
+    def span(start, stop):
+        """BitSet for range(start, stop)."""
+        if stop <= start:
+            return BitSet()
+        return BitSet(mask=((1 << (stop - start)) - 1) << start)
+
+    def __reduce__(self):
+        return BitSet, ((), self.mask)
+
+    def __repr__(self):
+        if not self.mask:
+            return 'set()'
+        return '{' + ', '.join(str(x) for x in self) + '}'
+
+    def __len__(self):
+        return popcount(self.mask)
+
+    def __bool__(self):
+        return self.mask != 0
+
+    def __iter__(self):
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def __contains__(self, x):
+        return isinstance(x, int) and x >= 0 and (self.mask >> x) & 1 == 1
+
+    __hash__ = None
+
+    def min(self):
+        if not self.mask:
+            raise ValueError('min() of empty BitSet')
+        return (self.mask & -self.mask).bit_length() - 1
+
+    def max(self):
+        if not self.mask:
+            raise ValueError('max() of empty BitSet')
+        return self.mask.bit_length() - 1
+
+    def copy(self):
+        # Immutable, so there's nothing to copy
+        return self
+
+    ## Comparison
+
+    def __eq__(self, other):
+        if isinstance(other, BitSet):
+            return self.mask == other.mask
+        if isinstance(other, (set, frozenset)):
+            mask, pure = BitSet.int_mask(other)
+            return pure and mask == self.mask
+        return NotImplemented
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        if eq is NotImplemented:
+            return eq
+        return not eq
+
+    def issubset(self, other):
+        if type(other) is BitSet:
+            return self.mask & ~other.mask == 0
+        return self.mask & ~BitSet.int_mask(other)[0] == 0
+
+    def issuperset(self, other):
+        if type(other) is BitSet:
+            return other.mask & ~self.mask == 0
+        mask, pure = BitSet.int_mask(other)
+        return pure and mask & ~self.mask == 0
+
+    def isdisjoint(self, other):
+        if type(other) is BitSet:
+            return self.mask & other.mask == 0
+        return self.mask & BitSet.int_mask(other)[0] == 0
+
+    def __le__(self, other):
+        if not isinstance(other, SETS):
+            return NotImplemented
+        return self.issubset(other)
+
+    def __ge__(self, other):
+        if not isinstance(other, SETS):
+            return NotImplemented
+        return self.issuperset(other)
+
+    def __lt__(self, other):
+        if not isinstance(other, SETS):
+            return NotImplemented
+        return self.issubset(other) and self != other
+
+    def __gt__(self, other):
+        if not isinstance(other, SETS):
+            return NotImplemented
+        return self.issuperset(other) and self != other
+
+    ## Set operations; results are BitSets unless other elements are involved
+
+    def union(self, *others):
+        mask = self.mask
+        for other in others:
+            if type(other) is BitSet:
+                mask |= other.mask
+                continue
+            m, pure = BitSet.int_mask(other)
+            if not pure:
+                return set(self).union(*others)
+            mask |= m
+        return bits(mask)
+
+    def intersection(self, *others):
+        mask = self.mask
+        for other in others:
+            mask &= other.mask if type(other) is BitSet else BitSet.int_mask(other)[0]
+        return bits(mask)
+
+    def difference(self, *others):
+        mask = self.mask
+        for other in others:
+            mask &= ~(other.mask if type(other) is BitSet else BitSet.int_mask(other)[0])
+        return bits(mask)
+
+    def symmetric_difference(self, other):
+        mask, pure = BitSet.int_mask(other)
+        if not pure:
+            return set(self).symmetric_difference(other)
+        return bits(self.mask ^ mask)
+
+    def __or__(self, other):
+        if not isinstance(other, SETS):
+            return NotImplemented
+        return self.union(other)
+
+    def __and__(self, other):
+        if not isinstance(other, SETS):
+            return NotImplemented
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        if not isinstance(other, SETS):
+            return NotImplemented
+        return self.difference(other)
+
+    def __xor__(self, other):
+        if not isinstance(other, SETS):
+            return NotImplemented
+        return self.symmetric_difference(other)
+
+    # With an ordinary set on the left, the result is an ordinary set
+
+    def __ror__(self, other):
+        if not isinstance(other, (set, frozenset)):
+            return NotImplemented
+        return other.union(self)
+
+    def __rand__(self, other):
+        if not isinstance(other, (set, frozenset)):
+            return NotImplemented
+        return other.intersection(self)
+
+    def __rsub__(self, other):
+        if not isinstance(other, (set, frozenset)):
+            return NotImplemented
+        return other.difference(self)
+
+    def __rxor__(self, other):
+        if not isinstance(other, (set, frozenset)):
+            return NotImplemented
+        return other.symmetric_difference(self)
+
+def bits(mask):
+    """A BitSet with the given mask, skipping the constructor."""
+    b = object.__new__(BitSet)
+    b.mask = mask
+    return b
+
+# Types that count as sets for domain values
+SETS = (set, frozenset, BitSet)
+
+try:
+    popcount = int.bit_count
+except AttributeError:
+    def popcount(mask):
+        return bin(mask).count('1')
+
+def union_all(sets):
+    """Union of a list of sets, a BitSet if they are all BitSets. The union of
+    no sets is an ordinary set, since there's nothing to say BitSets are in
+    use."""
+    if not sets:
+        return set()
+    mask = 0
+    for s in sets:
+        if type(s) is not BitSet:
+            return set().union(*sets)
+        mask |= s.mask
+    return bits(mask)
+
+def set_min(s):
+    return s.min() if isinstance(s, BitSet) else min(s)
+
+def set_max(s):
+    return s.max() if isinstance(s, BitSet) else max(s)
+
+def set_range(start, stop, bits=False):
+    """The set of ints in range(start, stop), as a BitSet if bits is True."""
+    if bits:
+        return BitSet.span(start, stop)
+    return set(range(start, stop))
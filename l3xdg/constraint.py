@@ -219,6 +219,14 @@
 # -- Added principle parameter to propagators to help with debugging.
 # 2013.11.03
 # -- Projectors eliminated. It wasn't worth the trouble.
+# 2026.10.17
+# -- SetConvexity, SetPrecedence and the Selection propagators keep BitSet
+#    domains as BitSets (union_all(), set_min(), set_max(), set_range())
+#    rather than rebuilding ordinary sets.
+# 2026.10.17
+# -- Constraints have a priority (cheap ones first) and the variable events that
+#    wake them up; the solver keeps entailed and failed propagators in bitmasks
+#    using their ids.
 
 # from .projector import *
 from .variable import *
@@ -280,6 +288,15 @@ class Constraint:
     # Constant threshold for lenience
     lenience = .5
 
+    # Order in which woken propagators are run in the solver: lower runs first
+    priority = 1
+    # Variable events that wake the constraint up
+    events = ALL_EVENTS
+    # Index of the constraint in its problem, and the corresponding bit, for the
+    # solver's entailed and failed masks (see CSP.index_propagators())
+    id = None
+    bit = 0
+
     def __init__(self, variables, problem=None,
                  principle=None, weight=1):
         self.variables = variables
@@ -354,7 +371,9 @@ class Constraint:
     @staticmethod
     def string_set(s):
         if len(s) > 10:
-            return '{{{0}...{1}}}'.format(min(s), max(s))
+            return '{{{0}...{1}}}'.format(set_min(s), set_max(s))
+        elif isinstance(s, BitSet):
+            return repr(s)
         else:
             return '{}'.format(set.__repr__(s))
 
@@ -367,6 +386,8 @@ class Constraint:
 
 class BasicConstraint(Constraint):
 
+    priority = 0
+
     def get_var(self):
         """The single variable for this constraint."""
         return self.variables[0]
@@ -599,6 +620,8 @@ class Propagator(Constraint):
 class LessThan(Propagator):
     """IVar1 is less than or equal to IVar2."""
 
+    priority = 0
+
     def __init__(self, variables, problem=None, principle=None, weight=1):
         Propagator.__init__(self, variables, problem=problem,
                             principle=principle, weight=weight)
@@ -675,6 +698,9 @@ class LessThan(Propagator):
 class CardinalityEq(Propagator):
     """Set variable's cardinality is constrained to be equal to value of IVar."""
 
+    priority = 0
+    events = UPPER_EVENT | CARD_EVENT | DET_EVENT
+
     def __init__(self, variables, problem=None, principle=None, weight=1):
         Propagator.__init__(self, variables, problem=problem,
                             principle=principle, weight=weight)
@@ -766,6 +792,9 @@ class SetConvexity(Propagator):
     """There must not be any 'holes' in the (single) set variable, which represents
     the positions of the descendants of a node as well as that of the node itself."""
 
+    priority = 0
+    events = LOWER_EVENT | UPPER_EVENT | DET_EVENT
+
     def __init__(self, var, problem=None, principle=None, weight=1):
         """Only one variable, so a special constructor."""
         Propagator.__init__(self, [var], problem=problem,
@@ -800,14 +829,14 @@ class SetConvexity(Propagator):
             val = self.var.get_value(dstore=dstore)
             # There can't be any holes
             if val:
-                val_range = set(range(min(val), max(val)+1))
+                val_range = set_range(set_min(val), set_max(val)+1, isinstance(val, BitSet))
                 if val_range - val:
                     return True
         lower = self.var.get_lower(dstore=dstore)
         if not lower:
             return False
         upper = self.var.get_upper(dstore=dstore)
-        neces_range = set(range(min(lower), max(lower)+1))
+        neces_range = set_range(set_min(lower), set_max(lower)+1, isinstance(lower, BitSet))
         if neces_range - upper:
             # There is some value in necessary range not in upper bound
             return True
@@ -822,10 +851,10 @@ class SetConvexity(Propagator):
         upper = self.var.get_upper(dstore=dstore)
         if not lower:
             return False
-        min_lower = min(lower)
-        max_lower = max(lower)
-        if not set(range(min_lower, max_lower+1)) - lower:
-            if min_lower - min(upper) <= 1 and max(upper) - max_lower <= 1:
+        min_lower = set_min(lower)
+        max_lower = set_max(lower)
+        if not set_range(min_lower, max_lower+1, isinstance(lower, BitSet)) - lower:
+            if min_lower - set_min(upper) <= 1 and set_max(upper) - max_lower <= 1:
                 return True
         return False
 
@@ -839,22 +868,22 @@ class SetConvexity(Propagator):
         lower = v.get_lower(dstore=dstore)
         if len(lower) > 0:
             upper = v.get_upper(dstore=dstore)
-            min_low = min(lower)
-            max_low = max(lower)
+            min_low = set_min(lower)
+            max_low = set_max(lower)
             # Make the lower bound everything between the min and max
-            if v.strengthen_lower(set(range(min_low, max_low+1)),
+            if v.strengthen_lower(set_range(min_low, max_low+1, isinstance(lower, BitSet)),
                                   dstore=dstore, constraint=(verbosity>1 or v in tracevar) and self):
                 changed.add(v)
                 return Constraint.sleeping, changed
 
             # Look for gaps in the upper bound
             # Starting at the max of the lower bound...
-            max_up = max(upper)
+            max_up = set_max(upper)
             x = max_low+1
             while x in upper and x < max_up:
                 x += 1
             if x < max_up:
-                if v.discard_upper(set(range(x, max_up+1)),
+                if v.discard_upper(set_range(x, max_up+1, isinstance(upper, BitSet)),
                                    dstore=dstore, constraint=(verbosity>1 or v in tracevar) and self):
                     changed.add(v)
                     return Constraint.sleeping, changed
@@ -1083,6 +1112,9 @@ class CardinalitySubset(Propagator):
     in Müller, but it is needed for XDG valency with propagators (but not projectors).
     It could be handled with IVMemberSV."""
 
+    priority = 0
+    events = UPPER_EVENT | CARD_EVENT | DET_EVENT
+
     def __init__(self, variables, problem=None, principle=None, weight=1):
         Propagator.__init__(self, variables, problem=problem,
                             principle=principle, weight=weight)
@@ -1180,6 +1212,9 @@ class CardinalitySubset(Propagator):
 class SetPrecedence(Propagator):
     """All elements of set variable 1 must precede all elements of set variable 2."""
 
+    priority = 0
+    events = LOWER_EVENT | UPPER_EVENT | DET_EVENT
+
     def __init__(self, variables, problem=None, principle=None, weight=1):
         Propagator.__init__(self, variables, problem=problem,
                             principle=principle, weight=weight)
@@ -1208,14 +1243,14 @@ class SetPrecedence(Propagator):
         """Is the highest value that can occur in svar1 < the lowest value that can occur in svar2?"""
         v1_upper = svar1.get_upper(dstore=dstore)
         v2_upper = svar2.get_upper(dstore=dstore)
-        return v1_upper and v2_upper and (max(v1_upper) < min(v2_upper))
+        return v1_upper and v2_upper and (set_max(v1_upper) < set_min(v2_upper))
 
     @staticmethod
     def cant_precede(svar1, svar2, dstore=None):
         """Is the highest value that must occur in svar1 >= the lowest value that must occur in svar2?"""
         v1_lower = svar1.get_lower(dstore=dstore)
         v2_lower = svar2.get_lower(dstore=dstore)
-        return v1_lower and v2_lower and (max(v1_lower) >= min(v2_lower))
+        return v1_lower and v2_lower and (set_max(v1_lower) >= set_min(v2_lower))
 
     def fails(self, dstore=None):
         """Fail if any of set1's lower bound > any of set2's lower bound."""
@@ -1235,14 +1270,14 @@ class SetPrecedence(Propagator):
         # If the lower bound on v1 is not empty, v2 must be a subset of
         # {min(MAX, max(v1 + 1)), ..., MAX}
         if v1_low:
-            v2_up_new = range(min([v1.max, max(v1_low) + 1]), v2.max+1)
+            v2_up_new = range(min([v1.max, set_max(v1_low) + 1]), v2.max+1)
             if v2.strengthen_upper(v2_up_new, dstore=dstore,
                                    constraint=(verbosity>1 or v2 in tracevar) and self):
                 changed.add(v2)
         # If the lower bound on v2 is not empty, v1 must be a subset of
         # {0, ..., max(0, min(v2_low) - 1)}
         if v2_low:
-            v1_up_new = range(0, max([0, min(v2_low) - 1]) + 1)
+            v1_up_new = range(0, max([0, set_min(v2_low) - 1]) + 1)
             if v1.strengthen_upper(v1_up_new, dstore=dstore,
                                    constraint=(verbosity>1 or v1 in tracevar) and self):
                 changed.add(v1)
@@ -1318,6 +1353,9 @@ class SetPrecedence(Propagator):
 class IVMemberSV(Propagator):
     """Integer variable value must be member of set variable value."""
 
+    priority = 0
+    events = LOWER_EVENT | UPPER_EVENT | DET_EVENT
+
     def __init__(self, variables, problem=None, pattern=False, propagate=True,
                  principle=None, weight=1):
         """pattern option is required when variables are agreement features."""
@@ -1419,6 +1457,8 @@ class Selection(Propagator):
     selvar: set domain var or int domain var (set var for primitive propagators)
     """
 
+    priority = 2
+
     def __init__(self, mainvar=None, selvar=None, seqvars=None, pattern=False, 
                  problem=None, principle=None, weight=1):
         Propagator.__init__(self, [mainvar, selvar] + seqvars, problem=problem,
@@ -1629,7 +1669,7 @@ class IntSelection(Selection):
                 # This is true if the upper bound of mainvar fails to contain values in seqvar's value
                 seqval = seqvar.get_value(dstore=dstore)
                 # In case seqvar is an IVar, make its value a set
-                if not isinstance(seqval, set):
+                if not isinstance(seqval, SETS):
                     seqval = {seqval}
                 mainvar = self.mainvar
                 mainvar_upper = mainvar.get_upper(dstore=dstore)
@@ -1691,7 +1731,7 @@ class IntSelection(Selection):
         # sequence variables indexed by the elements in the domain of the selection variable,
         # that is, eliminate any elements from the upper bound that are not in this union
         seq_uppers = [seqvars[j].get_upper(dstore=dstore) for j in sel_domain]
-        if mainvar.strengthen_upper(set().union(*seq_uppers), dstore=dstore,
+        if mainvar.strengthen_upper(union_all(seq_uppers), dstore=dstore,
                                     constraint=(verbosity>1 or mainvar in tracevar) and self):
             changed.add(mainvar)
             return state, changed
@@ -1727,7 +1767,7 @@ class IntSelection(Selection):
             # Exclude j
             indices = sel_domain - {j}
             # Get the union of the upper bounds of the indexed sequence variables
-            seqvar_union = set().union(*[seqvars[i].get_upper(dstore=dstore) for i in indices])
+            seqvar_union = union_all([seqvars[i].get_upper(dstore=dstore) for i in indices])
             # Does the lower bound of the main variables have any elements not in the union?
             main_union_diff = mainvar.get_lower(dstore=dstore) - seqvar_union
             if len(main_union_diff) > 0:
@@ -1950,11 +1990,7 @@ class UnionSelection(Selection):
         selvar_lower = self.selvar.get_lower(dstore=dstore)
         if any([i >= seq_len for i in selvar_lower]):
             return False
-        res = set()
-        for i in selvar_lower:
-            if i < len(self.seqvars):
-                res.update(self.seqvars[i].get_lower(dstore=dstore))
-        return res
+        return union_all([self.seqvars[i].get_lower(dstore=dstore) for i in selvar_lower if i < seq_len])
 
     def fails(self, dstore=None):
         """Fail
@@ -1986,11 +2022,7 @@ class UnionSelection(Selection):
         # from those that can be selected, fail
         mainlower = self.mainvar.get_lower(dstore=dstore)
         selupper = self.selvar.get_upper(dstore=dstore)
-        maxsel = set()
-        for index, seq in enumerate(self.seqvars):
-            if index in selupper:
-                sequpper = seq.get_upper(dstore=dstore)
-                maxsel.update(sequpper)
+        maxsel = union_all([seq.get_upper(dstore=dstore) for index, seq in enumerate(self.seqvars) if index in selupper])
         if self.pattern:
             # Remove any wildcard patterns from mainlower
             mainlower_const = {x for x in mainlower if -1 not in x}
@@ -2017,13 +2049,14 @@ class UnionSelection(Selection):
             all_determined = True
             selval = selvar.get_value(dstore=dstore)
             selseqs = [seqvars[index] for index in selval if index < len(seqvars)]
-            result = set()
+            seq_lowers = []
             for seq in selseqs:
                 if seq.determined(dstore=dstore, verbosity=verbosity, constraint=self) is not False:
-                    result.update(seq.get_lower(dstore=dstore))
+                    seq_lowers.append(seq.get_lower(dstore=dstore))
                 else:
                     all_determined = False
             if all_determined:
+                result = union_all(seq_lowers)
                 # If so, determine the main var
                 if mainvar.determine(result, dstore=dstore, pattern=self.pattern, 
                                      constraint=(verbosity>1 or mainvar in tracevar) and self):
@@ -2069,7 +2102,7 @@ class UnionSelection(Selection):
                     changed.add(mainvar)
                     return state, changed
                 seq_uppers = [seq.get_upper(dstore=dstore) for seq in selseqs]
-                seq_up_union = set().union(*seq_uppers)
+                seq_up_union = union_all(seq_uppers)
                 if mainvar.strengthen_upper(seq_up_union, dstore=dstore, pattern=self.pattern, 
                                             reduce=True,
                                             constraint=(verbosity>1 or mainvar in tracevar) and self):
@@ -2080,7 +2113,7 @@ class UnionSelection(Selection):
                     changed.add(mainvar)
                     return state, changed
                 seq_lowers = [seq.get_lower(dstore=dstore) for seq in selseqs]
-                if mainvar.strengthen_lower(set().union(*seq_lowers), dstore=dstore,
+                if mainvar.strengthen_lower(union_all(seq_lowers), dstore=dstore,
                                             constraint=(verbosity>1 or mainvar in tracevar) and self):
 #                    if tracevar in selseqs:
 #                        print(self, 'strengthening lower main 1', seq_lowers, seq_uppers, mainvar.get_upper(dstore=dstore),
@@ -2098,7 +2131,7 @@ class UnionSelection(Selection):
                     if j >= len(seqvars):
                         print(self, 'seqvars', seqvars, 'too short for', selupper, 'of variable', selvar)
                 seq_uppers = [seqvars[j].get_upper(dstore=dstore) for j in selupper if j < len(seqvars)]
-                if mainvar.strengthen_upper(set().union(*seq_uppers), dstore=dstore, pattern=self.pattern, 
+                if mainvar.strengthen_upper(union_all(seq_uppers), dstore=dstore, pattern=self.pattern, 
                                             reduce=True,
                                             constraint=(verbosity>1 or mainvar in tracevar) and self):
                     changed.add(mainvar)
@@ -2106,7 +2139,7 @@ class UnionSelection(Selection):
             # The main variable must be a superset of the union of the lower bounds of all
             # sequence variables indexed by the lower bound of the selection variable.
             seq_lowers = [seqvars[j].get_lower(dstore=dstore) for j in selvar.get_lower(dstore=dstore)]
-            if mainvar.strengthen_lower(set().union(*seq_lowers), dstore=dstore,
+            if mainvar.strengthen_lower(union_all(seq_lowers), dstore=dstore,
                                         constraint=(verbosity>1 or mainvar in tracevar) and self):
                 changed.add(mainvar)
                 return state, changed
@@ -2147,7 +2180,7 @@ class UnionSelection(Selection):
             # Exclude j
             indices = selvar_upper - {j}
             # Get the union of the upper bounds of the indexed sequence variables
-            seqvar_union = set().union(*[seqvars[i].get_upper(dstore=dstore) for i in indices if i < len(seqvars)])
+            seqvar_union = union_all([seqvars[i].get_upper(dstore=dstore) for i in indices if i < len(seqvars)])
             # Does the lower bound of the main variable have any elements not in the union?
             main_union_diff = mainvar.get_lower(dstore=dstore) - seqvar_union
             if len(main_union_diff) > 0:
@@ -2168,7 +2201,7 @@ class UnionSelection(Selection):
         # upper bound of mainvar (not in Duchier??)
         selvar_lower = selvar.get_lower(dstore=dstore)
         mainvar_upper = mainvar.get_upper(dstore=dstore)
-        seqvar_upper = set().union(*[seqvars[i].get_upper(dstore=dstore) for i in selvar_lower if i < len(seqvars)])
+        seqvar_upper = union_all([seqvars[i].get_upper(dstore=dstore) for i in selvar_lower if i < len(seqvars)])
         seq_main_diff = seqvar_upper - mainvar_upper
         if seq_main_diff:
             for j in selvar_lower:
@@ -2390,6 +2423,8 @@ class SimplePrecedenceSelection(Propagator):
       in the order they appear in in posvars
     """
 
+    priority = 2
+
     def __init__(self, selvar=None, posvars=None, problem=None,
                  principle=None, weight=1, maxset=None):
         Propagator.__init__(self, [selvar] + posvars, problem=problem,
@@ -2639,6 +2674,8 @@ class PrecedenceSelection(Propagator):
     pair specifying a precedence constraint between the corresponding sets
     """
 
+    priority = 2
+
     def __init__(self, selvar=None, posvars=None, problem=None,
                  weight=1, principle=None, maxset=None):
         Propagator.__init__(self, [selvar] + posvars, problem=problem,
@@ -2837,6 +2874,8 @@ class EqualitySelection(Propagator):
     pattern: whether equality should be by pattern matching
     """
 
+    priority = 2
+
     def __init__(self, mainvars=None, selvar=None, seqvars=None,
                  pattern=False,
                  problem=None, principle=None, weight=1,
@@ -3031,6 +3070,8 @@ class SimpleEqualitySelection(Propagator):
     is a set, either the empty set or a single tuple of ints. This value must
     match the value specified in the selection var or be empty."""
 
+    priority = 2
+
     def __init__(self, selvar=None, seqvars=None,
                  pattern=False,
                  problem=None, principle=None, weight=1,
@@ -3114,7 +3155,7 @@ class SimpleEqualitySelection(Propagator):
             # attempt to equate it with value
             seqvar = seqvars[seqindex]
             # value may be an integer or tuple
-            if not isinstance(value, set):
+            if not isinstance(value, SETS):
                 value = {value}
             seqvar.strengthen_upper(value, dstore=dstore, pattern=self.pattern, 
                                     constraint=(verbosity>1 or seqvar in tracevar) and self)
@@ -24,8 +24,21 @@
 # -- Created.
 #    Process a corpus, either parsing or translating it, possibly also
 #    learning new entries or crosslexes.
+# 2026.10.17
+# -- process() implemented: sentences are parsed or translated in a
+#    producer thread that puts results in a bounded queue, which stream()
+#    yields from, so the consumer sees (sentence id, multigraph) pairs
+#    without prompts and the producer waits when the consumer falls
+#    behind. Languages are loaded once, in the constructor. Texts can be
+#    read from TMX translation memories.
+# 2026.10.17
+# -- read() pairs the lines of the two files of a bitext before dropping blank
+#    ones, so a blank line on one side doesn't shift the following pairs.
+#    make_xdg() makes a new XDG for each sentence.
 
 from .xdg import *
+import queue, threading
+import xml.etree.ElementTree as ET
 
 class Corpus:
 
@@ -68,20 +81,133 @@ class Corpus:
     def __repr__(self):
         return '{}{}'.format(Corpus.CHAR, self.name)
 
+    # Maximum number of results waiting for the consumer in stream()
+    queue_size = 16
+
     def read(self, file1, file2=None):
         """Read in corpus text. Files contain sentence-segmented texts.
         If self.bitext is True, there is a file2, and the sentences in
-        file1 and file2 are aligned."""
-        text = []
+        file1 and file2 are aligned. A TMX file (file1 ending in .tmx)
+        contains both the source and target sentences."""
+        if file1.endswith('.tmx'):
+            self.text = self.read_tmx(file1)
+            return
         with open(file1, encoding='utf8') as f1:
-            text = [s for s in f1]
+            text = [s.strip() for s in f1]
         if file2:
-            with open(file2, endoding='utf8') as f2:
-                text = zip(text, [s for s in f2])
+            # Lines are aligned, so blank lines are dropped only after pairing them
+            with open(file2, encoding='utf8') as f2:
+                text = [(s1, s2.strip()) for s1, s2 in zip(text, f2) if s1 or s2.strip()]
+        else:
+            text = [s for s in text if s]
         self.text = text
 
-    def process(self):
-        """Process corpus."""
+    def read_tmx(self, file):
+        """Return a list of (source, target) sentence pairs from a TMX translation
+        memory, or source sentences if there's no target language. Translation
+        unit variants are matched to languages by the first part of their
+        xml:lang attribute (ES-PY for es)."""
+        lang_att = '{http://www.w3.org/XML/1998/namespace}lang'
+        source = self.source.abbrev
+        target = self.target.abbrev if self.target else None
+        text = []
+        for event, elem in ET.iterparse(file):
+            if elem.tag != 'tu':
+                continue
+            segs = {}
+            for tuv in elem.iter('tuv'):
+                lang = tuv.get(lang_att, '').split('-')[0].lower()
+                seg = tuv.find('seg')
+                if seg is not None:
+                    segs[lang] = ''.join(seg.itertext()).strip()
+            if segs.get(source):
+                text.append((segs[source], segs.get(target, '')) if target else segs[source])
+            elem.clear()
+        return text
+
+    def process(self, sentences=None, debug=0, **solve_args):
+        """Process the corpus text (or sentences), writing translations or parses to
+        self.outfile if there is one. Returns the number of sentences with at least
+        one solution."""
+        succeeded = set()
+        out = open(self.outfile, 'w', encoding='utf8') if self.outfile else None
+        try:
+            for sent_id, multigraph in self.stream(sentences=sentences, debug=debug,
+                                                   **solve_args):
+                if not multigraph:
+                    continue
+                succeeded.add(sent_id)
+                if not out:
+                    continue
+                if self.bitext:
+                    print('{}\t{}'.format(sent_id, multigraph.io()), file=out)
+                else:
+                    print(sent_id, file=out)
+                    multigraph.display(file=out)
+        finally:
+            if out:
+                out.close()
+        return len(succeeded)
+
+    def stream(self, sentences=None, queue_size=0, debug=0, **solve_args):
+        """Generate (sentence id, multigraph) pairs for the solutions of the corpus
+        text (or sentences), and (sentence id, None) for sentences with no solution.
+        Sentences are processed ahead of the consumer in another thread, but no more
+        than queue_size results (default Corpus.queue_size) are kept waiting;
+        beyond that the thread waits for the consumer. solve_args are passed on to
+        XDG.solve() (by default all solutions are found, without prompting)."""
+        sentences = self.text if sentences is None else sentences
+        results = queue.Queue(queue_size or Corpus.queue_size)
+        stop = threading.Event()
+        # Put item in the queue, waiting for room; False if the consumer has quit
+        def put(item):
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        def produce():
+            try:
+                for sent_id, result in self.results(sentences, debug=debug, **solve_args):
+                    if not put((sent_id, result, None)):
+                        return
+            except Exception as e:
+                put((None, None, e))
+                return
+            put((None, None, StopIteration()))
+        producer = threading.Thread(target=produce, name='{}-producer'.format(self),
+                                    daemon=True)
+        producer.start()
+        try:
+            while True:
+                sent_id, result, end = results.get()
+                if end is None:
+                    yield sent_id, result
+                elif isinstance(end, StopIteration):
+                    return
+                else:
+                    raise end
+        finally:
+            stop.set()
+
+    def results(self, sentences, debug=0, **solve_args):
+        """Parse or translate each sentence in turn, generating (sentence id,
+        multigraph) pairs. Sentence ids are positions in sentences; for aligned
+        (source, target) pairs, only the source sentence is processed."""
+        solve_args.setdefault('all_sols', True)
+        solve_args.setdefault('interactive', False)
+        solve_args.setdefault('verbose', False)
+        for sent_id, sentence in enumerate(sentences):
+            if isinstance(sentence, tuple):
+                sentence = sentence[0]
+            xdg = self.make_xdg(sentence, debug=debug)
+            sols = xdg.solve(**solve_args)
+            if not sols:
+                yield sent_id, None
+            for sol in sols:
+                yield sent_id, sol
 
     def load(self, src_abbrev, targ_abbrev, grammar, debug=0):
         """Load lexicon and morphology for language(s)."""
@@ -96,32 +222,32 @@ class Corpus:
                                    learn=self.learn_lex,
                                    verbosity=debug)
 
+    def make_xdg(self, sentence, debug=0):
+        """Create an XDG problem for translating or parsing sentence with the
+        corpus's languages."""
+        if self.bitext:
+            # Translate the sentence from source to target language
+            return XDG(sentence, self.source,
+                       target=self.target,
+                       load_semantics=self.semantics,
+                       reload=False,
+                       process=TRANSLATE,
+                       transfer_xlex=not self.semantics,
+                       grammar=self.grammar,
+                       verbosity=debug, report=1 if debug else 0)
+        # Analyze the source sentence
+        return XDG(sentence, self.source, target=None,
+                   load_semantics=self.semantics,
+                   reload=False,
+                   process=PARSE,
+                   transfer_xlex=False,
+                   grammar=self.grammar,
+                   verbosity=debug, report=1 if debug else 0)
+
     def proc_sentence(self, sentence, debug=0):
         """Parse and possibly translate sentence. If this fails and self.learn_lex is True,
         attempt to learn a new entry or crosslex."""
-        if self.bitext:
-            # Translate the sentence from source to target language
-            xdg = XDG(sentence, self.source,
-                      target=self.target,
-                      load_semantics=self.semantics,
-                      reload=False,
-                      process=TRANSLATE,
-#                      pre_arcs=arcs, pre_agrs=agrs,
-                      transfer_xlex=not self.semantics,
-                      grammar=self.grammar,
-#                      distributor=distributor,
-                      verbosity=debug, report=1 if debug else 0)
-        else:
-            # Analyze the source sentence
-            xdg = XDG(sentence, self.source, target=None,
-                      load_semantics=self.semantics,
-                      reload=False,
-                      process=PARSE,
-#                      pre_arcs=arcs, pre_agrs=agrs,
-                      transfer_xlex=False,
-                      grammar=self.grammar,
-#                      distributor=distributor, 
-                      verbosity=debug, report=1 if debug else 0)
+        xdg = self.make_xdg(sentence, debug=debug)
         sols = xdg.solve(verbose=False)
         if sols:
             output = []
@@ -165,8 +165,52 @@
 # -- Crosslex is not deleted if the target lex is not found. It's kept around as a
 #    shell to be completed at translation time if the target lex has been created in
 #    the meantime.
-
-import os, re, importlib, sys
+# 2026.10.17
+# -- Optional persistent analysis cache (AnalCache in analcache.py), opened
+#    with open_anal_cache() and consulted by anal_word(); preload_anals()
+#    reads or creates the analyses of a whole vocabulary at once.
+# -- analyze_corpus() analyzes a corpus in resumable chunks, analyzing each
+#    new word form once in a pool of worker processes, and writes .anl
+#    files for hiiktuu.learn.Corpus.read(). analyze_file() reads its input
+#    a line at a time.
+# -- load_morpho() defers loading FSTs until they're first used unless
+#    lazy=False. preload_fsts() loads some of them ahead of time and
+#    loaded_fsts() reports what's been loaded.
+# -- anal_word() only transduces with a POS's FSTs if they accept the word
+#    (POSMorphology.may_accept()); prefilter_counts() reports how often
+#    POSs were skipped.
+# -- gen_word() memoizes transductions in a bounded LRU table (gen_cache)
+#    keyed by POS, root, and the canonical strings of the feature
+#    structures, so a word generated again in another solution or sentence
+#    isn't transduced again while it's in the table. Words are still
+#    generated one at a time as nodes are realized, not in batches.
+# -- load_morpho(minimize=True) minimizes the FSTs it loads; fst_sizes()
+#    reports their numbers of states and arcs before and after.
+# -- load_langs(snapshot=True) loads the languages' lexicons from a snapshot
+#    (LexSnapshot in lexsnapshot.py) if there's a current one and otherwise
+#    writes one; entries in the snapshot are only unpickled when they're
+#    used. Lexicon loading and linking is now in load_lexicons().
+# -- forget_anal() removes a form from the analysis caches; the lexicon
+#    calls it when it evicts the form's instantiated lexemes.
+# -- Pickles and lexicon snapshots are kept by the artifact cache (see
+#    artifacts.py), in its directory if one is set and otherwise in the
+#    language directory. pickle() saves the language and its lexicon as
+#    separate artifacts, named by a hash of the names, sizes, and
+#    modification times of all of the language's data files rather than
+#    checked against the modification times of its .yaml and .py files, and
+#    load_pickle() can load the language without its lexicon. load() holds
+#    the cache's lock while it builds a language, so processes starting
+#    together build it once. pickle() called morphology_reset_fsts()
+#    instead of morphology.reset_fsts().
+# -- Languages loaded from a lexicon snapshot count as pickled, so
+#    load_langs(pickle=True) doesn't pickle them again, which would
+#    unpickle every entry in the snapshot.
+# 2026.10.18
+# -- Pickles are named by a hash of the contents of the language's files.
+#    A language loaded by load_pickle() without its lexicon counts as
+#    pickled, so load1(lexicon=False) doesn't write it again every time.
+
+import os, re, importlib, sys, itertools, collections, multiprocessing, multiprocessing.util
 
 LANGUAGE_DIR = os.path.join(os.path.dirname(__file__), 'languages')
 
@@ -231,6 +275,9 @@ from .morphology import morphology
 #from .lex import unify_fs
 # Dimension abbreviations
 from .utils import DIMENSIONS, ALL_DIMENSIONS
+from .analcache import AnalCache
+from .lexsnapshot import LexSnapshot
+from .artifacts import ArtifactCache
 import pickle
 
 class Language:
@@ -239,6 +286,9 @@ class Language:
 
     T = TDict()
 
+    # Maximum number of transductions remembered by gen_word()
+    max_gen_cache = 20000
+
     def __init__(self, name, abbrev, backup='',
                  lexicon=None, labels=None, lexicon_name='',
                  # list of agreement features
@@ -277,6 +327,9 @@ class Language:
  
         ## Caching for words generated by morphology.
         self.generated_words = {}
+        # Transductions for gen_word(); see gen_transduce()
+        self.gen_cache = collections.OrderedDict()
+        self.gen_hits = self.gen_misses = 0
 
         ## Agreement features (should these be specific to dimensions?)
         # Extract once all values have been recorded, if not specified initially
@@ -327,6 +380,8 @@ class Language:
             self.morph_anal_cache = None
             self.morph_gen_cache = None
             self.morph_seg_cache = None
+        # Persistent analysis cache, shared across runs and processes
+        self.anal_cache = None
 
         ## Tokenization dictionary
         self.tokenization = None
@@ -1427,7 +1482,7 @@ class Language:
 
     def load_morpho(self, analysis=True, generation=True, segment=False,
                     simplified=False, ortho=True, guess=False,
-                    load_analyzed=True, verbose=False):
+                    load_analyzed=True, lazy=True, minimize=None, verbose=False):
         """Load words and FSTs for morphological analysis and/or generation.
         @param  analysis:   whether to load analysis FSTs
         @type   analysis:   boolean
@@ -1447,6 +1502,11 @@ class Language:
         @type   guess:      boolean
         @param  load_analyzed: whether to load analyzed words
         @type   load_analyzed: boolean
+        @param  lazy:       whether to wait to load each FST until it's used
+        @type   lazy:       boolean
+        @param  minimize:   whether to minimize the FSTs (default:
+                            POSMorphology.minimize)
+        @type   minimize:   boolean
         @param  verbose:    how verbose to be
         @type   verbose:    boolean
         """
@@ -1461,26 +1521,67 @@ class Language:
                 # For analysis, load pre-analyzed words if any
                 if analysis and load_analyzed:
                     self.morphology[pos].set_analyzed(ortho=ortho)
+                # Either load FSTs now or record how to load them when they're needed
+                load_fst = self.morphology[pos].defer_fst if lazy else self.morphology[pos].load_fst
                 # Load lexical anal and/or gen FSTs
                 if analysis:
-                    self.morphology[pos].load_fst(gen=False, guess=False,
-                                                  simplified=simplified, verbose=verbose)
+                    load_fst(gen=False, guess=False,
+                             simplified=simplified, minimize=minimize, verbose=verbose)
                 if generation:
-                    self.morphology[pos].load_fst(generate=True, invert=True, gen=True,
-                                                  simplified=simplified, guess=False,
-                                                  verbose=verbose)
+                    load_fst(generate=True, invert=True, gen=True,
+                             simplified=simplified, guess=False,
+                             minimize=minimize, verbose=verbose)
                 # Load guesser anal and gen FSTs
                 if guess:
                     if analysis:
-                        self.morphology[pos].load_fst(gen=False, guess=True, verbose=verbose)
+                        load_fst(gen=False, guess=True, minimize=minimize, verbose=verbose)
                     if generation:
-                        self.morphology[pos].load_fst(generate=True, invert=True, gen=True,
-                                                      simplified=simplified, guess=True,
-                                                      verbose=verbose)
+                        load_fst(generate=True, invert=True, gen=True,
+                                 simplified=simplified, guess=True,
+                                 minimize=minimize, verbose=verbose)
 #                        self.morphology[pos].load_gen_fst(simplified=simplified, guess=True,
 #                                                          verbose=verbose)
             self.morphology_loaded = True
 
+    def preload_fsts(self, pos=None, analysis=True, generation=False, guess=False):
+        '''Load deferred FSTs that will be needed, so they aren't loaded in the
+        middle of processing (for example, before forking workers).
+
+        @param  pos:        POSs whose FSTs are loaded (default: all)
+        @type   pos:        list of strings
+        @param  analysis:   whether to load analysis FSTs
+        @type   analysis:   boolean
+        @param  generation: whether to load generation FSTs
+        @type   generation: boolean
+        @param  guess:      whether to load guesser FSTs
+        @type   guess:      boolean
+        '''
+        for p in pos or self.morphology.pos:
+            posmorph = self.morphology[p]
+            for generate, load in ((False, analysis), (True, generation)):
+                if load:
+                    posmorph.get_fst(generate=generate)
+                    if guess:
+                        posmorph.get_fst(generate=generate, guess=True)
+
+    def loaded_fsts(self):
+        '''Dict of POS: (names of loaded FSTs, names of deferred FSTs).'''
+        return dict((pos, self.morphology[pos].loaded_fsts()) for pos in self.morphology.pos)
+
+    def fst_sizes(self):
+        '''Dict of POS: {FST name: (states, arcs) or, for minimized FSTs,
+        (states, arcs, original states, original arcs)} for loaded FSTs.'''
+        return dict((pos, self.morphology[pos].fst_sizes()) for pos in self.morphology.pos)
+
+    def prefilter_counts(self):
+        '''Dict of POS: {'lexical': (words checked, words skipped),
+        'guesser': (words checked, words skipped)} for anal_word().'''
+        counts = {}
+        for pos in self.morphology.pos:
+            c = getattr(self.morphology[pos], 'prefilter_counts', {False: [0, 0], True: [0, 0]})
+            counts[pos] = {'lexical': tuple(c[False]), 'guesser': tuple(c[True])}
+        return counts
+
     def anal(self, word, form, guess=False, record=True, cache=True, verbose=True):
         """Return the word along with extracted analyses.
         @param word:  a wordform to be analyzed
@@ -1553,6 +1654,17 @@ class Language:
                 self.morph_anal_cache[form] = anals
             return word, anals, segmentations, new_word
 
+    def forget_anal(self, form):
+        """Remove form from the caches of analyzed words, so that it gets
+        analyzed again the next time it's seen.
+        @param form:  a possibly preprocessed word
+        @type  form:  string
+        """
+        if self.morph_anal_cache:
+            self.morph_anal_cache.pop(form, None)
+        if self.morph_seg_cache:
+            self.morph_seg_cache.pop(form, None)
+
     def anal_from_dict(self, analysis):
         """Convert a morphological analysis, consisting of POS, citation, and FS,
         to a dictionary of features appropriate for XDG syntax."""
@@ -1750,6 +1862,12 @@ class Language:
                             FeatStruct instance)
         '''
         postproc = postproc and self.postproc
+        cache = getattr(self, 'anal_cache', None)
+        if cache is not None:
+            flags = AnalCache.flags(guess, simplified, postproc)
+            analyses = cache.get(form, flags)
+            if analyses is not None:
+                return list(analyses)
         analyses = []
         fsts = self.morphology.pos
 
@@ -1763,6 +1881,8 @@ class Language:
         if not analyses:
             # We have to really analyze it; first try lexical FSTs for each POS
             for pos in fsts:
+                if not self.morphology[pos].may_accept(form, simplified=simplified):
+                    continue
                 analysis = self.morphology[pos].anal(form, simplified=simplified)
                 if analysis:
                     # Keep trying if an analysis is found
@@ -1773,13 +1893,72 @@ class Language:
             if not analyses and guess:
                 # Accumulate results from all guessers
                 for pos in fsts:
+                    if not self.morphology[pos].may_accept(form, guess=True):
+                        continue
                     analysis = self.morphology[pos].anal(form, guess=True)
                     if analysis:
                         analyses.extend(self.proc_anal(form, analysis, pos,
                                                        citation=True, simplified=simplified,
                                                        guess=True, postproc=postproc))
+        if cache is not None:
+            cache.put(form, flags, list(analyses))
         return analyses
 
+    def open_anal_cache(self, path=None, max_entries=0):
+        '''Open (or create) a persistent cache of analyses at path, by default
+        anal_cache.db in the language directory. The morphology must be loaded,
+        since entries are tied to the current FST and lexicon files.
+
+        @param  path:        sqlite database file
+        @type   path:        string
+        @param  max_entries: if not 0, number of entries kept when the cache is
+                            trimmed (least recently used entries are deleted)
+        @type   max_entries: int
+        @return:             the cache
+        @rtype:              instance of AnalCache
+        '''
+        self.close_anal_cache()
+        self.anal_cache = AnalCache(self, path=path, max_entries=max_entries)
+        return self.anal_cache
+
+    def close_anal_cache(self):
+        '''Write and close the persistent analysis cache if there is one.'''
+        if getattr(self, 'anal_cache', None) is not None:
+            self.anal_cache.close()
+        self.anal_cache = None
+
+    def preload_anals(self, forms=None, infile=None, guess=True, lower=True):
+        '''Make sure the analyses of a vocabulary are in the persistent cache
+        and in memory, analyzing the words that haven't been analyzed before.
+
+        @param  forms:  word forms
+        @type   forms:  iterable of strings
+        @param  infile: a file whose words are to be added to forms
+        @type   infile: string
+        @param  guess:  whether to use guesser FSTs
+        @type   guess:  boolean
+        @param  lower:  whether to lowercase words in infile
+        @type   lower:  boolean
+        @return:        the number of words that had to be analyzed
+        @rtype:         int
+        '''
+        cache = self.anal_cache if self.anal_cache is not None else self.open_anal_cache()
+        forms = set(forms or [])
+        if infile:
+            with open(infile, encoding='utf-8') as file:
+                for line in file:
+                    line = self.morphology.sep_punc(line)
+                    forms.update(line.lower().split() if lower else line.split())
+        flags = AnalCache.flags(guess)
+        # Analyze missing forms without going through the cache again
+        self.anal_cache = None
+        try:
+            missing = cache.preload(forms, flags,
+                                    analyze=lambda form: self.anal_word(form, guess=guess))
+        finally:
+            self.anal_cache = cache
+        return len(missing)
+
     def proc_anal(self, form, analyses, pos, citation=True,
                   simplified=False, guess=False, postproc=False):
         '''Process analyses according to various options, returning a list of analysis tuples.
@@ -1835,12 +2014,22 @@ class Language:
 #        print('Gen word {}, pos {}, feat_dict {}, daughters {}, mothers {}, forms {}'.format(root, pos, feat_dict, daughters, mothers, forms))
         if not feat_dict:
             return "*" + root + "*"
-        # Skip this for now; features may change in gen_from_dict()
-#        feat_hashable = tuple(sorted(feat_dict.items()))
-#        print(pos, root, feat_dict)
-#        args = (pos,root,feat_hashable)
-#        if args in self.generated_words:
-#            return self.generated_words[args]
+        # Features may change in gen_from_dict(), so the FSS is always created
+        # and the cache is keyed by it rather than by feat_dict
+        pos, fss = self.gen_fss(pos, feat_dict, daughters, mothers, forms, del_nodes)
+        if fss is None:
+            return
+        if verbose:
+            print('Generating', pos, root, feat_dict, fss.__repr__())
+        output = self.gen_transduce(pos, root, fss)
+        if output:
+            return output
+        print(pos, root, feat_dict, fss, "can't be generated")
+        return
+
+    def gen_fss(self, pos, feat_dict, daughters=None, mothers=None, forms=None, del_nodes=None):
+        """The POS to generate with and the FSSet for feat_dict; None for the
+        FSSet if the POS can't be generated."""
         if 'pos' not in feat_dict:
             feat_dict['pos'] = pos
         morf = self.morphology
@@ -1849,21 +2038,47 @@ class Language:
                 pos = 'all'
             else:
                 print(pos, "can't be generated")
-                return
+                return pos, None
         if self.dict2fs:
             fss = self.dict2fs(feat_dict)
         else:
             fss = self.gen_from_dict(pos, feat_dict, daughters, mothers, forms, del_nodes)
 #        print('FSS {}'.format(fss.__repr__()))
-        posmorf = morf[pos]
-        if verbose:
-            print('Generating', pos, root, feat_dict, fss.__repr__())
-        output = posmorf.gen(root, fss, postproc=self.postproc)
-        if output:
-#            self.generated_words[args] = output[0][0]
-            return output[0][0]
-        print(pos, root, feat_dict, fss, "can't be generated")
-        return
+        return pos, fss
+
+    @staticmethod
+    def gen_key(pos, root, fss):
+        """Cache key for generating root with fss: the canonical strings of the
+        feature structures don't depend on object identity or hash seed."""
+        if isinstance(fss, (set, frozenset, list, tuple)):
+            return pos, root, tuple(sorted(fs.__repr__() for fs in fss))
+        return pos, root, (fss.__repr__(),)
+
+    def gen_transduce(self, pos, root, fss):
+        """The first wordform generated for root with fss, or None,
+        remembered in a bounded LRU table."""
+        cache = getattr(self, 'gen_cache', None)
+        if cache is None:
+            # Languages pickled before there was a cache
+            cache = self.gen_cache = collections.OrderedDict()
+            self.gen_hits = self.gen_misses = 0
+        key = Language.gen_key(pos, root, fss)
+        if key in cache:
+            cache.move_to_end(key)
+            self.gen_hits += 1
+            return cache[key]
+        self.gen_misses += 1
+        output = self.morphology[pos].gen(root, fss, postproc=self.postproc)
+        output = output[0][0] if output else None
+        if len(cache) >= Language.max_gen_cache:
+            cache.popitem(last=False)
+        cache[key] = output
+        return output
+
+    def clear_gen_cache(self):
+        """Empty the gen_word() cache, for example after changing the FSTs."""
+        self.gen_cache = collections.OrderedDict()
+        self.gen_hits = self.gen_misses = 0
 
     # Functions for doing only morphology analysis or generation
     def analyze(self, form, root=True, pos=True, gram=True,
@@ -1910,9 +2125,9 @@ class Language:
             # Save words already analyzed to avoid repetition
             saved = saved or {}
             # If nlines is not 0, keep track of lines read
-            lines = filein.readlines()
+            lines = filein
             if start or nlines:
-                lines = lines[start:start+nlines]
+                lines = itertools.islice(filein, start, start+nlines if nlines else None)
             for line in lines:
                 output = ''
                 # Separate punctuation from words
@@ -1946,6 +2161,135 @@ class Language:
         except IOError:
             print('No such file or path; try another one.')
 
+    def analyze_corpus(self, infile, outfile, processes=None, chunk_lines=100000,
+                       resume=True, lower=True, guess=True, verbosity=1):
+        '''Analyze the words in a sentence-per-line corpus, writing the analyses
+        to outfile in the .anl format read by hiiktuu.learn.Corpus.read():
+        words separated by spaces, each either a bare form or
+        form;root:pos:features|root:pos:features...
+
+        The corpus is handled chunk_lines lines at a time. The unique forms in
+        each chunk that haven't been seen already are analyzed in a pool of
+        processes, then the chunk's lines are written. After each chunk, the
+        number of lines done and the size of outfile are saved in
+        outfile.progress, so an interrupted run can resume where it stopped.
+
+        @param  infile:      corpus file
+        @type   infile:      string
+        @param  outfile:     file for analyses
+        @type   outfile:     string
+        @param  processes:   number of worker processes (default: number of CPUs);
+                            1 to analyze in this process
+        @type   processes:   int
+        @param  chunk_lines: number of lines in each chunk
+        @type   chunk_lines: int
+        @param  resume:      whether to continue from outfile.progress if it exists
+        @type   resume:      boolean
+        @param  lower:       whether to lowercase the corpus
+        @type   lower:       boolean
+        @param  guess:       whether to use guesser FSTs
+        @type   guess:       boolean
+        @return:             number of lines analyzed
+        @rtype:              int
+        '''
+        progress_file = outfile + '.progress'
+        done, offset = 0, 0
+        if resume and os.path.exists(progress_file) and os.path.exists(outfile):
+            with open(progress_file) as file:
+                done, offset = [int(x) for x in file.read().split()]
+            if verbosity:
+                print('Resuming analysis of {} at line {}'.format(infile, done))
+        processes = processes or os.cpu_count() or 1
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            # Workers share the loaded FSTs only if they're forked
+            processes = 1
+        # .anl representations of forms
+        anl = {}
+        pool = None
+        try:
+            with open(infile, encoding='utf-8') as filein, \
+                 open(outfile, 'r+' if done else 'w', encoding='utf-8') as fileout:
+                # Drop anything written after the last completed chunk
+                fileout.seek(offset)
+                fileout.truncate()
+                lines = itertools.islice(filein, done, None)
+                while True:
+                    chunk = list(itertools.islice(lines, chunk_lines))
+                    if not chunk:
+                        break
+                    # First pass: the chunk's new forms
+                    sentences = []
+                    new = set()
+                    for line in chunk:
+                        line = self.morphology.sep_punc(line)
+                        words = line.lower().split() if lower else line.split()
+                        sentences.append(words)
+                        new.update(w for w in words if w not in anl)
+                    new = list(new)
+                    if processes > 1 and len(new) > processes:
+                        if not pool:
+                            # Load FSTs before forking so the workers share them
+                            self.preload_fsts(guess=guess)
+                            pool = multiprocessing.get_context('fork').Pool(processes,
+                                                                           _anl_init, (self, guess))
+                        anl.update(pool.imap_unordered(_anl_form, new, chunksize=64))
+                    else:
+                        anl.update((form, self.anl_form(form, guess=guess)) for form in new)
+                    # Second pass: write the analyzed lines
+                    for words in sentences:
+                        print(' '.join(anl[w] for w in words), file=fileout)
+                    fileout.flush()
+                    done += len(chunk)
+                    with open(progress_file, 'w') as file:
+                        print(done, fileout.tell(), file=file)
+                    if verbosity:
+                        print('Analyzed {} lines, {} forms'.format(done, len(anl)))
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+        # Finished, so there's nothing to resume (there's no progress file if
+        # no chunk was written)
+        if os.path.exists(progress_file):
+            os.remove(progress_file)
+        return done
+
+    def anl_form(self, form, guess=True):
+        '''The .anl representation of the analyses of form.'''
+        strings = []
+        for pos, root, cite, fs in self.anal_word(form, guess=guess):
+            if not root or root == form:
+                root = '*'
+            string = '{}:{}'.format(root, pos.replace('?', ''))
+            feats = Language.anl_feats(fs)
+            if feats:
+                string += ':' + feats
+            if string not in strings:
+                strings.append(string)
+        if not strings:
+            return form
+        return form + ';' + '|'.join(strings)
+
+    @staticmethod
+    def anl_feats(fs):
+        '''Minimal string for a FeatStruct, with only True and non-empty values
+        and no quotes, as hiiktuu.features.DictStringParser expects.'''
+        segments = []
+        for feat, value in sorted(fs.items()):
+            if value is True:
+                segments.append('+' + feat)
+            elif value is False or value is None or value == 'nil':
+                continue
+            elif isinstance(value, morphology.FeatStruct):
+                value = Language.anl_feats(value)
+                if value:
+                    segments.append(feat + '=' + value)
+            else:
+                segments.append('{}={}'.format(feat, value).replace(' ', '_'))
+        if segments:
+            return '[' + ','.join(segments) + ']'
+        return ''
+
     def generate(self, pos, root, feat_dict, verbose=False):
         """Attempt to generate a wordform given POS, root, and dict of syntactic
         features and values (which must first be converted a set of morphological
@@ -1996,25 +2340,34 @@ class Language:
             l.morphology_loaded = True
 
     def pickle(self, grammar, decouple_morph=True, verbosity=1):
-        """Save language as a python pickle, for quick loading later.
+        """Save language and its lexicon as separate python pickles in the
+        artifact cache, for quick loading later.
         Decouple morphology first so the pickle isn't enormous."""
         if verbosity > 1:
             print("Pickling {0}:{1} for later".format(self.name, grammar or self.abbrev))
+        grammar = grammar or self.abbrev
         fsts = None
-        if self.morph_processing and decouple_morph:
+        loaded = self.morphology_loaded
+        decouple = self.morph_processing and decouple_morph and self.morphology is not None
+        if decouple:
             fsts = self.morphology.unset_fsts()
             self.morphology_loaded = False
 
-        path = Language.get_picklepath(self.abbrev, grammar or self.abbrev)
-
 #        print("Pickling {} with morphology {}".format(self, self.morphology))
-        
-        with open(path, "wb") as stream:
-            pickle.dump(self, stream)
-        
-        if self.morph_processing and decouple_morph:
-            self.morphology_reset_fsts(fsts)
-            self.morphology_loaded = True
+
+        key = Language.get_picklekey(self.abbrev, grammar)
+        try:
+            # Each pickle refers to the object in the other one by a persistent id
+            lexicon = self.lexicon
+            ArtifactCache.write(self.abbrev, grammar, 'language', key, self,
+                                {id(lexicon): 'lexicon'} if lexicon else None)
+            if lexicon:
+                ArtifactCache.write(self.abbrev, grammar, 'lexicon', key, lexicon,
+                                    {id(self): 'language'})
+        finally:
+            if decouple:
+                self.morphology.reset_fsts(fsts)
+                self.morphology_loaded = loaded
 
         self.pickled = True
 
@@ -2052,7 +2405,65 @@ class Language:
     @staticmethod
     def load_langs(lang_ids, analysis=True, generation=True, lexicon=True,
                    force=False, pickle=True, flatten=False, learn=False,
-                   load_morpho=True, grammar='', semantics=True, verbosity=1):
+                   load_morpho=True, grammar='', semantics=True, snapshot=False,
+                   verbosity=1):
+        """If snapshot is True, use a lexicon snapshot for the languages (see
+        lexsnapshot.py) if there is a current one, and otherwise write one
+        after the lexicons are loaded and linked."""
+        languages = []
+        # A snapshot is only needed if some of the languages aren't loaded yet
+        snapshot = snapshot and (force or not all(l in Language.LANGUAGES for l in lang_ids))
+        # Other processes loading the languages at the same time wait while
+        # this one builds them and saves the snapshot and pickles
+        with ArtifactCache.lock(lang_ids[0], grammar, enabled=snapshot or pickle):
+            if snapshot:
+                snappath = Language.get_snapshotpath(lang_ids, grammar, flatten)
+                source = LexSnapshot.source_hash([Language.get_langdir(l) for l in lang_ids],
+                                                 (lang_ids, grammar, flatten, learn))
+                if not force:
+                    languages = LexSnapshot.load(snappath, source, verbosity=verbosity) or []
+                for lang in languages:
+                    Language.LANGUAGES[lang.abbrev] = lang
+                    # The snapshot is saved already; pickling the language
+                    # would unpickle every entry in it
+                    lang.pickled = True
+            if not languages:
+                languages = Language.load_lexicons(lang_ids, force=force, flatten=flatten, learn=learn,
+                                                   grammar=grammar, verbosity=verbosity)
+                if snapshot:
+                    Language.write_snapshot(languages, snappath, source, verbosity=verbosity)
+            if pickle:
+                if verbosity:
+                    print("Pickling")
+                for lang in languages:
+                    if not lang.pickled:
+                        lang.pickle(grammar, decouple_morph=False, verbosity=verbosity)
+        ## Morphology; not included in language pickle
+        if load_morpho:
+            for lang in languages:
+                if not lang.morphology_loaded:
+                    if not lang.pickled:
+                        print('Warning: loading morphology for unpickled language {}; pickle will be enormous'.format(lang))
+                    lang.load_morpho(guess=learn, analysis=analysis, generation=generation,
+                                     verbose=False)
+                else:
+                    print("{}'s morphology already loaded".format(lang))
+        ## Record link finalization for all language pairs
+#        for language1 in languages:
+#            for language2 in languages:
+#                if language1 == language2:
+#                    continue
+#                language1.linked_languages.append(language2)
+
+        Lex.ID = len(languages[0].lexicon.values())
+
+        return languages
+
+    @staticmethod
+    def load_lexicons(lang_ids, force=False, flatten=False, learn=False,
+                      grammar='', verbosity=1):
+        """Load the languages with lang_ids and their lexicons, flattening
+        them if flatten is True, and link them."""
         languages = []
         print("Loading languages: {}".format(', '.join(lang_ids)))
         for lang_id in lang_ids:
@@ -2085,33 +2496,23 @@ class Language:
             if verbosity:
                 print("Linking")
             Language.link(languages, flattened=flatten, verbosity=verbosity)
-        if pickle:
-            if verbosity:
-                print("Pickling")
-            for lang in languages:
-                if not lang.pickled:
-                    lang.pickle(grammar, decouple_morph=False, verbosity=verbosity)
-        ## Morphology; not included in language pickle
-        if load_morpho:
-            for lang in languages:
-                if not lang.morphology_loaded:
-                    if not lang.pickled:
-                        print('Warning: loading morphology for unpickled language {}; pickle will be enormous'.format(lang))
-                    lang.load_morpho(guess=learn, analysis=analysis, generation=generation,
-                                     verbose=False)
-                else:
-                    print("{}'s morphology already loaded".format(lang))
-        ## Record link finalization for all language pairs
-#        for language1 in languages:
-#            for language2 in languages:
-#                if language1 == language2:
-#                    continue
-#                language1.linked_languages.append(language2)
-
-        Lex.ID = len(languages[0].lexicon.values())
-
         return languages
 
+    @staticmethod
+    def write_snapshot(languages, path, source, verbosity=1):
+        """Write a lexicon snapshot of linked languages, decoupling any
+        morphology that's been loaded."""
+        loaded = [l for l in languages if l.morphology_loaded]
+        fsts = [l.morphology.unset_fsts() for l in loaded]
+        for l in loaded:
+            l.morphology_loaded = False
+        try:
+            LexSnapshot.write(path, languages, source, verbosity=verbosity)
+        finally:
+            for l, f in zip(loaded, fsts):
+                l.morphology.reset_fsts(f)
+                l.morphology_loaded = True
+
     @staticmethod
     def link(languages, flattened=True, verbosity=0):
         """
@@ -2167,9 +2568,30 @@ class Language:
         @param  learn:       whether learning will take place during processing
         @type   learn        boolean
         """
+        # Other processes loading the language at the same time wait while
+        # this one builds and pickles it, and then load the pickle
+        with ArtifactCache.lock(lang_id, grammar or lang_id, enabled=pickle and not morpho_only):
+            language = Language.load1(lang_id, analysis=analysis, generation=generation,
+                                      lexicon=lexicon, force=force, pickle=pickle,
+                                      flatten_lexicon=flatten_lexicon, morpho_only=morpho_only,
+                                      learn=learn, grammar=grammar, verbosity=verbosity)
+        ## Morphology; do this *after* pickling so it's not included in the pickled grammar,
+        ## which will otherwise be *humongous*
+        if load_morpho or morpho_only:
+            language.load_morpho(guess=learn, analysis=analysis, generation=generation,
+                                 verbose=False)
+        return language
+
+    @staticmethod
+    def load1(lang_id, analysis=True, generation=True, lexicon=True,
+              force=False, pickle=True, flatten_lexicon=False,
+              morpho_only=False, learn=False, grammar='', verbosity=1):
+        """Load (and pickle) the language with lang_id and its lexicon, but not
+        its morphology; the arguments are as for load()."""
         language = None
         # Use the pickled grammar/lexicon if force is False and there is a pickle
-        pkl = not force and Language.load_pickle(lang_id, grammar, verbosity=verbosity)
+        pkl = not force and Language.load_pickle(lang_id, grammar, lexicon=lexicon and not morpho_only,
+                                                 verbosity=verbosity)
         if pkl:
             language = pkl
         # Look for the grammar in a Python source file
@@ -2216,14 +2638,9 @@ class Language:
             if flatten_lexicon:
                 lex = lex.flatten()
             language.set_lexicon(lex)
-        if not pkl and pickle and not morpho_only:
+        if not language.pickled and pickle and not morpho_only:
             # Pickle the grammar/lexicon for the next time around
             language.pickle(grammar, verbosity=verbosity)
-        ## Morphology; do this *after* pickling so it's not included in the pickled grammar,
-        ## which will otherwise be *humongous*
-        if load_morpho or morpho_only:
-            language.load_morpho(guess=learn, analysis=analysis, generation=generation,
-                                 verbose=False)
         return language
     #    except ImportError:
     #        print("Language file not found")
@@ -2245,47 +2662,72 @@ class Language:
     ### Pickling and depickling languages
     
     @staticmethod
-    def load_pickle(lang_abbrev, grammar, verbosity=1):
-        """Load the language from the pickle if there's a recent available
-        one and force is False.
+    def load_pickle(lang_abbrev, grammar, lexicon=True, verbosity=1):
+        """Load the language from the artifact cache if there's a pickle made
+        from the current versions of its files, along with its lexicon if
+        lexicon is True. If the lexicon isn't loaded, the language's lexicon
+        is None. The language's pickled attribute is False only if the lexicon
+        was wanted and there isn't a pickle of it, so that load1() pickles the
+        language again once the lexicon is loaded.
         """
-        import glob
-        langdir = Language.get_langdir(lang_abbrev)
-        yamls = glob.glob(os.path.join(langdir, '*.yaml'))
-        sources = glob.glob(os.path.join(langdir, '*.py'))
-
-        mtimes = [os.path.getmtime(fn) for fn in yamls + sources]
-
-        picklepath = Language.get_picklepath(lang_abbrev, grammar or lang_abbrev)
-        if os.path.exists(picklepath):
-            pickletime = os.path.getmtime(picklepath)
-            if max(mtimes) < pickletime:
-                if verbosity:
-                    print("Using pickle for {}: {}; depickling".format(lang_abbrev, grammar))
-                return Language.depickle(lang_abbrev, grammar or lang_abbrev)
-
-    @staticmethod
-    def depickle(lang_abbrev, filename):
-#        print('Depickling {}'.format(lang_abbrev))
-        path = Language.get_picklepath(lang_abbrev, filename)
-
-        with open(path, "rb") as stream:
-            language = pickle.load(stream)
-
+        grammar = grammar or lang_abbrev
+        key = Language.get_picklekey(lang_abbrev, grammar)
+        def resolve(pid):
+            # The lexicon is stored separately
+            return None
+        language = ArtifactCache.load(lang_abbrev, grammar, 'language', key, resolve)
+        if not language:
+            return None
+        if verbosity:
+            print("Using pickle for {}: {}; depickling".format(lang_abbrev, grammar))
+        language.lexicon = None
         language.pickled = True
-
+        if lexicon:
+            lex = ArtifactCache.load(lang_abbrev, grammar, 'lexicon', key, lambda pid: language)
+            if lex is not None:
+                language.lexicon = lex
+            else:
+                language.pickled = False
         return language
 
+    @staticmethod
+    def get_picklekey(lang_abbrev, grammar):
+        """Pickles are named by a hash of the contents of the language's files."""
+        return ArtifactCache.source_hash(Language.get_langdir(lang_abbrev), lang_abbrev, grammar)
+
     @staticmethod
     def get_langdir(lang_abbrev):
         path = os.path.join(LANGUAGE_DIR, lang_abbrev)
         return path
 
     @staticmethod
-    def get_picklepath(lang_abbrev, filename):
-        return os.path.join(Language.get_langdir(lang_abbrev), filename + '.pkl')
+    def get_snapshotpath(lang_abbrevs, grammar, flatten=False):
+        """Lexicon snapshots are kept with the artifacts of the first language."""
+        scope = ArtifactCache.scope(Language.get_langdir(lang_abbrevs[0]))
+        return ArtifactCache.get_path(lang_abbrevs[0], grammar, 'snapshot',
+                                      '{}.{}{}'.format(scope, '_'.join(lang_abbrevs),
+                                                       '_flat' if flatten else ''),
+                                      ext='.lxs')
 
     @staticmethod
     def find(lang_abbrev):
         """Just return the language with abbreviation lang_abbrev."""
         return Language.LANGUAGES.get(lang_abbrev)
+
+## Worker processes for Language.analyze_corpus(); forked, so the language
+## and its FSTs are inherited rather than loaded again.
+
+_ANL_LANGUAGE = None
+_ANL_GUESS = True
+
+def _anl_init(language, guess):
+    global _ANL_LANGUAGE, _ANL_GUESS
+    _ANL_LANGUAGE = language
+    _ANL_GUESS = guess
+    cache = getattr(language, 'anal_cache', None)
+    if cache is not None:
+        # Workers exit without running atexit functions
+        multiprocessing.util.Finalize(cache, cache.commit, exitpriority=10)
+
+def _anl_form(form):
+    return form, _ANL_LANGUAGE.anl_form(form, guess=_ANL_GUESS)
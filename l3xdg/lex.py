@@ -207,6 +207,11 @@
 # 2014.02.04
 # -- Method for creating entry with crosslingual features already "inherited" (spelled out),
 #    lexify_cross_inh()
+# 2026.10.17
+# -- light_clone() makes a shallow copy of a Lex for the inheritance cache.
+# -- inst_lexeme() no longer adds the instantiated lexeme to the lexicon.
+# -- light_clone() gives the copy its own LexDims, so that changes to the
+#    LexDims of a node's entries don't reach the inheritance cache.
 
 # Needed to check on dimension names in crosslex attributes (at least)
 from .utils import DIMENSIONS, PARSE, GENERATE, TRANSLATE
@@ -482,13 +487,26 @@ class Lex:
             copied.source_id = self.id
         return copied
 
+    def light_clone(self):
+        """A copy of this Lex with its own LexDims and names dict, sharing its
+        crosslexes and classes, which nodes don't change. Used for entries in
+        the inheritance cache (Lexicon.get_inherited())."""
+        copied = copy.copy(self)
+        copied.names = self.names.copy()
+        copied.dims = {}
+        for abbrev, dim in self.dims.items():
+            copied.set_lexdim(abbrev, dim.clone(lex=copied))
+        copied.cloned = Lex.cloneID
+        Lex.cloneID += 1
+        return copied
+
     def inst_lexeme(self, word):
         """Create an entry for an 'instantiated lexeme', a specific form that has already been
-        analyzed and had its agreement features incorporated. lex is cloned lexeme entry."""
-        # First clone the clone because we're going to add it to the lexicon
+        analyzed and had its agreement features incorporated. lex is cloned lexeme entry.
+        The entry isn't added to the lexicon; Lexicon.incorp_analyses() stores it."""
+        # First clone the clone because we're going to store it
         inst = self.clone(disjoint=False, temp=False, new_id=True)
         inst.word = word
-        self.lexicon.add_lex1(word, inst, existing=word in self.lexicon)
         return inst
 
     def lexify_cross_inh(self, word):
@@ -210,11 +210,27 @@
 # -- New method for creating and incorporating 'inherited crossling' lexical entries,
 #    replacing corresponding ones with crosslexes that have not been filled in,
 #    incorp_cross_inh().
+# 2026.10.17
+# -- flatten() no longer checks each entry against a list of all the values
+#    in the new lexicon, which took time quadratic in the size of the lexicon.
+#    The values are lists of entries, so the test never succeeded; entries
+#    stored under several keys (name, root, partitions) are inherited for
+#    each key as before.
+# -- Lexicon keeps a bounded LRU cache of the entries that Node.initialize()
+#    ends up with after lexicalization and inheritance (get_inherited(),
+#    cache_inherited()); it isn't pickled.
+# -- Lexemes instantiated by incorp_analyses() are kept in a bounded LRU store
+#    of word forms (add_inst(), get_inst()) alongside the lexicon rather than
+#    added to it, so the lexicon no longer grows with each analyzed form.
+#    lexicalize() looks up word forms in the store too. When a form is evicted,
+#    the language forgets its analysis so that it's analyzed again.
+# -- analyses_key() identifies lexes by their Lex ids rather than object ids,
+#    which can be reused when entries are replaced.
 
 # Needed to check on dimension names in crosslex attributes (at least)
 from .utils import DIMENSIONS, PARSE, GENERATE, TRANSLATE
 from .lex import *
-import os, re, yaml
+import os, re, yaml, collections
 
 # String key for entries for unknown words.
 UNKNOWN = '*'
@@ -291,9 +307,21 @@ class Lexicon(dict):
         # after other languages are created
         self.crosslexes_waiting = []
 
+    # Maximum number of inherited entry lists in inh_cache
+    max_inh_cache = 5000
+    # Maximum number of word forms in inst_cache
+    max_inst_cache = 10000
+
     def __repr__(self):
         return '%%{}'.format(self.language.name)
 
+    def __getstate__(self):
+        # Don't pickle the inheritance cache
+        state = self.__dict__.copy()
+        for attr in ('inh_cache', 'inh_hits', 'inh_misses'):
+            state.pop(attr, None)
+        return state
+
     def incorp_cross_inh(self, word, lexes):
         """Incorporate 'cross-inherited' entries, replacing those already in the lexicon
         without inheritance."""
@@ -307,16 +335,25 @@ class Lexicon(dict):
         for id, l in new_lex.items():
             print("Incorporating cross-inherited entries {}, old id {}".format(l, id))
         old_entries = self.get(word)
-        print("Old entries: {}".format(old_entries))
+        if old_entries:
+            print("Old entries: {}".format(old_entries))
+            new_entries = Lexicon.replace_entries(old_entries, new_lex)
+            print("New entries: {}".format(new_entries))
+            self[word] = new_entries
+        # Lexemes instantiated for word by incorp_analyses()
+        self.replace_inst(word, new_lex)
+
+    @staticmethod
+    def replace_entries(entries, new_lex):
+        """entries with each one replaced by the entries in new_lex under its id."""
         new_entries = []
-        for l in old_entries:
+        for l in entries:
             new_ee = new_lex.get(l.id)
             if new_ee:
                 new_entries.extend(new_ee)
             else:
                 new_entries.append(l)
-        print("New entries: {}".format(new_entries))
-        self[word] = new_entries
+        return new_entries
 
     def read(self, lexicon_list):
         """Fill in the lexicon from a lexicon list read in from a file."""
@@ -754,10 +791,7 @@ class Lexicon(dict):
                 continue
             new_entries = []
             for entry in [e for e in entries if e.is_lexical()]:
-                if entry in list(lexicon.values()):
-                    print('{} already in lexicon'.format(entry))
-                    continue
-                elif entry.name != name and name[0] not in [UNKNOWN, '!', '%', '#', '@'] and not entry.root:
+                if entry.name != name and name[0] not in [UNKNOWN, '!', '%', '#', '@'] and not entry.root:
                     # Ignore entries that do not have the same name as the key,
                     # that is, roots of lexical partitions,
                     # unless they begin with '!' or '%' or '#' or '@' or contain '*'
@@ -970,6 +1004,8 @@ class Lexicon(dict):
         # Lexicalize a wordform
         else:
             lexs = [lex for lex in self.get(name, []) if lex.word]
+            # Lexemes already instantiated for the form
+            lexs.extend(self.get_inst(name))
 #        lexs = [lex for lex in self.get(name, []) if not word or lex.word] # or lex.label]
         if not lexs and word and not any_other and not classes and not analyze:
             l = self.get_unknown(name=name, clone=True)
@@ -1019,7 +1055,9 @@ class Lexicon(dict):
         """Incorporate morphological analyses into root lexical entry, returning None if the
         entry is incompatible with any analyses.
         analyses is a list of [lex, feats] pairs.
-        dimensions are agreement dimensions."""
+        dimensions are agreement dimensions.
+        If cache is True, the result is a list of instantiated lexemes, which are
+        stored so that lexicalize() finds them for word next time."""
         result = []
         for analysis in analyses:
 #            print('{}: analysis {}'.format(node, analysis))
@@ -1097,6 +1135,8 @@ class Lexicon(dict):
                 new_lexs.append(new_l)
 #                copies.append(new_l.clone(disjoint=False, temp=True))
             print('Created new lexs {}'.format(new_lexs))
+            if word:
+                self.add_inst(word, new_lexs)
             return new_lexs
         return result
 
@@ -1266,6 +1306,108 @@ class Lexicon(dict):
                                                  is_source=False, src_language=src_language,
                                                  verbosity=verbosity)
 
+    ## Cache of inherited node entries
+
+    def get_inherited(self, key):
+        """Copies of the entries stored for key by cache_inherited(), or None."""
+        cache = getattr(self, 'inh_cache', None)
+        if cache is None:
+            # Lexicons pickled before there was a cache
+            cache = self.inh_cache = collections.OrderedDict()
+            self.inh_hits = self.inh_misses = 0
+        entries = cache.get(key)
+        if entries is None:
+            self.inh_misses += 1
+            return None
+        cache.move_to_end(key)
+        self.inh_hits += 1
+        return [e.light_clone() for e in entries]
+
+    def cache_inherited(self, key, entries):
+        """Store copies of entries resulting from lexicalization and inheritance
+        for the node described by key (see Node.inh_key()), evicting the least
+        recently used entries if there are more than max_inh_cache."""
+        cache = self.inh_cache
+        if len(cache) >= Lexicon.max_inh_cache:
+            cache.popitem(last=False)
+        cache[key] = [e.light_clone() for e in entries]
+
+    def clear_inh_cache(self):
+        """Empty the inheritance cache, for example after changing the lexicon."""
+        self.inh_cache = collections.OrderedDict()
+        self.inh_hits = self.inh_misses = 0
+
+    @staticmethod
+    def analyses_key(analyses):
+        """A hashable version of a list of (lex, features) morphological analyses.
+        The lexes are lexicon entries, so they're represented by their Lex ids,
+        which (unlike object ids) aren't reused when entries are replaced."""
+        if not analyses:
+            return ()
+        return tuple((lex.id, lex.name, Lexicon.feats_key(feats)) for lex, feats in analyses)
+
+    @staticmethod
+    def feats_key(feats):
+        if isinstance(feats, dict):
+            return tuple(sorted(((f, Lexicon.feats_key(v)) for f, v in feats.items()), key=repr))
+        elif isinstance(feats, (set, frozenset)):
+            return frozenset(Lexicon.feats_key(v) for v in feats)
+        elif isinstance(feats, (list, tuple)):
+            return tuple(Lexicon.feats_key(v) for v in feats)
+        return feats
+
+    ## Store of lexemes instantiated from morphological analyses
+
+    def get_inst(self, word):
+        """Lexemes instantiated for word that are in the store."""
+        cache = getattr(self, 'inst_cache', None)
+        if cache is None:
+            # Lexicons pickled before there was a store
+            self.clear_inst_cache()
+            cache = self.inst_cache
+        insts = cache.get(word)
+        if insts is None:
+            self.inst_misses += 1
+            return []
+        cache.move_to_end(word)
+        self.inst_hits += 1
+        return insts
+
+    def add_inst(self, word, insts):
+        """Add lexemes instantiated for word to the store, evicting the least
+        recently used word if there are more than max_inst_cache."""
+        if getattr(self, 'inst_cache', None) is None:
+            self.clear_inst_cache()
+        cache = self.inst_cache
+        stored = cache.get(word)
+        if stored is None:
+            if len(cache) >= Lexicon.max_inst_cache:
+                old_word, old_insts = cache.popitem(last=False)
+                # Make sure the form gets analyzed again
+                self.language.forget_anal(old_word)
+            stored = cache[word] = []
+        else:
+            cache.move_to_end(word)
+        # Entry indices follow those of the entries in the lexicon
+        index = len(self.get(word, [])) + len(stored)
+        for i, inst in enumerate(insts):
+            inst.entry_index = index + i
+        stored.extend(insts)
+
+    def replace_inst(self, word, new_lex):
+        """Replace stored lexemes for word with the entries in new_lex under their ids."""
+        cache = getattr(self, 'inst_cache', None)
+        if cache and word in cache:
+            cache[word] = Lexicon.replace_entries(cache[word], new_lex)
+
+    def clear_inst_cache(self):
+        """Empty the store of instantiated lexemes."""
+        if getattr(self, 'inst_cache', None):
+            for word in self.inst_cache:
+                self.language.forget_anal(word)
+        self.inst_cache = collections.OrderedDict()
+        self.inst_hits = self.inst_misses = 0
+
     def get_classes(self, lex, languages='', clone=False):
         '''Get classes of lex within this lexicon and crosslexes in crosslexicon if there is one.'''
         # Get names of classes
@@ -0,0 +1,348 @@
+########################################################################
+#
+#   This file is part of the HLTDI L^3 project
+#       for parsing, generation, and translation within the
+#       framework of  Extensible Dependency Grammar.
+#
+#   Copyright (C) 2026
+#   The HLTDI L^3 Team <gasser@cs.indiana.edu>
+#
+#   This program is free software: you can redistribute it and/or
+#   modify it under the terms of the GNU General Public License as
+#   published by the Free Software Foundation, either version 3 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# 2026.10.17
+# -- Created.
+#    Compiled snapshots of the lexicons of a set of linked languages, as
+#    they are at the end of Language.load_langs(): read in, flattened if
+#    that was requested, finalized, and with their crosslexes finalized.
+#    Each Lex is pickled separately; the end of the file has an index of
+#    their offsets and a "skeleton" pickle of the Language objects, the
+#    lexicon dicts, and any objects that are shared by several entries.
+#    Loading a snapshot unpickles only the skeleton. Each Lex starts out
+#    as a LexStub and is unpickled from the (mmapped) file the first time
+#    one of its attributes is needed, after which it is an ordinary Lex.
+#    A snapshot records a hash of the files the lexicons are made from and
+#    is ignored if any of them changes.
+# 2026.10.18
+# -- source_hash() uses ArtifactCache.hash_files().
+
+import os, io, copy, mmap, types, struct, pickle, hashlib
+from .lex import Lex, Group
+from .crosslex import Crosslex
+from .lexicon import Lexicon
+from .artifacts import ArtifactCache
+
+# Types of objects that are never shared; immutable containers aren't
+# recorded either, but the objects in them are
+ATOMIC = {str, bytes, int, float, complex, bool, type(None), range, tuple, frozenset,
+          type, types.FunctionType, types.BuiltinFunctionType}
+
+class LexStub(Lex):
+    """A Lex whose attributes haven't been read from its snapshot yet.
+    Its only attribute is _stub, the snapshot and the Lex's serial number;
+    the first attempt to get any other attribute materializes it."""
+
+    def __getattr__(self, name):
+        # Only called for attributes that aren't found
+        if name == '_stub':
+            raise AttributeError(name)
+        self._materialize()
+        return getattr(self, name)
+
+    def _materialize(self):
+        snapshot, serial = self.__dict__['_stub']
+        state = snapshot.read_entry(serial)
+        self.__dict__.clear()
+        self.__dict__.update(state)
+        self.__class__ = Lex
+
+    ## Copying and pickling need the real attributes
+
+    def __reduce_ex__(self, protocol):
+        self._materialize()
+        return self.__reduce_ex__(protocol)
+
+    def __copy__(self):
+        self._materialize()
+        return copy.copy(self)
+
+    def __deepcopy__(self, memo):
+        self._materialize()
+        return copy.deepcopy(self, memo)
+
+class LexSnapshot:
+    """A compiled lexicon file for a set of linked languages."""
+
+    # Change this when the format of the file or the stored classes change
+    version = 1
+
+    MAGIC = b'L3LXSNAP'
+    FOOTER = struct.Struct('<QQ')
+
+    # Files in language directories that lexicons are made from
+    source_ext = ('.yaml', '.py', '.lex', '.gr', '.tok', '.inst', '.cls')
+    # Modules defining the classes of stored objects
+    source_modules = ('language.py', 'lexicon.py', 'lex.py', 'crosslex.py')
+
+    def __init__(self, path, stream, map, header):
+        self.path = path
+        self.stream = stream
+        self.map = map
+        self.offsets = header['offsets']
+        self.stubs = [None] * len(self.offsets)
+        self.lexicons = [Lexicon.__new__(Lexicon) for i in range(header['lexicons'])]
+        self.shared = []
+        # Number of Lexes materialized
+        self.loaded = 0
+
+    def __repr__(self):
+        return 'LexSnapshot({}, {}/{} loaded)'.format(self.path, self.loaded, len(self.offsets))
+
+    @staticmethod
+    def source_hash(dirs, options):
+        """A hash of the files in dirs that lexicons are made from, the modules
+        defining the stored classes, and options (load_langs() arguments)."""
+        h = hashlib.sha1('{}:{}'.format(LexSnapshot.version, options).encode())
+        return ArtifactCache.hash_files(h, dirs, LexSnapshot.source_ext,
+                                        LexSnapshot.source_modules)
+
+    ## Writing
+
+    @staticmethod
+    def write(path, languages, source, verbosity=0):
+        """Write a snapshot of languages and their lexicons to path. Morphology
+        FSTs should be decoupled first (see Language.pickle_all())."""
+        writer = SnapshotWriter(languages)
+        writer.scan_all()
+        tmp = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp, 'wb') as stream:
+            stream.write(LexSnapshot.MAGIC)
+            offsets = []
+            for lex in writer.lexes:
+                data = writer.dumps(lex.__dict__, entry=True)
+                offsets.append((stream.tell(), len(data)))
+                stream.write(data)
+            header_offset = stream.tell()
+            header = {'version': LexSnapshot.version, 'source': source,
+                      'offsets': offsets, 'lexicons': len(writer.lexicons),
+                      'counters': (Lex.ID, Lex.cloneID, Group.ID, Crosslex.ID, Lexicon.GID)}
+            stream.write(pickle.dumps(header, pickle.HIGHEST_PROTOCOL))
+            skeleton_offset = stream.tell()
+            skeleton = {'languages': languages,
+                        'lexicons': [(lexicon.__getstate__(), dict(lexicon)) for lexicon in writer.lexicons],
+                        'shared': [obj for obj, index in writer.shared.values()]}
+            stream.write(writer.dumps(skeleton, entry=False))
+            stream.write(LexSnapshot.FOOTER.pack(header_offset, skeleton_offset))
+        os.replace(tmp, path)
+        if verbosity:
+            print('Wrote lexicon snapshot {}: {} entries, {} shared objects'.format(path, len(offsets),
+                                                                                    len(writer.shared)))
+
+    ## Reading
+
+    @staticmethod
+    def load(path, source, verbosity=0):
+        """The languages in the snapshot at path, or None if there is no snapshot
+        or it wasn't made from the current source files."""
+        if not os.path.exists(path):
+            return None
+        stream = open(path, 'rb')
+        try:
+            map = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            stream.close()
+            return None
+        if map[:len(LexSnapshot.MAGIC)] != LexSnapshot.MAGIC:
+            map.close()
+            stream.close()
+            return None
+        header_offset, skeleton_offset = LexSnapshot.FOOTER.unpack(map[-LexSnapshot.FOOTER.size:])
+        header = pickle.loads(map[header_offset:skeleton_offset])
+        if header['version'] != LexSnapshot.version or header['source'] != source:
+            if verbosity:
+                print('Lexicon snapshot {} is out of date'.format(path))
+            map.close()
+            stream.close()
+            return None
+        snapshot = LexSnapshot(path, stream, map, header)
+        skeleton = snapshot.unpickle(skeleton_offset, len(map) - LexSnapshot.FOOTER.size)
+        snapshot.shared = skeleton['shared']
+        for lexicon, (state, entries) in zip(snapshot.lexicons, skeleton['lexicons']):
+            lexicon.__dict__.update(state)
+            dict.update(lexicon, entries)
+        # Don't give out IDs that stored objects already have
+        for cls, attr, value in zip((Lex, Lex, Group, Crosslex, Lexicon),
+                                    ('ID', 'cloneID', 'ID', 'ID', 'GID'),
+                                    header['counters']):
+            setattr(cls, attr, max(getattr(cls, attr), value))
+        if verbosity:
+            print('Loaded lexicon snapshot {}'.format(path))
+        return skeleton['languages']
+
+    def unpickle(self, start, end):
+        return SnapshotUnpickler(io.BytesIO(self.map[start:end]), self).load()
+
+    def read_entry(self, serial):
+        """The attributes of the Lex with serial number serial."""
+        offset, length = self.offsets[serial]
+        self.loaded += 1
+        return self.unpickle(offset, offset + length)
+
+    def resolve(self, pid):
+        kind, key = pid
+        if kind == 'lex':
+            stub = self.stubs[key]
+            if stub is None:
+                stub = object.__new__(LexStub)
+                stub.__dict__['_stub'] = (self, key)
+                self.stubs[key] = stub
+            return stub
+        elif kind == 'lexicon':
+            return self.lexicons[key]
+        else:
+            return self.shared[key]
+
+class SnapshotWriter:
+    """Assigns serial numbers to the Lexes and Lexicons reachable from a set
+    of languages and finds the other objects that are reachable from more
+    than one Lex or from a Lex and the skeleton; these are stored in the
+    skeleton so that they stay shared when entries are read separately."""
+
+    SKELETON = -1
+
+    def __init__(self, languages):
+        self.languages = languages
+        # id(obj): serial number
+        self.lex_serials = {}
+        self.lexes = []
+        self.lexicon_serials = {}
+        self.lexicons = []
+        # id(obj): owner, a Lex serial number or SKELETON
+        self.owners = {}
+        # id(obj): obj for objects owned by the skeleton and reachable from Lexes
+        self.shared = {}
+        # Shared objects whose contents still have to be scanned as part of
+        # the skeleton
+        self.rescan = []
+        # Objects created during pickling (by __reduce__ methods) are kept
+        # so that their ids aren't reused
+        self.keep = []
+
+    def scan_all(self):
+        skeleton = SnapshotWriter.SKELETON
+        self.scan(self.languages, skeleton)
+        lex_i = lexicon_i = 0
+        while lex_i < len(self.lexes) or lexicon_i < len(self.lexicons) or self.rescan:
+            while lexicon_i < len(self.lexicons):
+                lexicon = self.lexicons[lexicon_i]
+                self.scan((lexicon.__getstate__(), dict(lexicon)), skeleton)
+                lexicon_i += 1
+            while self.rescan:
+                obj = self.rescan.pop()
+                self.scan(obj, skeleton, root=obj)
+            while lex_i < len(self.lexes):
+                self.scan(self.lexes[lex_i].__dict__, lex_i)
+                lex_i += 1
+        for index, key in enumerate(self.shared):
+            self.shared[key] = (self.shared[key], index)
+
+    def scan(self, obj, owner, root=None):
+        ScanPickler(self, owner, root).dump(obj)
+
+    def record(self, obj, owner, root):
+        """Record obj as reachable from owner. Returns a (dummy) persistent id
+        for objects whose contents needn't be scanned (again)."""
+        if type(obj) in ATOMIC or obj is root:
+            return None
+        if isinstance(obj, Lex):
+            if id(obj) not in self.lex_serials:
+                self.lex_serials[id(obj)] = len(self.lexes)
+                self.lexes.append(obj)
+            return 'lex'
+        if isinstance(obj, Lexicon):
+            if id(obj) not in self.lexicon_serials:
+                self.lexicon_serials[id(obj)] = len(self.lexicons)
+                self.lexicons.append(obj)
+            return 'lexicon'
+        i = id(obj)
+        first = self.owners.get(i)
+        if first is None:
+            self.owners[i] = owner
+            self.keep.append(obj)
+            return None
+        if first == owner:
+            # Already scanned
+            return 'seen'
+        self.shared[i] = obj
+        self.owners[i] = SnapshotWriter.SKELETON
+        if owner == SnapshotWriter.SKELETON:
+            # Found in a Lex first; scan its contents here
+            return None
+        if first != SnapshotWriter.SKELETON:
+            # In two Lexes
+            self.rescan.append(obj)
+        return 'shared'
+
+    def persistent_id(self, obj, entry):
+        if type(obj) in ATOMIC:
+            return None
+        if isinstance(obj, Lex):
+            return ('lex', self.lex_serials[id(obj)])
+        if isinstance(obj, Lexicon):
+            return ('lexicon', self.lexicon_serials[id(obj)])
+        if entry:
+            shared = self.shared.get(id(obj))
+            if shared and shared[0] is obj:
+                return ('shared', shared[1])
+        return None
+
+    def dumps(self, obj, entry=True):
+        stream = io.BytesIO()
+        SnapshotPickler(stream, self, entry).dump(obj)
+        return stream.getvalue()
+
+class _NullStream:
+
+    def write(self, data):
+        return len(data)
+
+class ScanPickler(pickle.Pickler):
+
+    def __init__(self, writer, owner, root=None):
+        pickle.Pickler.__init__(self, _NullStream(), pickle.HIGHEST_PROTOCOL)
+        self.writer = writer
+        self.owner = owner
+        self.root = root
+
+    def persistent_id(self, obj):
+        return self.writer.record(obj, self.owner, self.root)
+
+class SnapshotPickler(pickle.Pickler):
+
+    def __init__(self, stream, writer, entry):
+        pickle.Pickler.__init__(self, stream, pickle.HIGHEST_PROTOCOL)
+        self.writer = writer
+        self.entry = entry
+
+    def persistent_id(self, obj):
+        return self.writer.persistent_id(obj, self.entry)
+
+class SnapshotUnpickler(pickle.Unpickler):
+
+    def __init__(self, stream, snapshot):
+        pickle.Unpickler.__init__(self, stream)
+        self.snapshot = snapshot
+
+    def persistent_load(self, pid):
+        return self.snapshot.resolve(pid)
@@ -94,9 +94,66 @@ Version 1.0
    don't have to be read in from files.
 -- 2013-06-26
    Eliminated reference to anything in letter_tree.py.
+-- 2026-10-17
+   Compiled binary FSTs (.fstb files): states and arcs in flat int arrays
+   indexing an interned string table of state labels, arc strings, and
+   weights. FST.write(binary=True) writes them; FST.restore() reads them
+   through mmap when they're newer than the .fst file(s), otherwise it
+   parses the .fst file(s) and writes the binary version.
+-- 2026-10-17
+   FSTIndex: a CSR (offsets + arc arrays) version of an FST with an index
+   from states and input symbols to arcs. FST.transduce(csr=True) finds
+   all paths breadth-first with it, expanding epsilon arcs within each
+   input position, and returns the same outputs in the same order as
+   step_transduce(). Output words are deduplicated with a set.
+-- 2026-10-17
+   FST.accepts(): whether the input side of the FST (ignoring weights and
+   outputs) accepts a word, using an FSTIndex acceptor determinized lazily
+   and cached, so words that an FST can't possibly analyze can be skipped
+   without transducing them.
+-- 2026-10-17
+   FSTCascade.compose_backwards() saves each intermediate composition as a
+   binary FST in the cascade's compose/ directory, keyed by content hashes
+   (FST.content_hash()) of the FSTs composed so far, and starts from the
+   longest saved one that is still current, so changing one FST only
+   recomposes it and the FSTs before it. FST.minimized() merges
+   equivalent states; cascades composed with minimize=True minimize each
+   intermediate result. time.clock() (gone from Python 3.8) replaced by
+   time.time().
+-- 2026-10-17
+   FST.determinized() determinizes an FST as an acceptor whose symbols are
+   (in_string, out_string, weight) triples; FST.minimized(determinize=True)
+   does this before merging states, and equal weights share one object.
+   FST.restore(minimize=True) minimizes restored FSTs and saves them in
+   .min.fstb files that record the original size. inverted(share=True)
+   shares states and arcs with the original FST. del_state() deletes the
+   weights of deleted arcs.
+-- 2026-10-17
+   If FST.BIN_DIR is set (see ArtifactCache in artifacts.py), compiled
+   binary FSTs are kept in a subdirectory of it for the FST's directory and
+   named by a hash of the FST's directory and a hash of the names, sizes,
+   and modification times of the .fst files (FST.binary_path()),
+   rather than kept next to the .fst files and compared by modification
+   time. Binary files are written to a temporary file that is renamed.
+-- 2026-10-17
+   Compiled binary FSTs (version 2) store the arcs leaving each state
+   together, with an offsets array, and the offsets of the strings in the
+   string table. FST.restore_binary() keeps the mapped file (FSTArrays)
+   instead of filling in the FST's dicts: transduce() (by default) and
+   accepts() use a CompiledFSTIndex over the arrays, whose state tables and
+   strings are made as they're needed, and the dicts are only made
+   (materialize()) when another method needs them. inverted(share=True)
+   shares the arrays of a compiled FST.
+-- 2026-10-17
+   FST.write_binary() only reports the file it writes if verbose. Arcs
+   whose weight is an empty FSSet or a false number keep it in binary FSTs
+   (version 3) instead of getting the default weight. *.fstb files are
+   ignored by git.
 """
 
-import re, os, copy, time, functools, glob
+import re, os, copy, time, functools, glob, sys, mmap, hashlib
+from array import array
+from operator import itemgetter
 from collections import deque
 # Required for weights.
 from .semiring import *
@@ -224,17 +281,26 @@ class FSTCascade(list):
         # Segmentation units
         self.seg_units = []
 
+        # Directory of the cascade file
+        self.directory = ''
+
     def __str__(self):
         """Print name for cascade."""
         return 'FST cascade ' + self.label
 
     def get_cas_dir(self):
+        if not self.language:
+            return self.directory
         return os.path.join(self.language.directory, 'cas')
         
     def get_fst_dir(self):
+        if not self.language:
+            return self.directory
         return os.path.join(self.language.directory, 'fst')
 
     def get_lex_dir(self):
+        if not self.language:
+            return self.directory
         return os.path.join(self.language.directory, 'lex')
 
     def add(self, fst):
@@ -251,12 +317,14 @@ class FSTCascade(list):
         return inv
 
     def compose(self, begin=0, end=None, first=None, last=None, subcasc=None, backwards=False,
-                relabel=True, trace=0):
-        """Compose the FSTs that make up the cascade list or a sublist, including possible first and last FSTs."""
+                relabel=True, minimize=False, cache=True, trace=0):
+        """Compose the FSTs that make up the cascade list or a sublist, including possible first and last FSTs.
+
+        Backwards composition is cached (see compose_backwards())."""
         if len(self) == 1:
             return self[0]
         elif backwards:
-            return self.compose_backwards(trace=trace)
+            return self.compose_backwards(subcasc=subcasc, minimize=minimize, cache=cache, trace=trace)
         else:
             fsts = []
             if subcasc:
@@ -287,7 +355,18 @@ class FSTCascade(list):
         # Compose from beginning to split_index
         return self.compose(begin=begin, end=split_index, last=c1, trace=trace)
 
-    def compose_backwards(self, indices=[], subcasc=None, trace=0):
+    # Subdirectory of the cascade's directory for saved intermediate compositions
+    compose_dir = 'compose'
+    # Change this when the way compositions are made changes
+    compose_version = 1
+
+    def compose_backwards(self, indices=[], subcasc=None, minimize=False, cache=True, trace=0):
+        """Compose the FSTs from the last one back to the first.
+
+        If cache is True and the cascade was loaded from a directory, each
+        intermediate composition is saved there, keyed by the contents of the
+        FSTs composed so far, and composition starts from the longest saved one
+        that is still current. If minimize is True, each composition is minimized."""
         if not indices:
             if subcasc:
                 # Use a copy of the cascade indices because we're going to reverse them
@@ -295,11 +374,64 @@ class FSTCascade(list):
             else:
                 indices = list(range(len(self)))
         indices.reverse()
-        c = FST.compose([self[indices[1]], self[indices[0]]], trace=trace)
-        for n in indices[2:]:
-            c = FST.compose([self[n], c], trace=trace)
+        fsts = [self[n] for n in indices]
+        directory = os.path.join(self.directory, FSTCascade.compose_dir) if cache and self.directory else ''
+        c = fsts[0]
+        start = 1
+        if directory:
+            prefix = self.label + ('-' + subcasc if subcasc else '')
+            keys = self.compose_keys(fsts, minimize)
+            for step in range(len(fsts) - 1, 0, -1):
+                path = FSTCascade.compose_path(directory, prefix, step, keys[step])
+                if os.path.exists(path):
+                    if trace:
+                        print('Restoring composition of {} FSTs from {}'.format(step + 1, path))
+                    c = FST.restore_binary(path, cascade=self, weighting=self._weighting)
+                    start = step + 1
+                    break
+        for step in range(start, len(fsts)):
+            c = FST.compose([fsts[step], c], trace=trace)
+            if minimize:
+                c = c.minimized(label=c.label, trace=trace)
+            if directory:
+                self.save_composition(c, directory, prefix, step, keys[step])
         return c
 
+    def compose_keys(self, fsts, minimize=False):
+        """Hex digests identifying the compositions of fsts[:1], fsts[:2], ...,
+        based on the contents of the FSTs and the cascade's weighting and
+        stringsets, which composition depends on."""
+        h = hashlib.sha1()
+        h.update('{} {} {}\0'.format(FSTCascade.compose_version, FST.BIN_VERSION, minimize).encode())
+        for name, semiring in (('uni', UNIFICATION_SR), ('prob', PROBABILITY_SR), ('trop', TROPICAL_SR)):
+            if self._weighting is semiring:
+                h.update(name.encode())
+        for label in sorted(self._stringsets):
+            h.update('\0{}={}'.format(label, ','.join(sorted(self._stringsets[label]))).encode('utf-8'))
+        keys = []
+        key = h.hexdigest()
+        for fst in fsts:
+            key = hashlib.sha1((key + fst.content_hash()).encode()).hexdigest()
+            keys.append(key)
+        return keys
+
+    @staticmethod
+    def compose_path(directory, prefix, step, key):
+        return os.path.join(directory, '{}.{}.{}{}'.format(prefix, step, key, FST.BIN_EXT))
+
+    def save_composition(self, fst, directory, prefix, step, key):
+        """Save a composition, deleting earlier versions of it."""
+        path = FSTCascade.compose_path(directory, prefix, step, key)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            FST.write_binary(fst, path)
+        except OSError as e:
+            print('  Could not save composition {}: {}'.format(path, e))
+            return
+        for old in glob.glob(FSTCascade.compose_path(directory, glob.escape(prefix), step, '*')):
+            if old != path:
+                os.remove(old)
+
     def composition(self, begin=0, end=None):
         """The composed FSTs."""
         if not self._composition:
@@ -491,6 +623,7 @@ class FSTCascade(list):
         cascade = FSTCascade(label)
         cascade.language = language
         cascade.seg_units = seg_units
+        cascade.directory = directory
         
         lines = s.split('\n')[::-1]
         subcasc_indices = []
@@ -728,6 +861,11 @@ class FST:
         """Keep track of number of arcs to label arcs uniquely."""
         #}
 
+        #{ FSTIndex for transduction, created when needed and discarded when
+        # states or arcs change
+        self._index = None
+        #}
+
         #{ Add to dict in parent cascade (MG)
         if self.cascade:
             self.cascade.add(self)
@@ -1031,6 +1169,7 @@ class FST:
         Arguments should be specified using keywords!
         """
         label = self._pick_label(label, 'state', self._incoming)
+        self._index = None
         
         # Add the state.
         self._incoming[label] = []
@@ -1052,6 +1191,7 @@ class FST:
         """
         if label not in self._incoming:
             raise ValueError('Unknown state label %r' % label)
+        self._index = None
 
         if trace:
             print('Deleting state {}'.format(label))
@@ -1067,12 +1207,14 @@ class FST:
                 self._outgoing[self._src[arc]].remove(arc)   # First remove from other end (MG)
                 del (self._src[arc], self._dst[arc], self._in_string[arc],
                      self._out_string[arc], self._arc_descr[arc])
+                self._weight.pop(arc, None)
         for arc in self._outgoing[label]: 
 #            if arc in self.arcs():
             if arc in self._src:    # It may have been deleted already (MG)
                 self._incoming[self._dst[arc]].remove(arc)   # First remove from other end (MG)
                 del (self._src[arc], self._dst[arc], self._in_string[arc],
                      self._out_string[arc], self._arc_descr[arc])
+                self._weight.pop(arc, None)
 
         # Delete the state itself.
         del (self._incoming[label], self._outgoing[label],
@@ -1093,6 +1235,7 @@ class FST:
         """
         if state not in self._incoming:
             raise ValueError('Unknown state label %r' % state)
+        self._index = None
         self._is_final[state] = is_final
 
     def set_finalizing_string(self, state, finalizing_string):
@@ -1103,6 +1246,7 @@ class FST:
             raise ValueError('%s is not a final state' % state)
         if state not in self._incoming:
             raise ValueError('Unknown state label %r' % state)
+        self._index = None
         self._finalizing_string[state] = tuple(finalizing_string)
 
     def set_final_weight(self, state, weight):
@@ -1114,6 +1258,7 @@ class FST:
                 raise ValueError('%s is not a final state' % state)
             if state not in self._incoming:
                 raise ValueError('Unknown state label %r' % state)
+            self._index = None
             self._final_weight[state] = weight
 
     def set_final_dst(self, state, dst):
@@ -1190,6 +1335,7 @@ class FST:
         @param out_string: The output string
         """
         label = self._pick_arc_label()
+        self._index = None
 
         # Check that src/dst are valid labels.
         if src not in self._incoming:
@@ -1228,6 +1374,7 @@ class FST:
         """
         if label not in self._src:
             raise ValueError('Unknown arc label %r' % src)
+        self._index = None
 
         # Disconnect the arc from its src/dst states.
         self._incoming[self._dst[label]].remove(label)
@@ -1246,9 +1393,25 @@ class FST:
     #{ Transformations
     #////////////////////////////////////////////////////////////
 
-    def inverted(self):
-        """Swap all in_string/out_string pairs."""
-        fst = self.copy(del_suffix(self.label, '.') + '_inv')
+    def inverted(self, share=False):
+        """Swap all in_string/out_string pairs.
+
+        If share is True, the new FST shares its states, arcs, and weights
+        with this one instead of copying them, so neither should be changed."""
+        if share and self.is_compiled():
+            # Share the arrays, reading the in and out strings the other way around
+            fst = object.__new__(type(self))
+            fst.__dict__.update(self.__dict__)
+            fst.label = del_suffix(self.label, '.') + '_inv'
+            fst._index = None
+            fst._arrays_inverted = not self._arrays_inverted
+            return fst
+        if share:
+            fst = copy.copy(self)
+            fst.label = del_suffix(self.label, '.') + '_inv'
+            fst._index = None
+        else:
+            fst = self.copy(del_suffix(self.label, '.') + '_inv')
         fst._in_string, fst._out_string = fst._out_string, fst._in_string
         return fst
 
@@ -1305,7 +1468,7 @@ class FST:
         if trace:
 #            print('Trimming')
             deleted = 0
-            t0 = time.clock()
+            t0 = time.time()
             t = t0
             n_states = 0
 
@@ -1332,7 +1495,7 @@ class FST:
         # node.
         queue = [s for s in self.states() if self.is_final(s)]
         if trace:
-            t1 = time.clock()
+            t1 = time.time()
             if t1 - t > 30:
                 print('  Took {} minute(s) to form initial trimming queue'.format(round((t1 - t0) / 60.0, 2)))
                 t = t1
@@ -1342,7 +1505,7 @@ class FST:
             state = queue.pop()
             if trace:
                 n_states += 1
-                t1 = time.clock()
+                t1 = time.time()
                 if t1 - t > 30:
                     print('  Retaining {} valid states after {} minute(s)'.format(n_states,
                                                                                   round((t1 - t0) / 60.0, 2)))
@@ -1357,7 +1520,7 @@ class FST:
         for state in to_delete:
             if trace:
                 deleted += 1
-                t1 = time.clock()
+                t1 = time.time()
                 if t1 - t > 30:
                     print('  Deleted {} states after {} minute(s)'.format(deleted,
                                                                           round((t1 - t0) / 60.0, 2)))
@@ -1395,7 +1558,7 @@ class FST:
         """
         if trace:
             print('Relabeling')
-            t0 = time.clock()
+            t0 = time.time()
             t = t0
             n_states = 0
 
@@ -1421,7 +1584,7 @@ class FST:
         for state in self.states():
             if trace:
                 n_states += 1
-                t1 = time.clock()
+                t1 = time.time()
                 if t1 - t > 30:
                     print('  Relabeled {} states after {} minute(s)'.format(n_states,
                                                                             round((t1 - t0) / 60.0, 2)))
@@ -1435,13 +1598,13 @@ class FST:
 
         weight = None
         if trace:
-            t0 = time.clock()
+            t0 = time.time()
             t = t0
             n_arcs = 0
         for arc in self.arcs():
             if trace:
                 n_arcs += 1
-                t1 = time.clock()
+                t1 = time.time()
                 if t1 - t > 30:
                     print('  Relabeled {} arcs after {} minute(s)'.format(n_arcs,
                                                                           round((t1 - t0) / 60.0, 2)))
@@ -1478,6 +1641,197 @@ class FST:
             self._relabel_state_ids(self.dst(arc), ids)
         return ids
 
+    def minimized(self, label=None, determinize=False, trace=0):
+        """
+        Return a new FST with equivalent states merged. States are
+        equivalent if they are final in the same way and their arcs have
+        the same strings and weights and lead to equivalent states, so
+        the new FST transduces every string the way this one does. Common
+        suffixes of paths end up sharing states. Arcs duplicated by the
+        merging are dropped. States are labeled with consecutive integers.
+
+        If determinize is True, the FST is first determinized (see
+        determinized()) if possible, so common prefixes are shared too.
+        """
+        if self._initial_state is None:
+            raise ValueError("No initial state!")
+        if determinize:
+            det = self.determinized(max_states=2 * len(self._outgoing) + 100, trace=trace)
+            if det:
+                fst = det.minimized(label=label if label is not None else self.label)
+                if trace:
+                    print('Minimized {}: {} states / {} arcs -> {} states / {} arcs'.format(
+                        self.label, len(self._outgoing), len(self._src),
+                        len(fst._outgoing), len(fst._src)))
+                return fst
+        states = list(self._outgoing)
+        key = FST._weight_key
+        arcs = {}
+        for state in states:
+            arcs[state] = [(self._in_string[arc], self._out_string[arc],
+                            key(self._weight.get(arc)), self._dst[arc])
+                           for arc in self._outgoing[state]]
+        # Partition the states, starting with how they're final, and refine it
+        # by their arcs until no more blocks are split
+        blocks = {}
+        block = {}
+        for state in states:
+            final = (self._is_final[state], self._finalizing_string[state],
+                     key(self._final_weight.get(state)))
+            block[state] = blocks.setdefault(final, len(blocks))
+        n_blocks = len(blocks)
+        while True:
+            blocks = {}
+            new_block = {}
+            for state in states:
+                signature = (block[state],
+                             frozenset((i, o, w, block[d]) for i, o, w, d in arcs[state]))
+                new_block[state] = blocks.setdefault(signature, len(blocks))
+            block = new_block
+            if len(blocks) == n_blocks:
+                break
+            n_blocks = len(blocks)
+        fst = FST(label if label is not None else self.label,
+                  cascade=self.cascade, weighting=self._weighting)
+        fst._stringsets = self._stringsets
+        fst.features = self.features
+        fst._defaultFS = self._defaultFS
+        # One state for each block, with the arcs of its first state
+        first = {}
+        for state in states:
+            b = block[state]
+            if b not in first:
+                first[b] = state
+                fst.add_state(b, is_final=self._is_final[state],
+                              finalizing_string=self._finalizing_string[state],
+                              final_weight=self._final_weight.get(state),
+                              descr=self._state_descr.get(state))
+        # Equal weights share one object
+        weights = {}
+        for b, state in first.items():
+            added = set()
+            for arc, (i, o, w, d) in zip(self._outgoing[state], arcs[state]):
+                if (i, o, w, block[d]) in added:
+                    continue
+                added.add((i, o, w, block[d]))
+                fst.add_arc(b, block[d], i, o, weight=weights.setdefault(w, self._weight.get(arc)))
+        fst._initial_state = block[self._initial_state]
+        if trace:
+            print('Minimized {}: {} states / {} arcs -> {} states / {} arcs'.format(
+                self.label, len(states), len(self._src), len(first), len(fst._src)))
+        return fst
+
+    def determinized(self, label=None, max_states=0, trace=0):
+        """
+        Return an FST equivalent to this one in which no state has two
+        arcs with the same in_string, out_string, and weight. Each such
+        triple is treated as a single symbol and the resulting acceptor is
+        determinized by the subset construction; weights are never combined,
+        so this works with any semiring, including unification, which has no
+        division for weighted determinization. Return None if final states
+        with different finalizing strings or final weights would have to be
+        merged or if there would be more than max_states states.
+        """
+        if self._initial_state is None:
+            raise ValueError("No initial state!")
+        key = FST._weight_key
+        # Visit states in the order of the FST's dicts, so the result doesn't
+        # depend on the order of sets
+        order = {state: i for i, state in enumerate(self._outgoing)}
+        fst = FST(label if label is not None else self.label,
+                  cascade=self.cascade, weighting=self._weighting)
+        fst._stringsets = self._stringsets
+        fst.features = self.features
+        fst._defaultFS = self._defaultFS
+        ids = {}
+        queue = deque()
+        def add_state(subset):
+            finals = set()
+            final = None
+            for state in subset:
+                if self._is_final[state]:
+                    final = state
+                    finals.add((self._finalizing_string[state], key(self._final_weight.get(state))))
+            if len(finals) > 1:
+                return False
+            n = ids[subset] = len(ids)
+            if final is None:
+                fst.add_state(n)
+            else:
+                fst.add_state(n, is_final=True,
+                              finalizing_string=self._finalizing_string[final],
+                              final_weight=self._final_weight.get(final))
+            queue.append(subset)
+            return True
+        add_state((self._initial_state,))
+        fst._initial_state = 0
+        while queue:
+            subset = queue.popleft()
+            src = ids[subset]
+            # Destinations for each (in, out, weight) symbol, in order of first appearance
+            moves = {}
+            for state in subset:
+                for arc in self._outgoing[state]:
+                    weight = self._weight.get(arc)
+                    symbol = (self._in_string[arc], self._out_string[arc], key(weight))
+                    move = moves.get(symbol)
+                    if move is None:
+                        move = moves[symbol] = (weight, set())
+                    move[1].add(self._dst[arc])
+            for (i, o, w), (weight, dsts) in moves.items():
+                dst = tuple(sorted(dsts, key=order.get))
+                if dst not in ids:
+                    if not add_state(dst):
+                        if trace:
+                            print("Can't determinize {}: final states differ".format(self.label))
+                        return None
+                    if max_states and len(ids) > max_states:
+                        if trace:
+                            print("Not determinizing {}: more than {} states".format(self.label, max_states))
+                        return None
+                fst.add_arc(src, ids[dst], i, o, weight=weight)
+        return fst
+
+    def size(self):
+        """Numbers of states and arcs."""
+        if self.is_compiled():
+            return self._arrays.n_states, self._arrays.n_arcs
+        return len(self._outgoing), len(self._src)
+
+    @staticmethod
+    def _weight_key(weight):
+        """A hashable version of a weight, for comparing weights."""
+        if isinstance(weight, set):
+            return frozenset(weight)
+        return weight
+
+    @staticmethod
+    def _weight_string(weight):
+        """A string for a weight that doesn't depend on the order of FSs in a set."""
+        if weight is None:
+            return ''
+        if isinstance(weight, set):
+            return ';'.join(sorted(fs.__repr__() for fs in weight))
+        return str(weight)
+
+    def content_hash(self):
+        """
+        A hex digest of the FST's states, arcs, strings, and weights, the
+        same whenever the FST is made from the same source.
+        """
+        h = hashlib.sha1()
+        string = FST._weight_string
+        h.update('{}\n'.format(self._initial_state).encode('utf-8'))
+        for state, outgoing in self._outgoing.items():
+            h.update('{}\0{}\0{}\0{}\n'.format(state, int(bool(self._is_final[state])),
+                                               ' '.join(self._finalizing_string.get(state, ())),
+                                               string(self._final_weight.get(state))).encode('utf-8'))
+            for arc in outgoing:
+                h.update('\0{}\0{}\0{}\0{}\n'.format(self._dst[arc], self._in_string[arc],
+                                                     self._out_string[arc],
+                                                     string(self._weight.get(arc))).encode('utf-8'))
+        return h.hexdigest()
+
     #////////////////////////////////////////////////////////////
     #{ Misc
     #////////////////////////////////////////////////////////////
@@ -1630,11 +1984,15 @@ class FST:
     @staticmethod
     def write(fst, filename=None, directory='',
               defaultFS='', stringsets=False,
-              features=False, exclude_features=[]):
-        """Write an FST to a file."""
+              features=False, exclude_features=[], binary=False):
+        """Write an FST to a file, a compiled binary one if binary is True or
+        filename ends in .fstb."""
         if not filename:
-            extension = '.fst'
-            filename = os.path.join(directory, fst + extension)
+            extension = '.fstb' if binary else '.fst'
+            filename = os.path.join(directory, fst.label + extension)
+        if binary or filename.endswith(FST.BIN_EXT):
+            FST.write_binary(fst, filename, verbose=True)
+            return
 
         print('Writing FST to {}'.format(filename))
         out = open(filename, 'w', encoding='utf-8')
@@ -1685,6 +2043,302 @@ class FST:
             out.write('\n')
         out.close()
 
+    ## Compiled binary FSTs.
+    ## After a header (magic string, byte order, version, and 8 ints), a .fstb
+    ## file contains a table of strings (state labels, arc strings, weights,
+    ## finalizing strings): the offsets of the strings and then the strings,
+    ## a repr of a dict with the FST's features, defaultFS and stringsets, and
+    ## then arrays of ints: for states: label, final (0 if not final, 1 if
+    ## final, 2+i if final with finalizing string i), and the offsets of their
+    ## arcs; for arcs: dst (state index), in and out strings, weight (-1 for
+    ## none, -2 for an empty FSSet). The arcs leaving a state are together, in the order of its
+    ## outgoing list, so the arrays are the CSR form used by CompiledFSTIndex.
+
+    BIN_EXT = '.fstb'
+    BIN_MAGIC = b'L3FSTB'
+    BIN_VERSION = 3
+    # Weight indices that aren't in the string table
+    BIN_NO_WEIGHT = -1
+    BIN_EMPTY_WEIGHT = -2
+    # Byte order of the arrays; files with the other order are recompiled
+    BIN_ORDER = b'L' if sys.byteorder == 'little' else b'B'
+    # Directory for compiled binary FSTs; if None, they go in the directory
+    # of the .fst files
+    BIN_DIR = None
+
+    @staticmethod
+    def write_binary(fst, filename, verbose=False):
+        """Write fst to filename in the compiled binary format."""
+        if verbose:
+            print('Writing binary FST to {}'.format(filename))
+        strings = []
+        string_index = {}
+        def intern(string):
+            index = string_index.get(string)
+            if index is None:
+                index = string_index[string] = len(strings)
+                strings.append(string)
+            return index
+        states = list(fst.states())
+        state_index = {state: i for i, state in enumerate(states)}
+        labels = array('i', [intern(str(state)) for state in states])
+        finals = array('i')
+        for state in states:
+            if not fst._is_final[state]:
+                finals.append(0)
+            elif fst.finalizing_string(state):
+                finals.append(2 + intern(' '.join(fst.finalizing_string(state))))
+            else:
+                finals.append(1)
+        offsets = array('i', [0])
+        arcs = []
+        for state in states:
+            arcs.extend(fst._outgoing[state])
+            offsets.append(len(arcs))
+        dsts = array('i', [state_index[fst._dst[arc]] for arc in arcs])
+        ins = array('i', [intern(fst._in_string[arc]) for arc in arcs])
+        outs = array('i', [intern(fst._out_string[arc]) for arc in arcs])
+        weights = array('i')
+        for arc in arcs:
+            weight = fst._weight.get(arc)
+            if weight is None:
+                weights.append(FST.BIN_NO_WEIGHT)
+            elif not weight and isinstance(weight, FSSet):
+                # An empty FSSet's repr is '', which would be parsed as the default weight
+                weights.append(FST.BIN_EMPTY_WEIGHT)
+            else:
+                weights.append(intern(weight if isinstance(weight, str) else repr(weight)))
+        meta = {'features': fst.features, 'stringsets': fst._stringsets,
+                'defaultFS': repr(fst._defaultFS) if fst._defaultFS else None,
+                'label': fst.label,
+                'original_size': getattr(fst, 'original_size', None)}
+        encoded = [string.encode('utf-8') for string in strings]
+        string_offsets = array('i', [0])
+        for string in encoded:
+            string_offsets.append(string_offsets[-1] + len(string))
+        string_bytes = b''.join(encoded)
+        meta_bytes = repr(meta).encode('utf-8')
+        initial = state_index[fst._initial_state] if fst._initial_state is not None else -1
+        header = array('i', [len(strings), len(string_bytes), len(meta_bytes),
+                             len(states), len(arcs), initial, 0, 0])
+        # Write to a temporary file so other processes never read part of one
+        tmp = '{}.{}.tmp'.format(filename, os.getpid())
+        with open(tmp, 'wb') as out:
+            out.write(FST.BIN_MAGIC + FST.BIN_ORDER + bytes([FST.BIN_VERSION]))
+            out.write(header.tobytes())
+            out.write(string_offsets.tobytes())
+            out.write(FST._bin_pad(string_bytes))
+            out.write(FST._bin_pad(meta_bytes))
+            for arr in (labels, finals, offsets, dsts, ins, outs, weights):
+                out.write(arr.tobytes())
+        os.replace(tmp, filename)
+
+    @staticmethod
+    def _bin_pad(data):
+        """Pad data with NULs to a multiple of the size of an int."""
+        return data + b'\0' * (-len(data) % 4)
+
+    @staticmethod
+    def binary_current(bin_path, paths):
+        """Is there a compiled binary FST at bin_path that is newer than all of the
+        .fst files in paths and in this machine's byte order and the current version?"""
+        if not os.path.exists(bin_path):
+            return False
+        mtime = os.path.getmtime(bin_path)
+        if any(os.path.getmtime(path) > mtime for path in paths):
+            return False
+        with open(bin_path, 'rb') as f:
+            return f.read(8) == FST.BIN_MAGIC + FST.BIN_ORDER + bytes([FST.BIN_VERSION])
+
+    @staticmethod
+    def restore_binary(path, label='', cascade=None, weighting=None, create_weights=True):
+        """Restore an FST from a compiled binary file. The file is mapped into
+        memory and its arrays are used in place (see FSTArrays): transduction
+        and accepts() use a CompiledFSTIndex over them, and the dicts that other
+        methods use are only created when one of them is called (materialize())."""
+        arrays = FSTArrays(path, create_weights=create_weights)
+        meta = arrays.meta
+        fst = FST(label or meta.get('label', ''), cascade=cascade, weighting=weighting)
+        if meta.get('features'):
+            fst.set_features(meta['features'])
+        if meta.get('stringsets'):
+            fst._stringsets = meta['stringsets']
+        if meta.get('defaultFS'):
+            fst._defaultFS = FeatStruct(meta['defaultFS'])
+        if meta.get('original_size'):
+            fst.original_size = meta['original_size']
+        if arrays.initial >= 0:
+            fst._initial_state = arrays.string(arrays.labels[arrays.initial])
+        for name in FST.ARRAY_ATTRS:
+            del fst.__dict__[name]
+        fst._arrays = arrays
+        return fst
+
+    # Attributes of FSTs restored from binary files that are made from the
+    # arrays when they're first needed
+    ARRAY_ATTRS = ('_incoming', '_outgoing', '_is_final', '_finalizing_string', '_state_descr',
+                   '_src', '_dst', '_in_string', '_out_string', '_arc_descr', '_weight',
+                   '_n_arcs', '_sigma')
+
+    # Whether the in and out strings of the arrays are swapped (inverted(share=True))
+    _arrays_inverted = False
+
+    def __getattr__(self, name):
+        """Only called for attributes that aren't there: the dicts of an FST
+        restored from a binary file that haven't been made yet."""
+        if name in FST.ARRAY_ATTRS and '_arrays' in self.__dict__:
+            self.materialize()
+            return self.__dict__[name]
+        raise AttributeError(name)
+
+    def __getstate__(self):
+        # Arrays in a mapped file can't be pickled; nor can an index of them
+        if '_arrays' in self.__dict__:
+            self.materialize()
+        state = self.__dict__.copy()
+        state['_index'] = None
+        return state
+
+    def is_compiled(self):
+        """Is this FST still represented by the arrays of a compiled binary file?"""
+        return '_arrays' in self.__dict__
+
+    def materialize(self):
+        """Make the dicts of an FST restored from a compiled binary file, the
+        ones that add_state() and add_arc() would fill in. FSTs that share the
+        arrays (see inverted()) share the dicts. The FST's index is kept,
+        since the arrays still represent the FST."""
+        arrays = self.__dict__.pop('_arrays', None)
+        if not arrays:
+            return
+        if arrays.dicts is None:
+            arrays.dicts = self.dicts_from_arrays(arrays)
+        dicts = dict(arrays.dicts)
+        if self._arrays_inverted:
+            dicts['_in_string'], dicts['_out_string'] = dicts['_out_string'], dicts['_in_string']
+        self.__dict__.update(dicts)
+
+    def dicts_from_arrays(self, arrays):
+        """The state and arc dicts for the arrays of a compiled binary FST."""
+        string = arrays.string
+        states = [string(i) for i in arrays.labels]
+        incoming = {}
+        outgoing = {}
+        is_final = {}
+        finalizing = {}
+        descr = {}
+        for state, final in zip(states, arrays.finals):
+            incoming[state] = []
+            outgoing[state] = []
+            is_final[state] = final > 0
+            descr[state] = None
+            finalizing[state] = tuple(string(final - 2).split()) if final > 1 else ()
+        # Each weight string is parsed once, and the weight is shared by all arcs with it
+        weighted = self.is_weighted()
+        default = self.default_weight()
+        arc_weights = {}
+        for index in set(arrays.weights):
+            if index == FST.BIN_NO_WEIGHT or not weighted:
+                continue
+            weight = arrays.parsed_weight(index, self._weighting) \
+                     if arrays.create_weights or index == FST.BIN_EMPTY_WEIGHT else string(index)
+            if weight != default:
+                arc_weights[index] = weight
+        src_d, dst_d, in_d, out_d, descr_d, weight_d = {}, {}, {}, {}, {}, {}
+        offsets = arrays.offsets
+        for s, src in enumerate(states):
+            for n in range(offsets[s], offsets[s + 1]):
+                arc = 'arc' + str(n)
+                dst = states[arrays.dsts[n]]
+                src_d[arc] = src
+                dst_d[arc] = dst
+                in_d[arc] = string(arrays.ins[n])
+                out_d[arc] = string(arrays.outs[n])
+                descr_d[arc] = None
+                w = arrays.weights[n]
+                if w in arc_weights:
+                    weight_d[arc] = arc_weights[w]
+                incoming[dst].append(arc)
+                outgoing[src].append(arc)
+        return {'_incoming': incoming, '_outgoing': outgoing, '_is_final': is_final,
+                '_finalizing_string': finalizing, '_state_descr': descr,
+                '_src': src_d, '_dst': dst_d, '_in_string': in_d, '_out_string': out_d,
+                '_arc_descr': descr_d, '_weight': weight_d, '_n_arcs': arrays.n_arcs - 1,
+                '_sigma': {string(i) for i in set(arrays.ins) | set(arrays.outs)}}
+
+    @staticmethod
+    def restore_files(paths, name, directory='', weighting=None, seg_units=[],
+                      create_weights=True, binary=True, minimize=False, verbose=False):
+        """Restore the FST name from the .fst files in paths, or from its compiled
+        binary file in directory if binary is True and the file is current. If it's
+        not, the binary file is (re)written after the .fst files are parsed.
+        If minimize is True, the FST is minimized (and determinized if possible),
+        and the binary file is name.min.fstb (see binary_path())."""
+        bin_path = FST.binary_path(paths, name, directory, minimize) if binary else ''
+        # Binary files named by the contents of paths are current if they exist
+        if binary and FST.binary_current(bin_path, [] if FST.BIN_DIR else paths):
+            if verbose:
+                print('  Restoring FST', name, 'from binary file', bin_path)
+            return FST.restore_binary(bin_path, name, weighting=weighting,
+                                      create_weights=create_weights)
+        if verbose:
+            print('  Restoring FST', name, 'from FST file', paths[0])
+        fst = FST.restore_parse_from_files(paths, name,
+                                           weighting=weighting,
+                                           seg_units=seg_units,
+                                           create_weights=create_weights,
+                                           verbose=verbose)
+        if minimize:
+            size = fst.size()
+            fst = fst.minimized(label=name, determinize=True, trace=verbose)
+            fst.original_size = size
+        if binary:
+            try:
+                os.makedirs(os.path.dirname(bin_path), exist_ok=True)
+                FST.write_binary(fst, bin_path, verbose=verbose)
+            except OSError as e:
+                print('  Could not write binary FST {}: {}'.format(bin_path, e))
+            else:
+                if FST.BIN_DIR:
+                    FST.prune_binary(bin_path, name, minimize)
+        return fst
+
+    @staticmethod
+    def binary_path(paths, name, directory, minimize=False):
+        """The compiled binary file for the FST name made from the .fst files in
+        paths in directory. If BIN_DIR is None, this is name[.min].fstb in
+        directory; otherwise it's in a subdirectory of BIN_DIR for directory
+        and the name includes a hash of the absolute path of directory and a
+        hash of the names, sizes, and modification times of the files."""
+        suffix = '.min' if minimize else ''
+        if not FST.BIN_DIR:
+            return os.path.join(directory, name + suffix + FST.BIN_EXT)
+        h = hashlib.sha1('{} {}'.format(FST.BIN_VERSION, minimize).encode())
+        for path in sorted(paths):
+            st = os.stat(path)
+            h.update('{}:{}:{};'.format(os.path.basename(path), st.st_size, st.st_mtime_ns).encode())
+        directory = os.path.abspath(directory)
+        scope = hashlib.sha1(directory.encode('utf-8')).hexdigest()[:12]
+        subdir = os.path.relpath(directory, LANGUAGE_DIR)
+        if subdir.startswith(os.pardir):
+            # Not a language's directory
+            subdir = scope
+        return os.path.join(FST.BIN_DIR, subdir,
+                            '{}{}.{}.{}{}'.format(name, suffix, scope, h.hexdigest(), FST.BIN_EXT))
+
+    @staticmethod
+    def prune_binary(bin_path, name, minimize=False):
+        """Delete the binary files for earlier versions of the FST name made from
+        the same directory (with the same directory hash)."""
+        prefix = glob.escape(os.path.basename(bin_path).rsplit('.', 2)[0])
+        for old in glob.glob(os.path.join(glob.escape(os.path.dirname(bin_path)),
+                                          prefix + '.*' + FST.BIN_EXT)):
+            if old != bin_path and old.count('.') == bin_path.count('.'):
+                try:
+                    os.remove(old)
+                except FileNotFoundError:
+                    pass
+
     @staticmethod
     def get_fst_files(fst_name, fst_directory, parts=True):
         """Get FST files for fst_name in fst_directory, searching either for parts
@@ -1702,11 +2356,13 @@ class FST:
     @staticmethod
     def restore(fst_name, directory='', cascade=None, weighting=UNIFICATION_SR, seg_units=[], empty=True,
                 phon=False, segment=False,
-                generate=False, simplified=False, create_weights=True, verbose=False):
+                generate=False, simplified=False, create_weights=True, binary=True,
+                minimize=False, verbose=False):
         '''Restore an FST from a file.
 
         If empty is true, look for the empty (guesser) FST only.  Otherwise, look first for the
-        lexical one, then the empty one.'''
+        lexical one, then the empty one. If binary is true, use (and create) compiled
+        binary files. If minimize is true, minimize the FST (see restore_files()).'''
         empty_name = fst_name + '0'
         if empty:
             name = empty_name
@@ -1727,13 +2383,11 @@ class FST:
 #        filename = name + '.fst'
 #        if os.path.exists(os.path.join(directory, filename)):
         if explicit:
-            if verbose:
-                print('  Restoring FST', name, 'from FST file', explicit[0])
-            return FST.restore_parse_from_files(explicit, name,
-                                                weighting=weighting,
-                                                seg_units=seg_units,
-                                                create_weights=create_weights,
-                                                verbose=verbose)
+            return FST.restore_files(explicit, name, directory,
+                                     weighting=weighting,
+                                     seg_units=seg_units,
+                                     create_weights=create_weights,
+                                     binary=binary, minimize=minimize, verbose=verbose)
 #           if verbose:
 #                print('  Restoring FST', name, 'from FST file', filename)
 #            return FST.restore_parse(directory, filename, weighting=weighting,
@@ -1742,13 +2396,11 @@ class FST:
         if not empty:
             empty_paths = FST.get_fst_files(empty_name, directory)
             if empty_paths:
-                if verbose:
-                    print('  Restoring FST', empty_name, 'from FST file', empty_paths[0])
-                return FST.restore_parse_from_files(empty_paths, empty_name,
-                                                    weighting=weighting,
-                                                    seg_units=seg_units,
-                                                    create_weights=create_weights,
-                                                    verbose=verbose)
+                return FST.restore_files(empty_paths, empty_name, directory,
+                                         weighting=weighting,
+                                         seg_units=seg_units,
+                                         create_weights=create_weights,
+                                         binary=binary, minimize=minimize, verbose=verbose)
 #            filename = empty_name + '.fst'
 #            if os.path.exists(os.path.join(directory, filename)):
 #                if verbose:
@@ -1806,7 +2458,8 @@ class FST:
         
         path = path or os.path.join(directory, fst_file)
 
-        s = open(path, encoding='utf-8').read()
+        with open(path, encoding='utf-8') as file:
+            s = file.read()
 
         fst = fst or FST(label, cascade=cascade, weighting=weighting)
 
@@ -2480,30 +3133,32 @@ class FST:
                   # related to generation
                   gen=False, print_word=False, print_prefixes=None,
                   seg_units=[], reject_same=False,
-                  trace=0, tracefeat='', timeit=False, timeout=100):
-        """Return the output for all paths through the FST for the input and initial weight. (MG)"""
+                  trace=0, tracefeat='', timeit=False, timeout=100, csr=None):
+        """Return the output for all paths through the FST for the input and initial weight. (MG)
+        If csr is True (and there's no tracing), the paths are found with the FST's
+        FSTIndex rather than step_transduce(); the result is the same. If csr is
+        None, this is done for FSTs restored from compiled binary files."""
         if timeit:
             time1 = time.time()
-        words = []
+        words = set()
         result = []
         word_count = 1
         original_word = input
-        # Split the input string into 'characters'
-        if seg_units:
-            # Use seg_units to segment, accepting any character not in the list
-            input = list(segment(input, seg_units, correct=False))
-        elif split_string:
-            input = list(input.split(split_string))
-        else:
-            input = list(input)
+        input = FST.input_symbols(input, seg_units=seg_units, split_string=split_string)
         n_outputs = 0
-        for output in self.step_transduce(input, step=False, init_weight=init_weight,
-                                          trace=trace, tracefeat=tracefeat):
+        if csr is None:
+            csr = self.is_compiled()
+        if csr and not trace and not tracefeat:
+            outputs = self.get_index().transduce(input, init_weight=init_weight)
+        else:
+            outputs = self.step_transduce(input, step=False, init_weight=init_weight,
+                                          trace=trace, tracefeat=tracefeat)
+        for output in outputs:
             # output[0] is 'succeed' or 'fail'
             # output[1] is output string (if success)
             # output[2] is accumulated weight (if success)
             # There can be failures and duplicate successes
-            if output[1] and (output not in result):
+            if output[1]:
                 word = ''.join(output[1])
                 if reject_same and word == original_word:
 #                    print('{} is the same the original word')
@@ -2514,7 +3169,7 @@ class FST:
                 if word not in words:
                     if print_word:
                         self.print_output(word, prefixes=print_prefixes)
-                    words.append(word)
+                    words.add(word)
                     result.append(output)
                 elif not gen:
                     result.append(output)
@@ -2539,6 +3194,29 @@ class FST:
             print('Transduction took {} seconds'.format(time.time()-t1))
         return res
 
+    @staticmethod
+    def input_symbols(input, seg_units=[], split_string=''):
+        """Split the input string into 'characters'."""
+        if seg_units:
+            # Use seg_units to segment, accepting any character not in the list
+            return list(segment(input, seg_units, correct=False))
+        elif split_string:
+            return list(input.split(split_string))
+        else:
+            return list(input)
+
+    def accepts(self, input, seg_units=[], split_string=''):
+        """Could the FST transduce input? False only if no path through the
+        FST matches input, regardless of weights."""
+        return self.get_index().accepts(FST.input_symbols(input, seg_units=seg_units,
+                                                          split_string=split_string))
+
+    def get_index(self):
+        """The FSTIndex for this FST, created if it doesn't exist."""
+        if getattr(self, '_index', None) is None:
+            self._index = CompiledFSTIndex(self) if self.is_compiled() else FSTIndex(self)
+        return self._index
+
     def print_output(self, word, prefixes=None):
         """For generation, we may want to print output words, possibly with other words
         or morphemes prefixed to them, immediately."""
@@ -2907,14 +3585,14 @@ class FST:
         composition.add_state(start_name)
         composition._set_initial_state(start_name)
 
-        t0 = time.clock()
+        t0 = time.time()
         t = t0
         while states:
             if trace > 1:
                 print('States {}'.format(states))
             state_pairs += 1
             if trace:
-                t1 = time.clock()
+                t1 = time.time()
                 if t1 - t > 30:
                     print('  Checked {} state pairs in {} minute(s)'.format(state_pairs,
                                                                             round((t1 - t0) / 60.0, 2)))
@@ -3232,3 +3910,314 @@ class FST:
             label = 1
             while '%s%d' % (typ[0], label) in used_labels: label += 1
             return '%s%d' % (typ[0], label)
+
+######################################################################
+# Array-backed FST index for transduction
+######################################################################
+
+class FSTArrays:
+    """
+    The arrays of a compiled binary FST (see FST.write_binary()), read in
+    place from the file mapped into memory, so that restoring an FST doesn't
+    parse anything but the small dict of its features and stringsets, and
+    processes forked after it was restored share its pages. Strings are
+    decoded from the string table when they're needed.
+    """
+
+    def __init__(self, path, create_weights=True):
+        self.path = path
+        self.create_weights = create_weights
+        with open(path, 'rb') as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.buf)
+        def ints(start, n):
+            return view[start:start + 4 * n].cast('i'), start + 4 * n
+        header, pos = ints(8, 8)
+        n_strings, string_len, meta_len, self.n_states, self.n_arcs, self.initial = header[:6]
+        self.string_offsets, pos = ints(pos, n_strings + 1)
+        self.string_bytes = view[pos:pos + string_len]
+        pos += string_len + (-string_len % 4)
+        self.meta = eval(str(view[pos:pos + meta_len], 'utf-8'))
+        pos += meta_len + (-meta_len % 4)
+        self.labels, pos = ints(pos, self.n_states)
+        self.finals, pos = ints(pos, self.n_states)
+        self.offsets, pos = ints(pos, self.n_states + 1)
+        self.dsts, pos = ints(pos, self.n_arcs)
+        self.ins, pos = ints(pos, self.n_arcs)
+        self.outs, pos = ints(pos, self.n_arcs)
+        self.weights, pos = ints(pos, self.n_arcs)
+        # Decoded strings and parsed weights, by index in the string table
+        self.strings = {}
+        self.parsed = {}
+        # Dicts made by FST.materialize(), shared by FSTs sharing the arrays
+        self.dicts = None
+
+    def __repr__(self):
+        return 'FSTArrays({}: {} states, {} arcs)'.format(self.path, self.n_states, self.n_arcs)
+
+    def string(self, index):
+        string = self.strings.get(index)
+        if string is None:
+            offsets = self.string_offsets
+            string = self.strings[index] = \
+                     str(self.string_bytes[offsets[index]:offsets[index + 1]], 'utf-8')
+        return string
+
+    def parsed_weight(self, index, weighting):
+        """The weight whose string is at index, parsed once and then shared."""
+        weight = self.parsed.get(index)
+        if weight is None:
+            if index == FST.BIN_EMPTY_WEIGHT:
+                weight = FSSet()
+            else:
+                weight = weighting.parse(self.string(index))
+            self.parsed[index] = weight
+        return weight
+
+class FSTIndex:
+    """
+    The states and arcs of an FST in compressed sparse row form: states are
+    numbered, and the arcs leaving state i are arcs offsets[i] to
+    offsets[i+1]-1 (in the order of the FST's outgoing lists). Arcs are
+    reached through a table for each state, made the first time the state is
+    visited: a dict from input symbols to the arcs with that input string,
+    the epsilon arcs, and the arcs whose input string is a stringset. Each arc
+    is represented as (number, dst, out string, whether the arc outputs the
+    input symbol it matched (UNKNOWN and stringset out strings)).
+
+    The input side of the FST is also an acceptor, determinized as it's used:
+    each state of the deterministic acceptor is a set of FST states, numbered
+    in dfa_states, and transitions are cached in dfa.
+    """
+
+    # Maximum number of cached acceptor transitions
+    max_dfa = 200000
+
+    def __init__(self, fst):
+        self.fst = fst
+        self.states = list(fst.states())
+        self.state_ids = {state: i for i, state in enumerate(self.states)}
+        self.initial = self.state_ids.get(fst._initial_state, -1)
+        self.final = [fst._is_final[state] for state in self.states]
+        self.finalizing = [fst.finalizing_string(state) for state in self.states]
+        self.final_weight = [fst._final_weight.get(state) for state in self.states]
+        self.offsets = array('i', [0])
+        # Arc labels, for weights that are still strings
+        self.arcs = []
+        for state in self.states:
+            self.arcs.extend(fst._outgoing[state])
+            self.offsets.append(len(self.arcs))
+        weighted = fst.is_weighted()
+        self.weights = [fst.arc_weight(arc) if weighted else None for arc in self.arcs]
+        self.init_tables()
+
+    def init_tables(self):
+        # State tables, and stringsets for strings (or None), found once for each string
+        self.tables = {}
+        self.stringsets = {}
+        self.reset_dfa()
+
+    def reset_dfa(self):
+        # Sets of states, their numbers, and whether they contain a final state
+        self.dfa_sets = []
+        self.dfa_states = {}
+        self.dfa_final = []
+        # (acceptor state, symbol) -> acceptor state
+        self.dfa = {}
+        self.dfa_initial = self.dfa_state([self.initial] if self.initial >= 0 else [])
+
+    def arc_strings(self, a):
+        """The in and out strings of arc a."""
+        arc = self.arcs[a]
+        return self.fst._in_string[arc], self.fst._out_string[arc]
+
+    def arc_dst(self, a):
+        return self.state_ids[self.fst._dst[self.arcs[a]]]
+
+    def get_stringset(self, string):
+        stringsets = self.stringsets
+        if string not in stringsets:
+            stringsets[string] = self.fst.stringset(string)
+        return stringsets[string]
+
+    def table(self, state):
+        """Literal, epsilon, and stringset arcs leaving state."""
+        table = self.tables.get(state)
+        if table is None:
+            literal = {}
+            epsilon = []
+            special = []
+            for a in range(self.offsets[state], self.offsets[state + 1]):
+                in_string, out_string = self.arc_strings(a)
+                copy_out = out_string != '' and \
+                           (out_string == UNKNOWN or bool(self.get_stringset(out_string)))
+                record = (a, self.arc_dst(a), out_string, copy_out)
+                if in_string == '':
+                    epsilon.append(record)
+                    continue
+                stringset = self.get_stringset(in_string)
+                if stringset:
+                    special.append((stringset, record))
+                else:
+                    literal.setdefault(in_string, []).append(record)
+            table = self.tables[state] = (literal, epsilon, special)
+        return table
+
+    def matching(self, state, symbol):
+        """Arcs leaving state that consume symbol (None at the end of the input),
+        and epsilon arcs leaving state."""
+        literal, epsilon, special = self.table(state)
+        if symbol is None:
+            return (), epsilon
+        consuming = literal.get(symbol, ())
+        if special:
+            consuming = list(consuming)
+            consuming.extend(record for stringset, record in special if symbol in stringset)
+        return consuming, epsilon
+
+    def dfa_state(self, states):
+        """The number of the acceptor state for the epsilon closure of states."""
+        closure = set(states)
+        stack = list(states)
+        while stack:
+            for a, dst, out_string, copy_out in self.table(stack.pop())[1]:
+                if dst not in closure:
+                    closure.add(dst)
+                    stack.append(dst)
+        closure = frozenset(closure)
+        number = self.dfa_states.get(closure)
+        if number is None:
+            number = self.dfa_states[closure] = len(self.dfa_sets)
+            self.dfa_sets.append(closure)
+            self.dfa_final.append(any(self.final[state] for state in closure))
+        return number
+
+    def accepts(self, input):
+        """Is there a path through the FST whose input side matches input (a list
+        of symbols)?"""
+        dfa = self.dfa
+        current = self.dfa_initial
+        for symbol in input:
+            following = dfa.get((current, symbol))
+            if following is None:
+                if len(dfa) >= self.max_dfa:
+                    self.reset_dfa()
+                    return self.accepts(input)
+                states = []
+                for state in self.dfa_sets[current]:
+                    states.extend(record[1] for record in self.matching(state, symbol)[0])
+                following = dfa[(current, symbol)] = self.dfa_state(states)
+            if not self.dfa_sets[following]:
+                return False
+            current = following
+        return self.dfa_final[current]
+
+    def weight(self, a):
+        """The weight on arc a, parsed if it's a string."""
+        weight = self.weights[a]
+        if isinstance(weight, str):
+            weight = self.weights[a] = self.fst.arc_weight_jit(self.arcs[a])
+        return weight
+
+    def state_final(self, state):
+        """The finalizing string and final weight of a final state."""
+        return self.finalizing[state], self.final_weight[state]
+
+    def transduce(self, input, init_weight=None):
+        """All successful paths through the FST for input (a list of symbols), as
+        ['succeed', output, weight] lists, in the order in which
+        FST.step_transduce() would find them. Paths are extended breadth-first,
+        one input position at a time, following epsilon arcs until no more apply
+        before the next symbol is consumed. Each path has a key, the negated
+        numbers of its arcs, so that sorting by key gives the depth-first order
+        in which step_transduce() tries the last matching arc first."""
+        fst = self.fst
+        weighted = fst.is_weighted()
+        multiply = fst.weighting().multiply if weighted else None
+        weight = init_weight if init_weight else fst.init_weight()
+        n = len(input)
+        successes = []
+        # Paths: (key, state, output, weight)
+        paths = [((), self.initial, (), weight)] if self.initial >= 0 else []
+        for pos in range(n + 1):
+            symbol = input[pos] if pos < n else None
+            # Paths that have consumed symbol
+            following = []
+            while paths:
+                closure = []
+                for key, state, output, weight in paths:
+                    if symbol is None and self.final[state]:
+                        self.succeed(successes, key, state, output, weight, multiply)
+                    consuming, epsilon = self.matching(state, symbol)
+                    for records, extended in ((consuming, following), (epsilon, closure)):
+                        for a, dst, out_string, copy_out in records:
+                            if weighted:
+                                weight1 = multiply(weight, self.weight(a))
+                                if not weight1:
+                                    continue
+                            else:
+                                weight1 = weight
+                            if copy_out:
+                                out_string = symbol
+                            extended.append((key + (-a,), dst,
+                                             output + (out_string,) if out_string else output,
+                                             weight1))
+                paths = closure
+            paths = following
+        successes.sort(key=itemgetter(0))
+        return [['succeed', list(output), weight] for key, output, weight in successes]
+
+    def succeed(self, successes, key, state, output, weight, multiply):
+        """Record a successful path ending in final state, with the state's final
+        weight (multiplied in twice, as step_transduce() does) and finalizing
+        string."""
+        finalizing, final_weight = self.state_final(state)
+        if multiply:
+            if final_weight:
+                weight = multiply(weight, final_weight)
+            if not weight:
+                return
+            if final_weight:
+                weight = multiply(weight, final_weight)
+        successes.append((key, output + tuple(finalizing), weight))
+
+class CompiledFSTIndex(FSTIndex):
+    """
+    An FSTIndex over the arrays of an FST restored from a compiled binary
+    file, which are already in CSR form. Nothing is copied from the arrays;
+    state tables are made from them as states are visited, as for an
+    FSTIndex, and weights are parsed when they're first used.
+    """
+
+    def __init__(self, fst):
+        self.fst = fst
+        arrays = self.arrays = fst._arrays
+        self.initial = arrays.initial
+        # Non-zero for final states
+        self.final = arrays.finals
+        self.offsets = arrays.offsets
+        self.dsts = arrays.dsts
+        # An inverted FST sharing the arrays reads them the other way around
+        if fst._arrays_inverted:
+            self.ins, self.outs = arrays.outs, arrays.ins
+        else:
+            self.ins, self.outs = arrays.ins, arrays.outs
+        self.one = fst.default_weight()
+        self.init_tables()
+
+    def arc_strings(self, a):
+        string = self.arrays.string
+        return string(self.ins[a]), string(self.outs[a])
+
+    def arc_dst(self, a):
+        return self.dsts[a]
+
+    def weight(self, a):
+        index = self.arrays.weights[a]
+        if index == FST.BIN_NO_WEIGHT:
+            return self.one
+        return self.arrays.parsed_weight(index, self.fst._weighting)
+
+    def state_final(self, state):
+        final = self.final[state]
+        return (tuple(self.arrays.string(final - 2).split()) if final > 1 else ()), None
@@ -37,6 +37,20 @@
 # 2013.08.30
 # -- Added POSMorphology.segment() for segmenting words into affix+modified word
 #    given particular feature values.
+# 2026.10.17
+# -- POSMorphology.anal() and gen() can transduce with the FSTs' array-backed
+#    FSTIndex (csr=True, or POSMorphology.csr for all of them). By default
+#    (csr=None) FSTs restored from compiled binary files do.
+# -- FSTs can be loaded lazily: defer_fst() records how to load an FST and
+#    get_fst() loads it the first time it's needed. loaded_fsts() reports
+#    which FSTs have been loaded and which are still deferred.
+# -- POSMorphology.may_accept() checks whether the input side of an analysis
+#    FST accepts a word, counting how often the POS is skipped.
+# -- Cascades are composed with minimization and cached intermediate
+#    compositions (FSTCascade.compose_backwards()).
+# -- load_fst(minimize=True) (or POSMorphology.minimize) minimizes restored
+#    FSTs; a generation FST made by inverting the analysis FST shares its
+#    states and arcs. fst_sizes() reports the sizes of loaded FSTs.
 
 from .fst import *
 
@@ -212,7 +226,7 @@ class Morphology(dict):
             if create_fst:
                 if verbose:
                     print("Composing FST")
-                fst = casc.compose(backwards=True, trace=verbose, relabel=True)
+                fst = casc.compose(backwards=True, trace=verbose, relabel=True, minimize=True)
                 if generate:
                     fst = fst.inverted()
                 if save:
@@ -292,6 +306,21 @@ class POSMorphology:
     guessphon_i = 4
     seg_i = 5
 
+    # Whether anal() and gen() transduce with FSTIndexes by default; if None,
+    # FSTs restored from compiled binary files do and others don't
+    csr = None
+
+    # Whether may_accept() checks words against FST acceptors
+    prefilter = True
+
+    # Whether load_fst() minimizes FSTs by default
+    minimize = False
+
+    # Keyword args for fst_name() for each index within sublists
+    fst_kinds = {0: {}, guess_i: {'guess': True}, simp_i: {'simplified': True},
+                 phon_i: {'phon': True}, guessphon_i: {'guess': True, 'phon': True},
+                 seg_i: {'segment': True}}
+
     def __init__(self, pos):
         # A string representing part of speech
         self.pos = pos
@@ -302,6 +331,10 @@ class POSMorphology:
         # FSTs: [[anal, anal0, anal_S, anal_P, anal0_P, anal_Seg],
         #        [gen, gen0, gen_S, gen_P, gen0_P, (gen_Seg)]]
         self.fsts = [[None, None, None, None, None, None], [None, None, None, None, None, None]]
+        # FSTs not loaded until needed: (top index, sublist index) -> load_fst() args
+        self.deferred = {}
+        # Words checked by may_accept() and words rejected, for lexical and guesser FSTs
+        self.prefilter_counts = {False: [0, 0], True: [0, 0]}
         # FST cascade
         self.casc = None
         self.casc_inv = None
@@ -337,24 +370,82 @@ class POSMorphology:
     def reset_fsts(self, fsts):
         self.fsts = fsts
 
-    def get_fst(self, generate=False, guess=False, simplified=False, phon=False, segment=False):
-        """The FST satisfying the parameters."""
-        analgen = self.fsts[self.gen_i if generate else self.anal_i]
+    def get_fst(self, generate=False, guess=False, simplified=False, phon=False, segment=False,
+                load=True):
+        """The FST satisfying the parameters. If load is True, load it if it's
+        been deferred."""
+        top = self.gen_i if generate else self.anal_i
         if guess:
             if phon:
-                fst = analgen[self.guessphon_i]
+                fst = self.fst_at(top, self.guessphon_i, load)
             else:
-                fst = analgen[self.guess_i]
+                fst = self.fst_at(top, self.guess_i, load)
         elif simplified:
-            fst = analgen[self.simp_i]
+            fst = self.fst_at(top, self.simp_i, load)
         elif phon:
-            fst = analgen[self.phon_i]
+            fst = self.fst_at(top, self.phon_i, load)
         elif segment:
-            fst = analgen[self.seg_i]
+            fst = self.fst_at(top, self.seg_i, load)
         else:
-            fst = analgen[0] or analgen[self.guess_i] or analgen[self.simp_i]
+            fst = self.fst_at(top, 0, load) or self.fst_at(top, self.guess_i, load) or \
+                  self.fst_at(top, self.simp_i, load)
+        return fst
+
+    def fst_at(self, top, index, load=True):
+        """The FST at position index in the top sublist of self.fsts, loading it
+        first if it's been deferred and load is True."""
+        fst = self.fsts[top][index]
+        if fst is None and load:
+            deferred = getattr(self, 'deferred', None)
+            if deferred and (top, index) in deferred:
+                # Only try once
+                self.load_fst(**deferred.pop((top, index)))
+                fst = self.fsts[top][index]
         return fst
 
+    def defer_fst(self, generate=False, guess=False, simplified=False,
+                  phon=False, segment=False, **load_args):
+        """Record how to load an FST so that get_fst() can load it when it's
+        first needed. load_args are other args for load_fst()."""
+        index = 0
+        if simplified:
+            index = self.simp_i
+        elif guess:
+            index = self.guessphon_i if phon else self.guess_i
+        elif phon:
+            index = self.phon_i
+        elif segment:
+            index = self.seg_i
+        top = self.gen_i if generate else self.anal_i
+        if self.fsts[top][index] is None:
+            load_args.update(generate=generate, guess=guess, simplified=simplified,
+                             phon=phon, segment=segment)
+            self.deferred[(top, index)] = load_args
+
+    def loaded_fsts(self):
+        """Names of the FSTs that have been loaded and of those still deferred."""
+        loaded = []
+        for top, fsts in enumerate(self.fsts):
+            for index, fst in enumerate(fsts):
+                if fst is not None:
+                    loaded.append(self.fst_name(generate=top == self.gen_i,
+                                                **self.fst_kinds[index]))
+        deferred = [self.fst_name(generate=top == self.gen_i, **self.fst_kinds[index])
+                    for top, index in getattr(self, 'deferred', {})]
+        return loaded, deferred
+
+    def fst_sizes(self):
+        """Dict of names of loaded FSTs and their (states, arcs), with
+        the sizes before minimization if they were minimized."""
+        sizes = {}
+        for top, fsts in enumerate(self.fsts):
+            for index, fst in enumerate(fsts):
+                if isinstance(fst, FST):
+                    name = self.fst_name(generate=top == self.gen_i, **self.fst_kinds[index])
+                    original = getattr(fst, 'original_size', None)
+                    sizes[name] = fst.size() + (tuple(original) if original else ())
+        return sizes
+
     def set_fst(self, fst, generate=False, guess=False, simplified=False,
                 phon=False, segment=False):
         """Assign the FST satisfying the parameters."""
@@ -458,12 +549,15 @@ class POSMorphology:
                  recreate=False, create_fst=True,
                  create_weights=False, guess=False,
                  simplified=False, phon=False, segment=False,
-                 invert=False,
+                 invert=False, minimize=None,
                  relabel=True, verbose=False):
         '''Load FST; if compose is False, search for saved FST in file and use that if it exists.
 
-        If guess is true, create the lexiconless guesser FST.'''
+        If guess is true, create the lexiconless guesser FST. If minimize is true
+        (default: POSMorphology.minimize), minimize restored FSTs.'''
         fst = None
+        if minimize is None:
+            minimize = self.minimize
         if verbose:
             s1 = '\nAttempting to load {0} FST for {1} {2}{3}{4}'
             print(s1.format(('GENERATION' if generate else 'ANALYSIS'),
@@ -474,11 +568,12 @@ class POSMorphology:
             # Load a composed FST encompassing everything in the cascade
             fst = FST.restore(self.pos, self.morphology.directory, seg_units=self.morphology.seg_units,
                               create_weights=create_weights, generate=generate,
-                              empty=guess, phon=phon, segment=segment, simplified=simplified, verbose=verbose)
+                              empty=guess, phon=phon, segment=segment, simplified=simplified,
+                              minimize=minimize, verbose=verbose)
             if fst:
                 self.set_fst(fst, generate, guess, simplified, phon=phon, segment=segment)
 #                if verbose: print('... loaded')
-        if not self.get_fst(generate, guess, simplified, phon=phon, segment=segment) or recreate:
+        if not self.get_fst(generate, guess, simplified, phon=phon, segment=segment, load=False) or recreate:
             name = self.fst_name(generate, guess, simplified, phon=phon, segment=segment)
             path = os.path.join(self.morphology.directory, name + '.cas')
 #            if verbose: print('Looking for cascade at', path, 'subcasc', subcasc)
@@ -498,7 +593,7 @@ class POSMorphology:
                 # create_fst is False in case we just want to load the individuals fsts.
                 if create_fst:
                     fst = self.casc.compose(backwards=True, trace=verbose, subcasc=subcasc,
-                                            relabel=relabel)
+                                            relabel=relabel, minimize=True)
                     if invert:
                         fst = fst.inverted()
                     self.set_fst(fst, generate, guess, simplified, phon=phon, segment=segment)
@@ -509,14 +604,15 @@ class POSMorphology:
         if gen:
             if not self.load_fst(compose=compose, generate=True, gen=False,
                                  guess=guess, simplified=simplified, phon=phon, segment=segment,
-                                 invert=True, verbose=verbose):
+                                 invert=True, minimize=minimize, verbose=verbose):
                 # Explicit generation FST not found, so invert the analysis FST
                 if verbose: print("... inverting analysis FST")
                 fst = fst or self.get_fst(False, guess, simplified, phon=phon, segment=segment)
                 if fst:
-                    self.set_fst(fst.inverted(), True, guess, simplified,
+                    # Loaded FSTs aren't changed, so the two can share arcs
+                    self.set_fst(fst.inverted(share=True), True, guess, simplified,
                                  phon=phon, segment=segment)
-        if self.get_fst(generate, guess, simplified, phon=phon, segment=segment):
+        if self.get_fst(generate, guess, simplified, phon=phon, segment=segment, load=False):
             # FST found one way or another
             return True
 
@@ -562,31 +658,37 @@ class POSMorphology:
         if shelve:
             os.remove(os.path.join(self.morphology.directory, self.pos + '.shf'))
 
+    def may_accept(self, form, guess=False, simplified=False):
+        """False if the analysis FST can't possibly analyze form, because its
+        input side doesn't accept form."""
+        if not self.prefilter:
+            return True
+        fst = self.get_fst(generate=False, guess=guess, simplified=simplified)
+        if not fst:
+            return True
+        counts = getattr(self, 'prefilter_counts', None)
+        if counts is None:
+            counts = self.prefilter_counts = {False: [0, 0], True: [0, 0]}
+        counts[guess][0] += 1
+        if fst.accepts(form, seg_units=self.morphology.seg_units):
+            return True
+        counts[guess][1] += 1
+        return False
+
     def anal(self, form, to_dict=False, preproc=False,
              guess=False, simplified=False, phon=False, segment=False,
-             timeit=False, trace=False, tracefeat=''):
-        """Analyze form."""
-        fst = self.get_fst(generate=False, guess=guess, phon=phon, segment=segment)
-        if guess:
-            if phon:
-                fst = self.fsts[self.anal_i][self.guessphon_i]
-            else:
-                fst = self.fsts[self.anal_i][self.guess_i]
-        elif simplified:
-            fst = self.fsts[self.anal_i][self.simp_i]
-        elif phon:
-            fst = self.fsts[self.anal_i][self.phon_i]
-        elif segment:
-            fst = self.fsts[self.anal_i][self.seg_i]
-        else:
-            fst = self.fsts[self.anal_i][0] or self.fsts[self.anal_i][self.guess_i] or self.fsts[self.anal_i][self.simp_i]
+             timeit=False, trace=False, tracefeat='', csr=None):
+        """Analyze form. csr overrides POSMorphology.csr."""
+        fst = self.get_fst(generate=False, guess=guess, simplified=simplified,
+                           phon=phon, segment=segment)
         if fst:
             if preproc:
                 # For languages with non-roman orthographies
                 form = self.morphology.language.preprocess(form)
             # If result is same as form and guess is True, reject
             anals = fst.transduce(form, seg_units=self.morphology.seg_units, reject_same=guess,
-                                  trace=trace, tracefeat=tracefeat, timeit=timeit)
+                                  trace=trace, tracefeat=tracefeat, timeit=timeit,
+                                  csr=self.csr if csr is None else csr)
             if to_dict:
                 anals = self.anals_to_dicts(anals)
             return anals
@@ -595,8 +697,8 @@ class POSMorphology:
 
     def gen(self, root, features=None, from_dict=False, postproc=False, update_feats=None,
             guess=False, simplified=False, phon=False, segment=False,
-            fst=None, timeit=False, trace=False):
-        """Generate word from root and features."""
+            fst=None, timeit=False, trace=False, csr=None):
+        """Generate word from root and features. csr overrides POSMorphology.csr."""
         features = features or self.defaultFS
         if update_feats:
             features = self.update_FS(FeatStruct(features), update_feats)
@@ -614,7 +716,8 @@ class POSMorphology:
 #        print("Features")
 #        print(features)
         if fst:
-            gens = fst.transduce(root, features, seg_units=self.morphology.seg_units, trace=trace, timeit=timeit)
+            gens = fst.transduce(root, features, seg_units=self.morphology.seg_units, trace=trace, timeit=timeit,
+                                 csr=self.csr if csr is None else csr)
             if postproc:
                 # For languages with non-roman orthographies
                 for gen in gens:
@@ -23,8 +23,15 @@
 #    Author: Michael Gasser <gasser@cs.indiana.edu>
 #
 #  2009-06-11: unification modified to accommodate 'fail' result
+#  2026-10-17: feature structures in FSSets are hash-consed, and FSSet.unify
+#    is memoized in a bounded table keyed by the interned feature structures
+#    of both operands; unifying with TOPFSS skips the cross product.
+#  2026-10-17: the unification memo is keyed by the ids of the interned
+#    feature structures and keeps its operands; the memo and the intern
+#    table are LRU, dropping their least recently used entries when full.
 #
 
+from collections import OrderedDict
 from .fs import *
 from .utils import *
 
@@ -33,7 +40,24 @@ from .utils import *
 ######################################################################
 
 class FSSet(set):
-    """Sets of feature structures."""
+    """Sets of feature structures.
+
+    The feature structures are frozen and hash-consed: equal FSs share one
+    canonical object, so comparing them is usually an identity test.
+    Results of unify() are memoized and may be shared, so FSSets used as
+    weights should be treated as immutable."""
+
+    # Canonical frozen FeatStructs
+    interned = OrderedDict()
+    max_interned = 50000
+    # (frozenset of FS ids, frozenset of FS ids) -> (FSSet, FSSet, result of unify());
+    # the operands are kept so that the ids aren't reused while the entry is there
+    unify_memo = OrderedDict()
+    max_unify_memo = 20000
+    unify_hits = 0
+    unify_misses = 0
+    # Set to False to turn off interning and memoization
+    memoize = True
 
     def __init__(self, *items):
         '''Create a feature structure set from items, normally a list of feature structures or strings.'''
@@ -48,6 +72,9 @@ class FSSet(set):
             else:
                 # Umm...how is it possible for itm not to be a feature structure?
                 items[index] = tuple(itm)
+                continue
+            if FSSet.memoize:
+                items[index] = FSSet.intern(itm)
         set.__init__(self, items)
 
     def __repr__(self):
@@ -77,6 +104,30 @@ class FSSet(set):
         return fsset
 
     def unify(self, fs2):
+        if FSSet.memoize:
+            # TOPFSS unifies with any nonempty set to give an equal set
+            if self is TOPFSS and fs2 and isinstance(fs2, FSSet):
+                return fs2
+            if fs2 is TOPFSS and self:
+                return self
+            key = (frozenset(map(id, self)), frozenset(map(id, fs2)))
+            memo = FSSet.unify_memo
+            entry = memo.get(key)
+            if entry is not None:
+                FSSet.unify_hits += 1
+                memo.move_to_end(key)
+                return entry[2]
+            FSSet.unify_misses += 1
+            result = self.cross_unify(fs2)
+            if len(memo) >= FSSet.max_unify_memo:
+                # Drop the least recently used entry
+                memo.popitem(last=False)
+            memo[key] = (self, fs2, result)
+            return result
+        return self.cross_unify(fs2)
+
+    def cross_unify(self, fs2):
+        """Unify every FS in self with every FS in fs2."""
         result1 = [simple_unify(f1, f2) for f1 in list(self) for f2 in list(fs2)]
         if every(lambda x: x == TOP, result1):
             # If everything unifies to TOP, return one of them
@@ -85,6 +136,27 @@ class FSSet(set):
             # Get rid of all instances of TOP and unification failures
             return FSSet(*filter(lambda x: x != 'fail', result1))
 
+    @staticmethod
+    def intern(fs):
+        """The canonical FeatStruct equal to the frozen FS fs."""
+        interned = FSSet.interned
+        canonical = interned.get(fs)
+        if canonical is None:
+            if len(interned) >= FSSet.max_interned:
+                # Drop the least recently used FS; existing FSSets keep their FSs
+                interned.popitem(last=False)
+            interned[fs] = canonical = fs
+        else:
+            interned.move_to_end(fs)
+        return canonical
+
+    @staticmethod
+    def clear_memo():
+        """Empty the interning and unification tables."""
+        FSSet.interned.clear()
+        FSSet.unify_memo.clear()
+        FSSet.unify_hits = FSSet.unify_misses = 0
+
     def inherit(self):
         """Inherit feature values for all members of set, returning new set."""
         items = [item.inherit() for item in self]
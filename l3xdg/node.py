@@ -54,6 +54,11 @@
 # 2014.02.04
 # -- Nodes know how to use entries that are already morphologically analyzed and/or
 #    have their crosslingual features already spelled out.
+# 2026.10.17
+# -- Node.initialize() caches the entries that result from lexicalization and
+#    inheritance in the lexicon (Lexicon.get_inherited()), keyed by the form,
+#    its morphological analyses, the dimensions, the languages, and the
+#    process, so inheritance happens only once for each form in a context.
 
 from .variable import *
 from .utils import PARSE, GENERATE, TRANSLATE
@@ -136,6 +141,17 @@ class Node:
             lex_indices = set()
         elif not isinstance(lex_indices, set):
             lex_indices = {lex_indices}
+        # Entries inherited for the same form in the same context are cached
+        inherit = self.languages or self.lexicon.hierarchical
+        if inherit:
+            inh_key = self.inh_key(dimensions, lex_indices)
+            cached = self.lexicon.get_inherited(inh_key)
+            if cached is not None:
+                self.entries = cached
+                self.scores = [0 for e in self.entries]
+                if not self.entries:
+                    print('NO ENTRIES FOR {}!'.format(self))
+                return
         entries = self.lexicon.lexicalize(self.form, clone=True, indices=lex_indices, any_other=self.analyses,
                                           verbosity=verbosity)
 #        print('{}/{} entries following lexicalization: {}'.format(self, self.form, entries))
@@ -151,7 +167,7 @@ class Node:
 
         # For each entry, inherit properties from lexical classes.
         # For flattened lexicons, the only inheritance that happens is across languages.
-        if self.languages or self.lexicon.hierarchical:
+        if inherit:
             unknown = None
             lang_abbrevs = [l.abbrev for l in self.target_languages]
             to_incorp = []
@@ -199,6 +215,8 @@ class Node:
                 for e in self.entries:
                     e.prob = e.xcount / total
 
+            self.lexicon.cache_inherited(inh_key, self.entries)
+
         else:
             self.entries = entries
             # Set entry probabilities on the basis of lex counts
@@ -221,6 +239,15 @@ class Node:
         if not self.entries:
             print('NO ENTRIES FOR {}!'.format(self))
 
+    def inh_key(self, dimensions, lex_indices):
+        """Key for the entries this node gets from lexicalization and inheritance
+        in the lexicon's inheritance cache."""
+        return (self.form, self.lexicon.analyses_key(self.analyses),
+                tuple(d.abbrev for d in dimensions),
+                tuple(l.abbrev for l in self.languages),
+                tuple(l.abbrev for l in self.target_languages),
+                self.process, self.transfer_xlex, frozenset(lex_indices))
+
     def finalize(self, verbosity=1):
         """Set lexical variable and normalize probabilities."""
         ## Variable for node's entries
@@ -42,10 +42,63 @@
 # 2011.04.25
 # -- Add heuristic search (SmartSearch), which uses the number of undetermined
 #    variables in a state's DStore to assign priority to states (nodes).
+# 2026.10.17
+# -- ParallelSmartSearch: best-first search that sends states from the fringe
+#    to a pool of worker processes, each of which explores a bounded subtree and
+#    sends back solutions and its remaining fringe. States travel in the form
+#    produced by Problem.pack_state(); the problem itself reaches the workers
+#    only once, when the pool is forked.
+# 2026.10.17
+# -- DFS(trail=True) searches without copying states, using the problem's
+#    trail_search() (for CSPs, backtracking by undoing changes to a single
+#    domain store). The search's budget is passed on to trail_search().
+# 2026.10.17
+# -- BranchAndBound: search for the k solutions with the lowest cost, pruning
+#    states whose cost already reaches that of the k-th best solution so far.
+# 2026.10.17
+# -- Searches can have a budget: a time limit (seconds) and a memory limit
+#    (megabytes of growth in the size of the process). When either is exceeded,
+#    the search stops, keeping the solutions already generated; budget_hit says
+#    which limit was reached and partial is the most nearly complete state
+#    found. The problem's deadline lets it stop propagating in time.
 
 CUTOFF = 1000
 
-import queue
+import queue, heapq, collections, multiprocessing, os, time
+try:
+    import resource
+except ImportError:
+    resource = None
+
+class Budget:
+    """Wall-clock and memory limits for one search. The memory limit is on the
+    growth in the resident size of the process since the search started."""
+
+    def __init__(self, time_limit=None, memory_limit=None):
+        self.time_limit = time_limit
+        self.memory_limit = memory_limit
+        self.deadline = time.time() + time_limit if time_limit else None
+        self.memory0 = Budget.memory() if memory_limit else 0
+
+    @staticmethod
+    def memory():
+        """Current resident size of the process in bytes (peak size if the current
+        size isn't available)."""
+        try:
+            with open('/proc/self/statm') as file:
+                return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, AttributeError):
+            if resource:
+                return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            return 0
+
+    def exceeded(self):
+        """'time' or 'memory' if that limit has been exceeded, otherwise None."""
+        if self.deadline is not None and time.time() > self.deadline:
+            return 'time'
+        if self.memory_limit and Budget.memory() - self.memory0 > self.memory_limit * 1048576:
+            return 'memory'
+        return None
 
 class Problem:
     """The abstract class for a formal problem.  You should subclass this and
@@ -60,6 +113,8 @@ class Problem:
         self.initial = initial
         self.goal = goal
         self.report = 0
+        # Time after which states should stop working (set during searches with budgets)
+        self.deadline = None
         
     def successor(self, state, verbosity=0):
         """Given a state, return a sequence of (action, state) pairs reachable
@@ -86,6 +141,33 @@ class Problem:
         """For optimization problems, each state has a value.  Hill-climbing
         and related algorithms try to maximize this value."""
         raise NotImplementedError("%s is an abstract class" % self.__class__.__name__)
+
+    def cost(self, state):
+        """For branch-and-bound search, the cost of a state, which must not
+        decrease in the state's successors."""
+        raise NotImplementedError("%s is an abstract class" % self.__class__.__name__)
+
+    def set_bound(self, state, bound):
+        """Let state know that it will be pruned if its cost reaches bound, so
+        that the problem can stop working on it early. By default does nothing."""
+        pass
+
+    def pack_state(self, state):
+        """Return a picklable representation of state that unpack_state() can
+        turn back into a state, for searching in other processes."""
+        raise NotImplementedError("%s is an abstract class" % self.__class__.__name__)
+
+    def unpack_state(self, packed):
+        """Recreate a state from the output of pack_state()."""
+        raise NotImplementedError("%s is an abstract class" % self.__class__.__name__)
+
+    def trail_search(self, cutoff=CUTOFF, snapshot=0,
+                     test_verbosity=False, expand_verbosity=False, tracevar=None,
+                     budget=None):
+        """A generator for solution nodes in depth-first order that changes a
+        single state in place and undoes the changes on backtracking. The search
+        stops when budget (a Budget) is exceeded."""
+        raise NotImplementedError("%s is an abstract class" % self.__class__.__name__)
     
 class Node:
     """A node in a search tree. Contains a pointer to the parent (the node
@@ -139,8 +221,55 @@ class Node:
 
 class Search:
 
-    def __init__(self, cutoff=CUTOFF):
+    # Whether the search needs states with FlatDStores
+    flat = False
+
+    def __init__(self, cutoff=CUTOFF, time_limit=None, memory_limit=None):
         self.cutoff = cutoff
+        self.set_budget(time_limit=time_limit, memory_limit=memory_limit)
+
+    def set_budget(self, time_limit=None, memory_limit=None):
+        """Limit each search to time_limit seconds and memory_limit megabytes
+        (None for no limit)."""
+        self.time_limit = time_limit
+        self.memory_limit = memory_limit
+        # 'time' or 'memory' if the last search stopped because of the budget
+        self.budget_hit = None
+        # The node with the best value among those that were distributed
+        self.partial = None
+        self.partial_value = None
+
+    def start_budget(self, problem):
+        """Start the clock for a search of problem."""
+        self.budget_hit = None
+        self.partial = None
+        self.partial_value = None
+        budget = Budget(self.time_limit, self.memory_limit)
+        problem.deadline = budget.deadline
+        return budget
+
+    def over_budget(self, budget, problem):
+        """Whether the search has to stop because its budget is used up."""
+        hit = budget.exceeded()
+        if hit:
+            self.budget_hit = hit
+            if problem.report:
+                print('>>>> {} BUDGET EXCEEDED <<<<'.format(hit.upper()))
+        return hit
+
+    def end_budget(self, budget, problem):
+        """Stop the clock. States may have been skipped because the deadline
+        passed during propagation, so the budget counts as used up if the search
+        ended after the deadline."""
+        problem.deadline = None
+        if not self.budget_hit:
+            self.over_budget(budget, problem)
+
+    def note_partial(self, node, value):
+        """Remember node if it's the best incomplete state so far."""
+        if self.partial is None or value < self.partial_value:
+            self.partial = node
+            self.partial_value = value
 
 class TreeSearch(Search):
 
@@ -156,19 +285,28 @@ class TreeSearch(Search):
         fringe.put(Node(problem.initial))
         n = 0
         solutions = []
-        while not fringe.empty() and n < self.cutoff:
-            if test_verbosity or expand_verbosity:
-                print("\n++++ Nodes searched:", n, '++++')
-            node = fringe.get()
-            if problem.goal_test(node.state,
-                                 verbosity=test_verbosity, 
-                                 tracevar=tracevar):
-                yield node
-            for item in node.expand(problem,
-                                    verbosity=expand_verbosity, 
-                                    tracevar=tracevar):
-                fringe.put(item)
-            n += 1
+        budget = self.start_budget(problem)
+        try:
+            while not fringe.empty() and n < self.cutoff:
+                if self.over_budget(budget, problem):
+                    break
+                if test_verbosity or expand_verbosity:
+                    print("\n++++ Nodes searched:", n, '++++')
+                node = fringe.get()
+                if problem.goal_test(node.state,
+                                     verbosity=test_verbosity, 
+                                     tracevar=tracevar):
+                    yield node
+                successors = node.expand(problem,
+                                         verbosity=expand_verbosity, 
+                                         tracevar=tracevar)
+                if successors:
+                    self.note_partial(node, problem.value(node.state))
+                for item in successors:
+                    fringe.put(item)
+                n += 1
+        finally:
+            self.end_budget(budget, problem)
 
 class BFS(TreeSearch):
     
@@ -176,9 +314,31 @@ class BFS(TreeSearch):
         TreeSearch.__init__(self, queue.Queue, cutoff=cutoff)
 
 class DFS(TreeSearch):
+    """Depth-first search. With trail=True, the search is delegated to the
+    problem's trail_search(), which keeps only the current path in memory;
+    snapshot and the budget are passed on to it."""
 
-    def __init__(self, cutoff=CUTOFF):
+    def __init__(self, cutoff=CUTOFF, trail=False, snapshot=0):
         TreeSearch.__init__(self, queue.LifoQueue, cutoff=cutoff)
+        self.trail = trail
+        self.snapshot = snapshot
+
+    def gen(self, problem,
+            test_verbosity=False, expand_verbosity=False,
+            tracevar=None):
+        '''A generator for solutions.'''
+        if not self.trail:
+            yield from TreeSearch.gen(self, problem, test_verbosity=test_verbosity,
+                                      expand_verbosity=expand_verbosity, tracevar=tracevar)
+            return
+        budget = self.start_budget(problem)
+        try:
+            yield from problem.trail_search(cutoff=self.cutoff, snapshot=self.snapshot,
+                                            test_verbosity=test_verbosity,
+                                            expand_verbosity=expand_verbosity,
+                                            tracevar=tracevar, budget=budget)
+        finally:
+            self.end_budget(budget, problem)
 
 class SmartSearch(Search):
     '''Sort the queue by # of determined variables in the DStores of the states.'''
@@ -195,26 +355,220 @@ class SmartSearch(Search):
         fringe.put((problem.value(init_node.state), init_node))
         n = 0
         solutions = []
-        while not fringe.empty() and n < self.cutoff:
-            if (n+1) % 50 == 0 or test_verbosity or expand_verbosity:
+        budget = self.start_budget(problem)
+        try:
+            while not fringe.empty() and n < self.cutoff:
+                if self.over_budget(budget, problem):
+                    break
+                if (n+1) % 50 == 0 or test_verbosity or expand_verbosity:
+                    if test_verbosity or expand_verbosity:
+                        print()
+                    print('>>>> SEARCH NODE {} <<<<'.format(n+1))
+                if n >= self.cutoff:
+                    print('STOPPING AT CUTOFF')
+                priority, node = fringe.get()
+                if problem.goal_test(node.state,
+                                     verbosity=test_verbosity, 
+                                     tracevar=tracevar):
+                    yield node
+                successors = node.expand(problem,
+                                         verbosity=expand_verbosity, 
+                                         tracevar=tracevar)
+                if successors:
+                    self.note_partial(node, problem.value(node.state))
+                for item in successors:
+                    val = problem.value(item.state)
+#                    print('Adding ({},{}) to fringe'.format(val, item))
+                    fringe.put((val, item))
+                n += 1
+        finally:
+            self.end_budget(budget, problem)
+        if test_verbosity or expand_verbosity:
+            print()
+        if problem.report:
+            print('>>>> HALTED AT SEARCH NODE', n, '<<<<')
+
+class BranchAndBound(SmartSearch):
+    """Best-first search for the k solutions with the lowest cost (problem.cost()).
+    Once k solutions have been found, states whose cost meets or exceeds that of
+    the worst of them are pruned. The solutions are generated, cheapest first,
+    only when the search is finished (or the budget is used up)."""
+
+    def __init__(self, cutoff=CUTOFF, k=1):
+        SmartSearch.__init__(self, cutoff=cutoff)
+        self.k = k
+
+    def gen(self, problem,
+            test_verbosity=False, expand_verbosity=False,
+            tracevar=None):
+        '''A generator for the k best solutions.'''
+        # States ordered by cost, then value
+        fringe = [(problem.cost(problem.initial), problem.value(problem.initial), 0, Node(problem.initial))]
+        order = 0
+        # The best solutions so far, the worst one first: (-cost, -order, node)
+        best = []
+        bound = None
+        n = 0
+        pruned = 0
+        budget = self.start_budget(problem)
+        try:
+            while fringe and n < self.cutoff:
+                if self.over_budget(budget, problem):
+                    break
+                if (n+1) % 50 == 0 or test_verbosity or expand_verbosity:
+                    if test_verbosity or expand_verbosity:
+                        print()
+                    print('>>>> SEARCH NODE {} <<<<'.format(n+1))
+                cost, value, o, node = heapq.heappop(fringe)
+                if bound is not None and cost >= bound:
+                    pruned += 1
+                    continue
+                problem.set_bound(node.state, bound)
+                if problem.goal_test(node.state,
+                                     verbosity=test_verbosity,
+                                     tracevar=tracevar):
+                    cost = problem.cost(node.state)
+                    if bound is None or cost < bound:
+                        heapq.heappush(best, (-cost, -o, node))
+                        if len(best) > self.k:
+                            heapq.heappop(best)
+                        if len(best) == self.k:
+                            bound = -best[0][0]
+                successors = node.expand(problem,
+                                         verbosity=expand_verbosity,
+                                         tracevar=tracevar)
+                if successors:
+                    self.note_partial(node, problem.value(node.state))
+                for item in successors:
+                    cost = problem.cost(item.state)
+                    if bound is None or cost < bound:
+                        order += 1
+                        heapq.heappush(fringe, (cost, problem.value(item.state), order, item))
+                    else:
+                        pruned += 1
+                n += 1
+        finally:
+            self.end_budget(budget, problem)
+        if n >= self.cutoff:
+            print('STOPPING AT CUTOFF')
+        if problem.report:
+            print('>>>> HALTED AT SEARCH NODE', n, '<<<<; PRUNED', pruned)
+        best.sort(reverse=True)
+        for cost, o, node in best:
+            yield node
+
+## Parallel search: the problem is installed in each worker process when the
+## pool starts; after that only packed states go back and forth.
+
+_worker_problem = None
+_worker_options = {}
+
+def _init_worker(problem, test_verbosity=False, expand_verbosity=False, tracevar=None):
+    global _worker_problem, _worker_options
+    _worker_problem = problem
+    _worker_options = {'test_verbosity': test_verbosity, 'expand_verbosity': expand_verbosity,
+                       'tracevar': tracevar or []}
+
+def _explore(packed, budget):
+    """Best-first search of the subtree below a packed state, expanding at most
+    budget states. Returns the packed solutions, the remaining fringe as
+    (value, packed state) pairs, and the number of states expanded."""
+    problem = _worker_problem
+    test_verbosity = _worker_options['test_verbosity']
+    expand_verbosity = _worker_options['expand_verbosity']
+    tracevar = _worker_options['tracevar']
+    fringe = [(0, 0, problem.unpack_state(packed))]
+    order = 0
+    solutions = []
+    n = 0
+    while fringe and n < budget:
+        if problem.deadline and time.time() > problem.deadline:
+            break
+        value, o, state = heapq.heappop(fringe)
+        if problem.goal_test(state, verbosity=test_verbosity, tracevar=tracevar):
+            solutions.append(problem.pack_state(state))
+        for action, next in problem.successor(state, verbosity=expand_verbosity):
+            order += 1
+            heapq.heappush(fringe, (problem.value(next), order, next))
+        n += 1
+    fringe.sort()
+    return solutions, [(value, problem.pack_state(state)) for value, o, state in fringe], n
+
+class ParallelSmartSearch(SmartSearch):
+    """SmartSearch in which subtrees below the best states on the fringe are
+    explored by a pool of processes. Each task expands at most chunk states;
+    the cutoff applies to the total number of states expanded. If ordered is
+    True, results are merged in the order in which tasks were sent out, so the
+    solutions and their order don't depend on how fast the workers are.
+    Requires the 'fork' start method; otherwise the search runs in this process."""
+
+    flat = True
+
+    def __init__(self, cutoff=CUTOFF, processes=None, chunk=20, ordered=True):
+        SmartSearch.__init__(self, cutoff=cutoff)
+        self.processes = processes or multiprocessing.cpu_count()
+        self.chunk = chunk
+        self.ordered = ordered
+
+    def gen(self, problem,
+            test_verbosity=False, expand_verbosity=False,
+            tracevar=None):
+        '''A generator for solutions.'''
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            print('No fork start method; searching in one process')
+            yield from SmartSearch.gen(self, problem, test_verbosity=test_verbosity,
+                                       expand_verbosity=expand_verbosity,
+                                       tracevar=tracevar)
+            return
+        # Start the clock before forking so that the workers get the deadline
+        limits = self.start_budget(problem)
+        pool = context.Pool(self.processes, initializer=_init_worker,
+                            initargs=(problem, test_verbosity, expand_verbosity, tracevar))
+        # Tasks finished, in the order they finish (for unordered merging)
+        finished = queue.Queue()
+        # Tasks running: {task: (result, budget)}
+        running = {}
+        fringe = [(problem.value(problem.initial), 0, problem.pack_state(problem.initial))]
+        order = 0
+        task = 0
+        # States expanded or reserved for running tasks
+        n = 0
+        reserved = 0
+        try:
+            while fringe or running:
+                # Keep the workers busy
+                while fringe and len(running) < self.processes and n + reserved < self.cutoff:
+                    value, o, packed = heapq.heappop(fringe)
+                    budget = min(self.chunk, self.cutoff - n - reserved)
+                    result = pool.apply_async(_explore, (packed, budget),
+                                              callback=lambda r, t=task: finished.put(t),
+                                              error_callback=lambda e, t=task: finished.put(t))
+                    running[task] = (result, budget)
+                    reserved += budget
+                    task += 1
+                if not running or self.over_budget(limits, problem):
+                    break
+                if self.ordered:
+                    t = min(running)
+                else:
+                    t = finished.get()
+                result, budget = running.pop(t)
+                solutions, states, expanded = result.get()
+                reserved -= budget
+                n += expanded
                 if test_verbosity or expand_verbosity:
-                    print()
-                print('>>>> SEARCH NODE {} <<<<'.format(n+1))
+                    print('>>>> SEARCH NODES {}, SOLUTIONS {} <<<<'.format(n, len(solutions)))
+                for packed in solutions:
+                    yield Node(problem.unpack_state(packed))
+                for value, packed in states:
+                    order += 1
+                    heapq.heappush(fringe, (value, order, packed))
             if n >= self.cutoff:
                 print('STOPPING AT CUTOFF')
-            priority, node = fringe.get()
-            if problem.goal_test(node.state,
-                                 verbosity=test_verbosity, 
-                                 tracevar=tracevar):
-                yield node
-            for item in node.expand(problem,
-                                    verbosity=expand_verbosity, 
-                                    tracevar=tracevar):
-                val = problem.value(item.state)
-#                print('Adding ({},{}) to fringe'.format(val, item))
-                fringe.put((val, item))
-            n += 1
-        if test_verbosity or expand_verbosity:
-            print()
+        finally:
+            pool.terminate()
+            self.end_budget(limits, problem)
         if problem.report:
             print('>>>> HALTED AT SEARCH NODE', n, '<<<<')
@@ -0,0 +1,304 @@
+########################################################################
+#
+#   This file is part of the HLTDI L^3 project
+#       for parsing, generation, and translation within the
+#       framework of  Extensible Dependency Grammar.
+#
+#   Copyright (C) 2026
+#   The HLTDI L^3 Team <gasser@cs.indiana.edu>
+#
+#   This program is free software: you can redistribute it and/or
+#   modify it under the terms of the GNU General Public License as
+#   published by the Free Software Foundation, either version 3 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# 2026.10.17
+# -- Created.
+#    Pre-fork server for parsing and translation. The parent process loads
+#    the languages (lexicons, linking, morphology, and all of the FSTs that
+#    will be needed) once, moves everything it has loaded out of the
+#    garbage collector's view (gc.freeze()) so that collections in the
+#    workers don't write to the shared pages, and forks workers. The
+#    workers inherit the loaded languages copy-on-write and take turns
+#    accepting connections on a Unix socket (multiprocessing.connection),
+#    so the memory for the languages and FSTs is shared by all of them.
+#    A worker that dies, or that has served max_requests requests, is
+#    replaced by a new fork of the parent.
+#
+#    >>> s = XDGServer('es', ['gn'], workers=16, address='/tmp/l3.sock')
+#    >>> s.serve_forever()
+#
+#    and in another process:
+#
+#    >>> c = XDGClient('/tmp/l3.sock')
+#    >>> c.translate('la mujer vio la casa')
+# 2026.10.18
+# -- Unless an authkey is given, the server makes a random one and writes
+#    it to a file beside the socket that only its user can read (see
+#    keypath()); clients read it from there if they aren't given one.
+#    Workers that fail print the traceback before they exit.
+
+import os, io, sys, gc, time, signal, contextlib, traceback
+from multiprocessing.connection import Listener, Client
+from .language import Language
+from .xdg import XDG
+from .utils import PARSE
+
+class XDGServer:
+    """Forked workers serving parse and translate requests for one source
+    language and its target languages."""
+
+    def __init__(self, source, targets=None, grammar='chunk', workers=4,
+                 address=None, authkey=None,
+                 flatten=True, transfer=True, semantics=False, snapshot=False,
+                 cache=False, max_requests=0, quiet=True, verbosity=0):
+        """source is a language abbreviation and targets a list of them.
+        If authkey is None, a random one is made and written to keypath().
+        If cache is True, workers reuse compiled problems for sentences
+        they've seen (XDG.compile()). If max_requests is not 0, a worker
+        exits after this many requests and is replaced. If quiet is True,
+        workers' output is discarded."""
+        self.source = source
+        self.targets = targets or []
+        self.grammar = grammar
+        self.n_workers = workers
+        self.address = address or os.path.join('/tmp', 'l3xdg-{}.sock'.format(os.getpid()))
+        self.authkey = authkey
+        self.flatten = flatten
+        self.transfer = transfer
+        self.semantics = semantics
+        self.snapshot = snapshot
+        self.cache = cache
+        self.max_requests = max_requests
+        self.quiet = quiet
+        self.verbosity = verbosity
+        self.languages = []
+        self.listener = None
+        # pid: worker number
+        self.workers = {}
+        self.stopping = False
+
+    def __repr__(self):
+        return 'XDGServer({}->{}, {} workers, {})'.format(self.source, ','.join(self.targets),
+                                                        self.n_workers, self.address)
+
+    ## Parent
+
+    def load(self):
+        """Load the languages and their FSTs and freeze the loaded objects."""
+        lang_ids = [self.source] + [t for t in self.targets if t != self.source]
+        if self.semantics:
+            lang_ids.append('sem')
+        self.languages = Language.load_langs(lang_ids, grammar=self.grammar, flatten=self.flatten,
+                                             pickle=False, snapshot=self.snapshot,
+                                             verbosity=self.verbosity)
+        for language in self.languages:
+            if language.morph_processing and language.morphology:
+                # The source is analyzed and the targets generated
+                language.preload_fsts(analysis=language.abbrev == self.source,
+                                      generation=language.abbrev != self.source)
+        # Everything loaded so far lives as long as the server, so the workers'
+        # collections don't need to look at it (and touch its pages)
+        gc.collect()
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+
+    def start(self):
+        """Load the languages if this hasn't happened, open the socket, and fork the workers."""
+        if not self.languages:
+            self.load()
+        if os.path.exists(self.address):
+            os.remove(self.address)
+        if not self.authkey:
+            self.authkey = os.urandom(32)
+            XDGServer.write_key(self.address, self.authkey)
+        self.listener = Listener(self.address, family='AF_UNIX', authkey=self.authkey)
+        for number in range(self.n_workers):
+            self.fork(number)
+        print('{} started'.format(self))
+
+    def fork(self, number):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                self.work(number)
+            except BaseException:
+                traceback.print_exc()
+                sys.stderr.flush()
+                status = 1
+            finally:
+                os._exit(status)
+        self.workers[pid] = number
+        return pid
+
+    def serve_forever(self):
+        """Start the workers and replace any that exit until stop() is called
+        or the process gets SIGTERM or SIGINT."""
+        if not self.listener:
+            self.start()
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+        try:
+            while not self.stopping and self.workers:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                except InterruptedError:
+                    continue
+                number = self.workers.pop(pid, None)
+                if number is not None and not self.stopping:
+                    if self.verbosity:
+                        print('Worker {} ({}) exited with status {}; replacing it'.format(number, pid, status))
+                    self.fork(number)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stop the workers and close the socket."""
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(self.workers):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            del self.workers[pid]
+        if self.listener:
+            self.listener.close()
+            self.listener = None
+            for path in (self.address, XDGServer.keypath(self.address)):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @staticmethod
+    def keypath(address):
+        """The file where the authkey for the server at address is kept."""
+        return address + '.key'
+
+    @staticmethod
+    def write_key(address, authkey):
+        """Write authkey to the key file for address, readable only by this user."""
+        path = XDGServer.keypath(address)
+        if os.path.exists(path):
+            os.remove(path)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as stream:
+            stream.write(authkey)
+
+    @staticmethod
+    def read_key(address):
+        with open(XDGServer.keypath(address), 'rb') as stream:
+            return stream.read()
+
+    ## Workers
+
+    def work(self, number):
+        """Accept connections and answer requests on them."""
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        if self.quiet:
+            sys.stdout = open(os.devnull, 'w')
+        self.workers = {}
+        served = 0
+        try:
+            while not self.max_requests or served < self.max_requests:
+                try:
+                    conn = self.listener.accept()
+                except Exception:
+                    # Failed authentication or a client that went away
+                    continue
+                with conn:
+                    while not self.max_requests or served < self.max_requests:
+                        try:
+                            request = conn.recv()
+                        except (EOFError, OSError):
+                            break
+                        conn.send(self.handle(request))
+                        served += 1
+        finally:
+            # Workers exit without running atexit functions
+            for language in self.languages:
+                language.close_anal_cache()
+
+    def handle(self, request):
+        """The response to request, a dict with 'op' ('parse', 'translate', or
+        'ping'), 'sentence', and optionally 'targets' (for 'translate'),
+        'all_sols', and 'time_limit'. The response is a dict with 'solutions',
+        a list of dicts with each solution's 'name', 'output' (the translation),
+        and 'display' (its graphs as text), or 'error'."""
+        op = request.get('op', 'parse')
+        if op == 'ping':
+            return {'pid': os.getpid()}
+        try:
+            t0 = time.time()
+            targets = request.get('targets', self.targets) if op == 'translate' else []
+            make = XDG.compile if self.cache else XDG
+            problem = make(request['sentence'], self.source, target=targets, grammar=self.grammar,
+                           load_semantics=self.semantics, transfer_xlex=self.transfer and bool(targets),
+                           flatten_lexicon=self.flatten, process=PARSE, pickle=False,
+                           verbosity=self.verbosity)
+            solutions = problem.solve(all_sols=request.get('all_sols', True),
+                                      time_limit=request.get('time_limit'),
+                                      interactive=False, verbose=self.verbosity)
+            return {'solutions': [XDGServer.describe(s) for s in solutions],
+                    'time': time.time() - t0}
+        except Exception as e:
+            return {'error': '{}: {}'.format(type(e).__name__, e)}
+
+    @staticmethod
+    def describe(solution):
+        text = io.StringIO()
+        with contextlib.redirect_stdout(text):
+            output = solution.io()
+            solution.display(file=text)
+        return {'name': repr(solution), 'output': output, 'display': text.getvalue()}
+
+class XDGClient:
+    """A connection to an XDGServer."""
+
+    def __init__(self, address, authkey=None):
+        """authkey is the server's; if it's None, it's read from the server's
+        key file (XDGServer.keypath())."""
+        self.conn = Client(address, family='AF_UNIX',
+                           authkey=authkey or XDGServer.read_key(address))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def request(self, **request):
+        self.conn.send(request)
+        return self.conn.recv()
+
+    def parse(self, sentence, all_sols=True, time_limit=None):
+        return self.request(op='parse', sentence=sentence, all_sols=all_sols, time_limit=time_limit)
+
+    def translate(self, sentence, targets=None, all_sols=True, time_limit=None):
+        request = {'op': 'translate', 'sentence': sentence, 'all_sols': all_sols,
+                   'time_limit': time_limit}
+        if targets:
+            request['targets'] = targets
+        return self.request(**request)
+
+    def ping(self):
+        return self.request(op='ping')
@@ -75,10 +75,47 @@
 # 2012.01.29
 # -- "Recursive" projectors are not eliminated when their variables are determined
 #    (because they could still cause the CSpace to fail).
-
-import random, time
+# 2026.10.17
+# -- CSpaces with FlatDStores don't record their children, so that discarded
+#    branches of the search can be freed.
+# 2026.10.17
+# -- Propagation uses an agenda without duplicates: a propagator woken while it is
+#    still waiting to run isn't queued again, cheap propagators run before expensive
+#    ones, and propagators are only woken by the events they care about. Entailed
+#    and failed propagators are kept in bitmasks indexed by propagator id.
+#    The agenda is a heap ordered by priority, so a cheap propagator that is woken
+#    runs before expensive ones that were already waiting.
+# 2026.10.17
+# -- Distributor heuristics can be selected by name: first-fail, dom/wdeg
+#    (failures counted from the failed propagators of each CSpace), impact-based
+#    variable selection, and random variable and value choices that are
+#    reproducible for a given seed. Variables are selected with min() rather
+#    than by sorting all of the undetermined variables. Heuristics that aren't
+#    given to set_heuristics() go back to the ones the Distributor was created
+#    with, so the options of one search don't carry over to the next.
+# 2026.10.17
+# -- CSPs can pack a CSpace with a FlatDStore into a small picklable tuple
+#    (domains, ids of undetermined variables and propagators, penalty, masks)
+#    and unpack it again, so that search.ParallelSmartSearch can send states
+#    to worker processes that already have the problem.
+# 2026.10.17
+# -- Depth-first search without cloning (CSP.trail_search()): distribution
+#    changes a single TrailDStore in place and backtracking undoes the changes
+#    recorded on its trail. Optionally the store is saved every few levels and
+#    states above a saved store are recomputed from it rather than kept on the
+#    trail. The search loop itself is trail.trail_dfs(), shared with hiiktuu.
+# 2026.10.17
+# -- Branch-and-bound search: a CSP's cost is the penalty of the CSpace, and a
+#    CSpace with a bound fails as soon as its penalty reaches the bound.
+# 2026.10.17
+# -- CSpace.run() takes a deadline; propagation that goes past it stops and
+#    the CSpace is skipped. goal_test() uses the problem's deadline, set by
+#    searches with a time budget.
+
+import random, sys, time, heapq, itertools
 from . import search
 from .constraint import *
+from .trail import trail_dfs
 
 # Principle order for sorting projectors
 PRINCS = \
@@ -95,8 +132,8 @@ PRINCS = \
 class Solver:
     """A solver has a constraint satisfaction problem and a search algorithm."""
 
-    def __init__(self, csp=None, search_algo=search.BFS()):
-        self.search_algo = search_algo
+    def __init__(self, csp=None, search_algo=None):
+        self.search_algo = search_algo or search.BFS()
         self.csp = csp
 
     def make_gen(self, test_verbosity=0, expand_verbosity=0,
@@ -137,7 +174,11 @@ class CSP(search.Problem):
         # whether to use projectors instead of propagators
         self.project = project
         self.report = report
+        # Whether the last search used up its budget, and its best incomplete state
+        self.budget_hit = None
+        self.partial = None
         self.add_propagators()
+        self.index_propagators()
         search.Problem.__init__(self,
                                 CSpace(name='', dstore=self.dstore,
                                        propagators=self.propagators,
@@ -153,9 +194,103 @@ class CSP(search.Problem):
         self.projectors = []
         raise NotImplementedError("{} is an abstract class".format(self.__class__.__name__))
 
+    def index_propagators(self):
+        """Give each propagator an id and the corresponding bit, for the entailed and
+        failed masks in CSpaces. Propagators are reached through the problem's list and
+        through the variables that could wake them up."""
+        n = 0
+        # Propagators by id
+        self.propagator_list = []
+        variables = set(self.dstore.undetermined)
+        for prop in self.propagators:
+            variables.update(prop.variables)
+        for var in [None] + list(variables):
+            props = self.propagators if var is None else var.propagators
+            for prop in props:
+                if prop.id is None:
+                    prop.id = n
+                    prop.bit = 1 << n
+                    n += 1
+                    self.propagator_list.append(prop)
+
+    def trail_search(self, cutoff=search.CUTOFF, snapshot=0,
+                     test_verbosity=0, expand_verbosity=0, tracevar=None,
+                     budget=None):
+        """Depth-first search in a single TrailDStore, generating search Nodes for
+        solutions (each with a snapshot of the store). Only the current path is
+        kept: for each level, the CSpace and the constraint used to distribute, and
+        for each untried alternative, the position on the trail to return to. If
+        snapshot is n > 0, the store is saved every n levels and the trail is
+        cleared; backtracking above the latest saved store restores the nearest
+        one and recomputes the states below it. The search stops when budget (a
+        search.Budget) is exceeded, and propagation stops at its deadline."""
+        tracevar = tracevar or []
+        root = self.initial
+        dstore = TrailDStore(name='trail', level=root.dstore.level+1,
+                             problem=root.dstore.problem, parent=root.dstore)
+        state = CSpace(name='', dstore=dstore, propagators=root.propagators,
+                       variables=root.variables, depth=0)
+
+        def examine(state):
+            if self.goal_test(state, verbosity=test_verbosity, tracevar=tracevar):
+                return search.Node(state.trail_copy()), False
+            return None, state.status == CSpace.distributable
+
+        def select(dstore):
+            return self.distributor.select(dstore, verbosity=expand_verbosity)
+
+        if budget:
+            self.deadline = budget.deadline
+        try:
+            n = yield from trail_dfs(state, examine, select, cutoff, snapshot=snapshot,
+                                     snap_name='trail{}', tracevar=tracevar,
+                                     stop=budget and budget.exceeded)
+        finally:
+            if budget:
+                self.deadline = None
+        if n >= cutoff:
+            print('STOPPING AT CUTOFF')
+
+    def cost(self, state):
+        """The cost of a CSpace for branch-and-bound search: its penalty."""
+        return state.penalty
+
+    def set_bound(self, state, bound):
+        state.bound = bound
+
+    def pack_state(self, state):
+        """A picklable representation of a CSpace whose DStore is a FlatDStore.
+        Variables and propagators are represented by their ids, so the problem
+        must have its variables in self.varsL."""
+        dstore = state.dstore
+        return (state.name, state.depth, state.status, state.penalty,
+                dstore.domains,
+                [v.id for v in dstore.undetermined],
+                [p.id for p in state.propagators],
+                [p.id for p in state.failed_props],
+                state.entailed_bits, state.failed_bits)
+
+    def unpack_state(self, packed):
+        """Recreate a CSpace from the output of pack_state(). The new FlatDStore
+        is a child of the problem's root store."""
+        name, depth, status, penalty, domains, undet, props, failed, entailed_bits, failed_bits = packed
+        variables = self.varsL
+        propagators = self.propagator_list
+        dstore = FlatDStore(name=name, level=depth, problem=self.dstore.problem,
+                            parent=self.dstore, domains=domains)
+        dstore.undetermined = [variables[i] for i in undet]
+        state = CSpace(name=name, dstore=dstore, depth=depth, penalty=penalty,
+                       propagators=[propagators[i] for i in props],
+                       failed_props=[propagators[i] for i in failed],
+                       entailed_bits=entailed_bits, failed_bits=failed_bits,
+                       variables=self.initial.variables)
+        state.status = status
+        return state
+
     def goal_test(self, state, verbosity=0, tracevar=None):
-        state.run(verbosity=verbosity, tracevar=tracevar)
+        state.run(verbosity=verbosity, tracevar=tracevar, deadline=self.deadline)
 #                  project=self.project)
+        self.distributor.observe(state)
         return state.status == CSpace.succeeded
 
     def successor(self, state, verbosity=0):
@@ -218,14 +353,18 @@ class CSpace:
                  # penalty so far for failed propagators (in this CSpace
                  # and its ancestors)
                  penalty=0,
-                 # propagators that are entailed or have failed in the CSpace
-                 entailed = None, failed_props = None,
+                 # propagators that have failed in the CSpace
+                 failed_props = None,
+                 # bitmasks of ids of propagators that are entailed or have failed
+                 entailed_bits=0, failed_bits=0,
                  # projectors that have been eliminated because left or right
                  # variables are determined
 #                 dead_projectors=None,
                  # projectors whose variables are determined but need to
                  # still be considered because they're recursive
 #                 recursive_projectors=None,
+                 # variable distributed on to create this CSpace
+                 branch_var=None,
                  variables=None, parent=None, depth=0, verbosity=0):
         self.name = name
         self.dstore = dstore
@@ -236,16 +375,22 @@ class CSpace:
 ##        self.dying_projectors = set()
         # Variables determined on the current iteration
         self.newly_determined = set()
-        self.entailed = entailed or []
+        self.entailed_bits = entailed_bits
         # Propagators that have failed but are allowed to
         self.failed_props = failed_props or []
+        self.failed_bits = failed_bits
         self.parent = parent
+        self.branch_var = branch_var
+        # Size of the search space, computed when needed
+        self.size = None
         # Only for debugging?
         self.children = []
         self.status = CSpace.running
         self.variables = variables
         self.depth = depth
         self.penalty = penalty
+        # Penalty at which the CSpace fails during branch-and-bound search
+        self.bound = None
         if not self.variables:
             self.variables = set()
             for prop in propagators:
@@ -273,6 +418,43 @@ class CSpace:
         for var in self.variables:
             var.pprint(self.dstore, spaces=2)
 
+    def get_size(self):
+        """A measure of the size of the remaining search space: the number of
+        undecided values of the undetermined variables."""
+        if self.size is None:
+            dstore = self.dstore
+            self.size = sum(len(v.get_undecided(dstore=dstore)) for v in dstore.undetermined)
+        return self.size
+
+    def trail_child(self, var, constraint, suffix):
+        """Apply a distribution constraint to this CSpace's TrailDStore in place,
+        returning the CSpace for the result."""
+        dstore = self.dstore
+        # Needed for impact-based distribution, before the store changes
+        self.get_size()
+        constraint.infer(dstore=dstore, verbosity=0, tracevar=[])
+        for v in constraint.variables:
+            v.determined(dstore=dstore, verbosity=0)
+        return CSpace(name=self.name+suffix, depth=self.depth+1,
+                      variables=self.variables,
+                      propagators=var.propagators[:],
+                      penalty=self.penalty,
+                      parent=self,
+                      branch_var=var,
+                      dstore=dstore,
+                      failed_props=self.failed_props[:],
+                      entailed_bits=self.entailed_bits,
+                      failed_bits=self.failed_bits)
+
+    def trail_copy(self):
+        """A copy of this CSpace with a snapshot of its TrailDStore."""
+        copy = CSpace(name=self.name, dstore=self.dstore.snapshot(name=self.name),
+                      variables=self.variables, depth=self.depth, penalty=self.penalty,
+                      failed_props=self.failed_props[:],
+                      entailed_bits=self.entailed_bits, failed_bits=self.failed_bits)
+        copy.status = self.status
+        return copy
+
     def fixed_point(self, awaken):
         if len(awaken) == 0:
             # No more constraints are awake
@@ -288,10 +470,12 @@ class CSpace:
 
     def run(self, verbosity=0, tracevar=None, traceprops=[], cutoff=100,
             # whether to use projectors instead of propagators
-            project=False):
+            project=False,
+            # time.time() after which to give up
+            deadline=None):
         """Run all of the awake propagators repeatedly until a fixed
         point is reached or propagation fails because max_penalty
-        is reached."""
+        is reached. If the deadline passes first, the CSpace is skipped."""
         if verbosity:
             s = 'RUNNING {}, penalty: {}, undetermined vars: {}/{}'
             undet = len(self.dstore.undetermined)
@@ -302,7 +486,9 @@ class CSpace:
 ##            return self.run_projectors(verbosity=verbosity, tracevar=tracevar,
 ##                                       traceprojs=traceprops, cutoff=cutoff)
 ##        else:
-        awaken = self.propagators
+        awaken = CSpace.make_agenda(self.propagators)
+        # Forget about events from before propagation starts
+        self.dstore.var_events.clear()
         n = 0
         if verbosity:
             print('PROPAGATION: Iterations (active propagators)')
@@ -318,6 +504,12 @@ class CSpace:
                 print('Traced variables:')
                 for v in tracevar:
                     v.pprint(dstore=self.dstore, spaces=2)
+            if deadline and time.time() > deadline:
+                if verbosity:
+                    print()
+                    print('DEADLINE PASSED in this CSpace at {} iterations'.format(n))
+                self.status = CSpace.skipped
+                return False
             awaken = self.propagate(awaken, verbosity=verbosity,
                                     tracevar=tracevar, traceprops=traceprops)
             if awaken == CSpace.failed:
@@ -330,7 +522,7 @@ class CSpace:
                 if verbosity:
                     print()
                     print('HALTING, wakeful propagators')
-                    for p in awaken:
+                    for priority, order, p in sorted(awaken):
                         print(p)
                 break
         if verbosity:
@@ -338,21 +530,45 @@ class CSpace:
         if verbosity and self.status == CSpace.succeeded:
             print('SUCCEEDED at {} iterations'.format(n))
 
-    def propagate(self, propagators, verbosity=0, tracevar=None, traceprops=[], 
+    # Order in which propagators with the same priority were put on agendas
+    agenda_order = itertools.count()
+
+    @staticmethod
+    def make_agenda(propagators):
+        """A propagation agenda: a heap of (priority, order, propagator) entries,
+        so that the cheapest propagator waiting is always the next to run, and
+        propagators with the same priority run in the order they were woken."""
+        agenda = [(p.priority, next(CSpace.agenda_order), p) for p in propagators]
+        heapq.heapify(agenda)
+        return agenda
+
+    def propagate(self, agenda, verbosity=0, tracevar=None, traceprops=[],
                   show_changed=False):
-        """Run all of the awake propagators once.
+        """Run propagators from the agenda (see make_agenda()), as many as are
+        waiting at the start, cheapest first. The propagators woken by these are
+        added to the agenda, so a cheap one that is woken runs before expensive
+        ones that have been waiting. Returns the agenda, or CSpace.failed.
         tracevar is a variable to trace."""
-        awaken = set()
-        for propagator in propagators:
+        var_events = self.dstore.var_events
+        # Propagators waiting to run
+        pending = 0
+        for priority, order, propagator in agenda:
+            pending |= propagator.bit
+        for i in range(len(agenda)):
+            if not agenda:
+                break
+            priority, order, propagator = heapq.heappop(agenda)
+            bit = propagator.bit
+            pending &= ~bit
+            if bit & (self.entailed_bits | self.failed_bits):
+                # Entailed or failed since it was woken up
+                continue
             state, changed_vars = propagator.run(dstore=self.dstore, verbosity=verbosity, tracevar=tracevar)
             if propagator in traceprops:
                 self.trace_prop(propagator, state, changed_vars)
             if state == Constraint.entailed:
-                # Propagator is entailed; add it to the list of those.
-                self.entailed.append(propagator)
-                # Delete it from awaken if it's already there
-                if propagator in awaken:
-                    awaken.remove(propagator)
+                # Propagator is entailed; record this
+                self.entailed_bits |= bit
 
             # Check whether any of the changed vars cannot possibly be determined; if so,
             # the propagator fails
@@ -367,38 +583,46 @@ class CSpace:
                         break
 
             if state == Constraint.failed:
-                # propagator fails; remove it from the entailed or awaken lists if it's there
+                # propagator fails; it's no longer entailed
 #                print('PROPAGATOR', propagator, 'FAILED!')
-                if propagator in self.entailed:
-                    self.entailed.remove(propagator)
-                if propagator in awaken:
-                    awaken.remove(propagator)
+                self.entailed_bits &= ~bit
                 # penalize the CSpace
                 self.penalty += propagator.weight
                 # and remember that it failed
                 self.failed_props.append(propagator)
+                self.failed_bits |= bit
 #                print('  Appending failed prop; now {} failed'.format(len(self.failed_props)))
 
-            if self.penalty > self.max_penalty:
+            if self.penalty > self.max_penalty or \
+                    (self.bound is not None and self.penalty >= self.bound):
                 # CSpace fails without running other propagators
                 if verbosity:
                     print('PENALTY {} EXCEEDS MAXIMUM {}!'.format(self.penalty, self.max_penalty))
                 self.status = CSpace.failed
+                var_events.clear()
                 return CSpace.failed
 
-            # If the propagator succeeds, add the propagators of its variables to awaken
-            if state not in [Constraint.failed]:
+            # If the propagator succeeds, wake up the propagators of its variables that
+            # care about what happened to them, unless they're entailed, failed, or
+            # already waiting
+            if state != Constraint.failed:
                 for var in changed_vars:
                     if show_changed:
                         print('Var', var)
-                    update_props = {p for p in var.propagators if p not in self.entailed and p not in self.failed_props}
+                    events = var_events.get(var, ALL_EVENTS)
+                    skip = pending | self.entailed_bits | self.failed_bits
+                    n_woken = 0
+                    for p in var.propagators:
+                        if p.events & events and not p.bit & skip:
+                            heapq.heappush(agenda, (p.priority, next(CSpace.agenda_order), p))
+                            pending |= p.bit
+                            skip |= p.bit
+                            n_woken += 1
                     if var == tracevar and verbosity:
-                        print('Adding {} propagators for changed variable {}'.format(len(update_props), tracevar))
-                    # Add propagators for changed var to awaken unless those propagators are already entailed
-                    # or failed
-                    awaken.update(update_props)
+                        print('Adding {} propagators for changed variable {}'.format(n_woken, tracevar))
+            var_events.clear()
 
-        return awaken
+        return agenda
 
     def distribute(self, distributor, project=False, verbosity=0):
         """Creates and returns two new cspaces by cloning the dstore with the distributor."""
@@ -434,9 +658,11 @@ class CSpace:
 ##                         dead_projectors=self.dead_projectors.copy(),
                          penalty=self.penalty,
                          parent=self,
+                         branch_var=var,
                          dstore=new_dstore1,
                          failed_props=self.failed_props[:],
-                         entailed=self.entailed[:],
+                         entailed_bits=self.entailed_bits,
+                         failed_bits=self.failed_bits,
                          verbosity=verbosity)
         cspace2 = CSpace(name=self.name+'b', depth=self.depth+1,
                          variables=self.variables,
@@ -445,11 +671,14 @@ class CSpace:
 ##                         dead_projectors=self.dead_projectors.copy(),
                          penalty=self.penalty,
                          parent=self,
+                         branch_var=var,
                          dstore=new_dstore2,
                          failed_props=self.failed_props[:],
-                         entailed=self.entailed[:],
+                         entailed_bits=self.entailed_bits,
+                         failed_bits=self.failed_bits,
                          verbosity=verbosity)
-        self.children.extend([cspace1, cspace2])
+        if not self.dstore.flat:
+            self.children.extend([cspace1, cspace2])
         return [((var, constraint2), cspace2), ((var, constraint1), cspace1)]
         
     def trace_prop(self, propagator, state, changed_vars):
@@ -461,28 +690,78 @@ class Distributor:
     Subclasses may use particular algorithms for selecting variables and values.
     """
 
-    def __init__(self, var_select=False, val_select=False, problem=None):
+    # Heuristics that can be selected by name: names of the methods that select
+    # variables (given the undetermined variables and the DStore) and values
+    # (given the undecided values of the selected variable). Subclasses can
+    # add their own.
+    var_heuristics = {'upper': 'upper_select',
+                      'first_fail': 'first_fail_select',
+                      'dom_wdeg': 'domwdeg_select',
+                      'impact': 'impact_select',
+                      'random': 'seeded_var_select'}
+    val_heuristics = {'smallest': 'smallest_select',
+                      'random': 'seeded_select'}
+
+    # Impact assumed for variables that haven't been branched on yet
+    init_impact = 1.0
+
+    def __init__(self, var_select=False, val_select=False, problem=None, seed=None):
         """Initialize the function for selecting variables, upper_select by default,
-        and the function for selecting variable values, starting with smallest by default."""
+        and the function for selecting variable values, starting with smallest by default.
+        Either can be a function or the name of one of the heuristics. seed seeds the
+        random choices of the 'random' heuristics. These are the heuristics that
+        set_heuristics() goes back to when it isn't given others."""
         self.problem = problem
-        if var_select:
+        self.defaults = (var_select, val_select, seed)
+        self.set_heuristics()
+
+    def __repr__(self):
+        return "<D {}>".format(self.varsel_string)
+
+    def set_heuristics(self, var_select=None, val_select=None, seed=None):
+        """Change the variable and/or value selection heuristics and forget
+        what was learned during earlier searches. Heuristics and a seed that
+        aren't given are the ones the distributor was created with, not the
+        ones from an earlier call."""
+        default_var, default_val, default_seed = self.defaults
+        var_select = var_select or default_var
+        val_select = val_select or default_val
+        if isinstance(var_select, str):
+            if var_select not in self.var_heuristics:
+                raise ValueError('Unknown variable selection heuristic: {}'.format(var_select))
+            self.var_select = getattr(self, self.var_heuristics[var_select])
+            self.varsel_string = var_select
+        elif var_select:
             self.var_select = var_select
             # This tag doesn't make any sense but it's just for __repr__
             self.varsel_string = 'spec'
         else:
             self.var_select = Distributor.upper_select
             self.varsel_string = 'upper'
-        self.val_select = val_select or Distributor.smallest_select
-# (lambda values: values[0])
-
-    def __repr__(self):
-        return "<D {}>".format(self.varsel_string)
+        if isinstance(val_select, str):
+            if val_select not in self.val_heuristics:
+                raise ValueError('Unknown value selection heuristic: {}'.format(val_select))
+            self.val_select = getattr(self, self.val_heuristics[val_select])
+        elif val_select:
+            self.val_select = val_select
+        else:
+            self.val_select = Distributor.smallest_select
+        self.seed = default_seed if seed is None else seed
+        self.reset()
+
+    def reset(self):
+        """Forget failure counts and impacts, and restart the random generator."""
+        # Number of times propagators of each variable have failed
+        self.failures = {}
+        # Running average impact of branching on each variable
+        self.impacts = {}
+        self.random = random.Random(self.seed)
 
     # Static methods for variable selection and value selection
     @staticmethod
     def upper_select(vars, dstore=None):
         """Select variables by the length of their upper bounds."""
-        return sorted(vars, key=lambda v: len(v.get_upper(dstore=dstore)))[0]
+        return min(vars, key=lambda v: len(v.get_upper(dstore=dstore)))
 
     @staticmethod
     def ran_select(vars, dstore=None):
@@ -495,6 +774,64 @@ class Distributor:
         value_list.sort()
         return value_list[0]
 
+    @staticmethod
+    def n_undecided(var, dstore):
+        """Number of undecided values, with variables that have none last."""
+        n = len(var.get_undecided(dstore=dstore))
+        return n or sys.maxsize
+
+    # Heuristics that use the state of the distributor
+
+    def first_fail_select(self, vars, dstore=None):
+        """Select the variable with the fewest undecided values."""
+        return min(vars, key=lambda v: Distributor.n_undecided(v, dstore))
+
+    def domwdeg_select(self, vars, dstore=None):
+        """Select the variable with the smallest ratio of undecided values to
+        degree, where each failure of one of the variable's propagators counts
+        as an additional propagator."""
+        failures = self.failures
+        return min(vars,
+                   key=lambda v: Distributor.n_undecided(v, dstore) / (len(v.propagators) + failures.get(v, 0) or 1))
+
+    def impact_select(self, vars, dstore=None):
+        """Select the variable whose distribution has reduced the search space the
+        most on average, preferring fewer undecided values in case of ties."""
+        impacts = self.impacts
+        init = self.init_impact
+        return min(vars, key=lambda v: (-impacts.get(v, init), Distributor.n_undecided(v, dstore)))
+
+    def seeded_var_select(self, vars, dstore=None):
+        """Select a random variable, the same one for the same seed and variables."""
+        return self.random.choice(vars)
+
+    def seeded_select(self, values):
+        """Select a random value, the same one for the same seed and values."""
+        return self.random.choice(sorted(values, key=repr))
+
+    def observe(self, cspace):
+        """Learn from a CSpace that has just been run: count the propagators that
+        failed in it and, for impact-based selection, record how much the
+        distribution step that created it reduced the search space."""
+        parent = cspace.parent
+        failed = cspace.failed_props
+        if parent:
+            failed = failed[len(parent.failed_props):]
+        if failed:
+            failures = self.failures
+            for prop in failed:
+                for var in prop.variables:
+                    failures[var] = failures.get(var, 0) + 1
+        if parent and cspace.branch_var is not None and self.var_select == self.impact_select:
+            if cspace.status == CSpace.failed:
+                impact = 1.0
+            else:
+                before = parent.get_size()
+                impact = 1.0 - cspace.get_size() / before if before else 0.0
+            var = cspace.branch_var
+            old = self.impacts.get(var)
+            self.impacts[var] = impact if old is None else (old + impact) / 2
+
     def select_var(self, dstore):
         """Return a single undetermined variable by calling the distributor's variable selection function."""
         return self.var_select(dstore.undetermined, dstore)
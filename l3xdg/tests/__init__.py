@@ -2,4 +2,5 @@
 
 import unittest
 
-__all__ = ['testconstraints', 'testcs']
+__all__ = ['testconstraints', 'testcs', 'testvariable', 'testsearch', 'testfst',
+           'testlanguage']
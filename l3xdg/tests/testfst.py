@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+
+#   This file is part of the HLTDI L^3 project
+#       for parsing, generation, and translation within the
+#       framework of  Extensible Dependency Grammar.
+#
+#   Copyright (C) 2026 The HLTDI L^3 Team <gasser@cs.indiana.edu>
+#
+#   This program is free software: you can redistribute it and/or
+#   modify it under the terms of the GNU General Public License as
+#   published by the Free Software Foundation, either version 3 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import unittest, os, pickle, tempfile, shutil, contextlib, io
+from .. language import LANGUAGE_DIR
+from .. morphology.fst import *
+
+####
+#### FSTs restored in different ways should transduce words in the same way.
+#### Guarani noun FST.
+####
+
+FST_DIR = os.path.join(LANGUAGE_DIR, 'gn', 'FST')
+
+# Words with and without analyses
+WORDS = ['ava', 'tupãre', 'ára', 'yvy', 'korasõme', "iñapytu'ũme", 'porãva',
+         'hekove', 'yvága', 'hyepýpe', "py'aguapy", 'hesáre', 'ikorasõ',
+         'mávapa', "ava'ỹre", 'kuña', 'karai', 'kuñakuéra', 'óga', 'tetã',
+         'ohecha', 'xyz', '']
+
+def weight_key(weight):
+    """weight as something that can be compared; the order of the FSs in
+    an FSSet doesn't matter."""
+    return sorted(map(repr, weight)) if isinstance(weight, set) else [repr(weight)]
+
+def outputs(result):
+    """The outputs in the result of transduce(), as something that can be
+    compared; the order of outputs doesn't matter."""
+    items = []
+    for output in result:
+        if isinstance(output, list):
+            word, weight = output
+            items.append((word, weight_key(weight)))
+        else:
+            items.append((output, []))
+    return sorted(items)
+
+def structure(fst):
+    """The states and arcs of fst, as something that can be compared."""
+    arcs = sorted((fst._src[a], fst._dst[a], fst._in_string[a], fst._out_string[a],
+                   weight_key(fst._weight.get(a)))
+                  for a in fst._src)
+    return (fst._initial_state, sorted(fst._is_final.items()),
+            sorted(fst._finalizing_string.items()), arcs, sorted(fst._sigma),
+            sorted((s, len(arcs)) for s, arcs in fst._outgoing.items()))
+
+def quietly(function, *args, **kwargs):
+    """Call function without letting it print."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+class FSTTestCase(unittest.TestCase):
+    '''Superclass for FST test cases; the FST is parsed from its .fst files
+    once.'''
+
+    parsed = None
+
+    def parsed_fst(self):
+        if FSTTestCase.parsed is None:
+            FSTTestCase.parsed = quietly(FST.restore, 'n', FST_DIR, empty=False, binary=False)
+        return FSTTestCase.parsed
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def compiled_fst(self):
+        """The parsed FST written to and restored from a binary file."""
+        path = os.path.join(self.directory, 'n' + FST.BIN_EXT)
+        quietly(FST.write_binary, self.parsed_fst(), path)
+        return FST.restore_binary(path, 'n', weighting=UNIFICATION_SR)
+
+    def assertSameOutputs(self, fst, **options):
+        """fst transduces WORDS as the parsed FST does without an index."""
+        parsed = self.parsed_fst()
+        found = 0
+        for word in WORDS:
+            expected = outputs(parsed.transduce(word, csr=False))
+            self.assertEqual(outputs(fst.transduce(word, **options)), expected, word)
+            found += bool(expected)
+        self.assertGreater(found, len(WORDS) // 2)
+
+class TestBinaryFST(FSTTestCase):
+
+    def test_round_trip(self):
+        compiled = self.compiled_fst()
+        self.assertTrue(compiled.is_compiled())
+        self.assertEqual(compiled.label, 'n')
+        self.assertSameOutputs(compiled)
+        # Transduction uses the arrays
+        self.assertTrue(compiled.is_compiled())
+        self.assertEqual(compiled.size(), self.parsed_fst().size())
+
+    def test_materialize(self):
+        compiled = self.compiled_fst()
+        compiled.materialize()
+        self.assertFalse(compiled.is_compiled())
+        self.assertEqual(structure(compiled), structure(self.parsed_fst()))
+        self.assertSameOutputs(compiled)
+
+    def test_pickle(self):
+        copied = pickle.loads(pickle.dumps(self.compiled_fst()))
+        self.assertEqual(structure(copied), structure(self.parsed_fst()))
+        self.assertSameOutputs(copied)
+
+    def test_weights(self):
+        """Empty FSSet and zero weights aren't turned into the default weight."""
+        for weighting, weight in ((UNIFICATION_SR, FSSet()), (PROBABILITY_SR, 0.0)):
+            fst = FST('w', weighting=weighting)
+            start = fst.add_state('start')
+            end = fst.add_state('end', is_final=True)
+            fst.initial_state = start
+            # add_arc() leaves out false weights
+            fst._weight[fst.add_arc(start, end, 'a', 'b')] = weight
+            fst.add_arc(start, end, 'c', 'd')
+            path = os.path.join(self.directory, 'w' + FST.BIN_EXT)
+            FST.write_binary(fst, path)
+            compiled = FST.restore_binary(path, 'w', weighting=weighting)
+            index = compiled.get_index()
+            self.assertEqual([index.weight(a) for a in (0, 1)], [weight, weighting.one])
+            compiled.materialize()
+            self.assertEqual(compiled.arc_weight_jit('arc0'), weight)
+            self.assertEqual(compiled.arc_weight_jit('arc1'), weighting.one)
+
+    def test_restore(self):
+        """restore() writes a binary file the first time and uses it after."""
+        bin_dir = FST.BIN_DIR
+        FST.BIN_DIR = self.directory
+        try:
+            quietly(FST.restore, 'n', FST_DIR, empty=False)
+            paths = [os.path.join(d, name) for d, dirs, names in os.walk(self.directory)
+                     for name in names]
+            self.assertEqual(len(paths), 1)
+            self.assertTrue(paths[0].endswith(FST.BIN_EXT))
+            restored = quietly(FST.restore, 'n', FST_DIR, empty=False)
+            self.assertTrue(restored.is_compiled())
+            self.assertSameOutputs(restored)
+        finally:
+            FST.BIN_DIR = bin_dir
+
+class TestFSTIndex(FSTTestCase):
+
+    def test_parsed(self):
+        """An FSTIndex over the dicts finds the paths step_transduce() does."""
+        parsed = self.parsed_fst()
+        self.assertIs(type(parsed.get_index()), FSTIndex)
+        self.assertSameOutputs(parsed, csr=True)
+
+    def test_compiled(self):
+        compiled = self.compiled_fst()
+        self.assertIsInstance(compiled.get_index(), CompiledFSTIndex)
+        self.assertSameOutputs(compiled, csr=True)
+        # Without the index, the dicts are made
+        self.assertSameOutputs(compiled, csr=False)
+        self.assertFalse(compiled.is_compiled())
+
+    def test_accepts(self):
+        """Words with outputs are accepted; accepts() doesn't check weights."""
+        parsed = self.parsed_fst()
+        compiled = self.compiled_fst()
+        for word in WORDS:
+            accepted = parsed.accepts(word)
+            self.assertEqual(compiled.accepts(word), accepted, word)
+            if parsed.transduce(word, csr=False):
+                self.assertTrue(accepted, word)
+        self.assertFalse(parsed.accepts('xyz'))
+
+class TestMinimize(FSTTestCase):
+    """Minimized and determinized FSTs transduce words as the original does,
+    with no more states and arcs."""
+
+    def assertSmaller(self, fst):
+        states, arcs = self.parsed_fst().size()
+        self.assertLessEqual(fst.size()[0], states)
+        self.assertLessEqual(fst.size()[1], arcs)
+
+    def assertSameLanguage(self, fst):
+        self.assertSameOutputs(fst, csr=False)
+        self.assertSameOutputs(fst, csr=True)
+        parsed = self.parsed_fst()
+        for word in WORDS:
+            self.assertEqual(fst.accepts(word), parsed.accepts(word), word)
+
+    def test_determinized(self):
+        determinized = self.parsed_fst().determinized()
+        self.assertIsNotNone(determinized)
+        self.assertSmaller(determinized)
+        self.assertSameLanguage(determinized)
+
+    def test_minimized(self):
+        for determinize in (False, True):
+            minimized = self.parsed_fst().minimized(determinize=determinize)
+            self.assertSmaller(minimized)
+            self.assertSameLanguage(minimized)
+        # Determinizing first merges common prefixes too
+        self.assertLess(minimized.size(), self.parsed_fst().determinized().size())
+
+    def test_compiled(self):
+        """A minimized FST survives being written to a binary file."""
+        minimized = self.parsed_fst().minimized(determinize=True)
+        path = os.path.join(self.directory, 'n.min' + FST.BIN_EXT)
+        quietly(FST.write_binary, minimized, path)
+        compiled = FST.restore_binary(path, 'n', weighting=UNIFICATION_SR)
+        self.assertEqual(compiled.size(), minimized.size())
+        self.assertSameOutputs(compiled)
+
+####
+#### Memoized unification of FSSets gives what unifying every pair of FSs
+#### gives.
+####
+
+FSSETS = [('[num=sg,pers=3]', '[num=pl]'), ('[pers=3]',), ('[num=pl,pers=1]',),
+          ('[num=sg]', '[num=pl]'), ('[pers=1]', '[pers=2]')]
+
+class TestUnifyMemo(unittest.TestCase):
+
+    def setUp(self):
+        FSSet.clear_memo()
+        self.max_memo = FSSet.max_unify_memo
+
+    def tearDown(self):
+        FSSet.max_unify_memo = self.max_memo
+        FSSet.clear_memo()
+
+    def test_hits(self):
+        """Memo hits for new but equal FSSets give the cross_unify() results."""
+        for fsset1 in FSSETS:
+            for fsset2 in FSSETS:
+                FSSet(*fsset1).unify(FSSet(*fsset2))
+        self.assertEqual(FSSet.unify_hits, 0)
+        for fsset1 in FSSETS:
+            for fsset2 in FSSETS:
+                x, y = FSSet(*fsset1), FSSet(*fsset2)
+                hits = FSSet.unify_hits
+                self.assertEqual(weight_key(x.unify(y)), weight_key(x.cross_unify(y)))
+                self.assertEqual(FSSet.unify_hits, hits + 1)
+        # The FSs of equal FSSets are the same objects
+        self.assertIs(list(FSSet('[pers=3]'))[0], list(FSSet('[pers=3]'))[0])
+
+    def test_lru(self):
+        """The least recently used unification is forgotten."""
+        FSSet.max_unify_memo = 2
+        x, y, z = [FSSet(*fsset) for fsset in FSSETS[:3]]
+        x.unify(y)
+        x.unify(z)
+        x.unify(y)
+        y.unify(z)
+        hits = FSSet.unify_hits
+        x.unify(y)
+        self.assertEqual(FSSet.unify_hits, hits + 1)
+        x.unify(z)
+        self.assertEqual(FSSet.unify_hits, hits + 1)
+        self.assertEqual(len(FSSet.unify_memo), 2)
+
+####
+#### Compositions of cascades restored from the compose/ directory should
+#### transduce words as fresh compositions do.
+####
+
+def make_fst(label, arcs, finals):
+    """An FST with arcs (src, dst, in, out) starting at the first arc's src."""
+    fst = FST(label, weighting=UNIFICATION_SR)
+    for state in sorted({a[0] for a in arcs} | {a[1] for a in arcs}):
+        fst.add_state(state, is_final=state in finals)
+    fst.initial_state = arcs[0][0]
+    for src, dst, in_string, out_string in arcs:
+        fst.add_arc(src, dst, in_string, out_string)
+    return fst
+
+CASCADE_WORDS = ['a', 'ac', 'cda', 'acd', 'cdaa', 'b', '']
+
+class TestComposeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        f1 = make_fst('f1', [('0', '0', 'a', 'b'), ('0', '0', 'c', 'c'), ('0', '1', 'd', 'd'),
+                             ('1', '1', 'a', 'a')], ['0', '1'])
+        f2 = make_fst('f2', [('0', '0', 'b', 'c'), ('0', '0', 'c', 'c'), ('0', '0', 'd', 'e'),
+                             ('0', '0', 'a', 'a')], ['0'])
+        f3 = make_fst('f3', [('0', '1', 'c', 'x'), ('1', '1', 'c', 'y'), ('1', '1', 'e', 'z'),
+                             ('1', '1', 'a', 'a')], ['1'])
+        self.cascade = FSTCascade('t', f1, f2, f3)
+        self.cascade.directory = self.directory
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def saved(self):
+        return sorted(os.listdir(os.path.join(self.directory, FSTCascade.compose_dir)))
+
+    def assertSameComposition(self, fst, expected):
+        self.assertEqual(fst.size(), expected.size())
+        for word in CASCADE_WORDS:
+            self.assertEqual(outputs(fst.transduce(word)), outputs(expected.transduce(word)),
+                             word)
+
+    def test_restore(self):
+        fresh = quietly(self.cascade.compose_backwards, cache=False)
+        self.assertTrue(fresh.transduce('acd'))
+        composed = quietly(self.cascade.compose_backwards)
+        self.assertSameComposition(composed, fresh)
+        saved = self.saved()
+        self.assertEqual(len(saved), 2)
+        restored = quietly(self.cascade.compose_backwards)
+        self.assertTrue(restored.is_compiled())
+        self.assertSameComposition(restored, fresh)
+        self.assertEqual(self.saved(), saved)
+
+    def test_change(self):
+        """Changing the first FST only recomposes it with the saved composition
+        of the others, and the result is the same as a fresh composition."""
+        quietly(self.cascade.compose_backwards)
+        step1, step2 = self.saved()
+        self.cascade[0] = make_fst('f1', [('0', '0', 'a', 'c'), ('0', '0', 'c', 'b')], ['0'])
+        fresh = quietly(self.cascade.compose_backwards, cache=False)
+        composed = quietly(self.cascade.compose_backwards)
+        self.assertSameComposition(composed, fresh)
+        saved = self.saved()
+        self.assertIn(step1, saved)
+        self.assertNotIn(step2, saved)
+        self.assertEqual(len(saved), 2)
+        self.assertSameComposition(quietly(self.cascade.compose_backwards), fresh)
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+
+#   This file is part of the HLTDI L^3 project
+#       for parsing, generation, and translation within the
+#       framework of  Extensible Dependency Grammar.
+#
+#   Copyright (C) 2026 The HLTDI L^3 Team <gasser@cs.indiana.edu>
+#
+#   This program is free software: you can redistribute it and/or
+#   modify it under the terms of the GNU General Public License as
+#   published by the Free Software Foundation, either version 3 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import unittest, os, time, tempfile, shutil, sqlite3
+from .. language import *
+from .. analcache import AnalCache
+from .. lexsnapshot import LexSnapshot, LexStub
+from .. artifacts import ArtifactCache
+from .. morphology.fs import FeatStruct
+from .. morphology.fst import FST
+from .. morphology.morphology import POSMorphology
+
+####
+#### Persistent analysis caches should give back the analyses that were
+#### stored, as long as the files they were made from don't change.
+####
+
+WORDS = ['vio', 'habla', 'casa', 'mujer', 'xyz']
+
+def spanish():
+    """Spanish, with its morphology."""
+    return Language.load_langs(['es'], grammar='chunk', flatten=True, pickle=False,
+                               verbosity=0)[0]
+
+class Sources:
+    """What an AnalCache needs of a Language and its morphology, with the
+    files that analyses depend on in directory."""
+
+    abbrev = 'xx'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.morphology = self
+
+    def get_dir(self):
+        return self.directory
+
+    def get_lex_dir(self):
+        return self.directory
+
+class TestAnalCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = os.path.join(self.directory, 'anal.db')
+        self.sources = Sources(self.directory)
+        self.write_source('n.fst', '-> start\n')
+        fs = FeatStruct('[cat=v,tm=prt,sb=[p=3,n=1]]')
+        self.analyses = [('v', 'ver', 'ver', fs), ('n', 'vio', None, FeatStruct('[n=1]'))]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_source(self, name, text, mtime=None):
+        path = os.path.join(self.directory, name)
+        with open(path, 'a') as file:
+            file.write(text)
+        if mtime:
+            os.utime(path, (mtime, mtime))
+
+    def assertSameAnalyses(self, found, expected):
+        self.assertEqual([(a[0], a[1], a[2], repr(a[3])) for a in found],
+                         [(a[0], a[1], a[2], repr(a[3])) for a in expected])
+
+    def test_encode(self):
+        decoded = AnalCache.decode(AnalCache.encode(self.analyses))
+        self.assertSameAnalyses(decoded, self.analyses)
+        self.assertTrue(all(a[3].frozen() for a in decoded))
+        self.assertEqual(AnalCache.decode(AnalCache.encode([])), [])
+        # Analyses without FeatStructs aren't stored
+        self.assertIsNone(AnalCache.encode([('v', 'ver', 'ver', None)]))
+
+    def test_put_get(self):
+        cache = AnalCache(self.sources, path=self.db)
+        cache.put('vio', 0, self.analyses)
+        self.assertSameAnalyses(cache.get('vio'), self.analyses)
+        self.assertIsNone(cache.get('vio', AnalCache.flags(guess=True)))
+        self.assertIsNone(cache.get('xyz'))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        cache.close()
+        # Another cache with the same database
+        cache = AnalCache(self.sources, path=self.db)
+        self.assertEqual(len(cache), 1)
+        self.assertSameAnalyses(cache.get('vio'), self.analyses)
+        self.assertEqual(cache.preload(['vio', 'casa']), ['casa'])
+        cache.close()
+
+    def test_memo(self):
+        cache = AnalCache(self.sources, path=self.db, max_entries=2)
+        for form in ('a', 'b', 'c'):
+            cache.put(form, 0, self.analyses)
+        self.assertEqual(list(cache.memo), [('b', 0), ('c', 0)])
+        self.assertEqual(cache.trim(), 1)
+        self.assertEqual(cache.memo, {})
+        self.assertEqual(len(cache), 2)
+        cache.close()
+
+    def test_trim_language(self):
+        """Trimming one language's entries leaves other languages' entries
+        in the same database."""
+        other = Sources(self.directory)
+        other.abbrev = 'yy'
+        cache2 = AnalCache(other, path=self.db)
+        for form in ('d', 'e'):
+            cache2.put(form, 0, self.analyses)
+        cache2.commit()
+        cache = AnalCache(self.sources, path=self.db, max_entries=1)
+        for form in ('a', 'b', 'c'):
+            cache.put(form, 0, self.analyses)
+        self.assertEqual(cache.trim(), 2)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(len(cache2), 2)
+        cache.close()
+        cache2.close()
+
+    def test_invalidation(self):
+        """Changing a source file makes stored analyses unreachable, and
+        they are deleted when the database is next opened."""
+        cache = AnalCache(self.sources, path=self.db)
+        cache.put('vio', 0, self.analyses)
+        cache.close()
+        build = cache.build
+        # Other files don't matter
+        self.write_source('notes.txt', 'notes')
+        self.assertEqual(AnalCache.build_hash(cache.dirs), build)
+        self.write_source('n.fst', 'start -> end\n', mtime=time.time() + 10)
+        cache = AnalCache(self.sources, path=self.db)
+        self.assertNotEqual(cache.build, build)
+        self.assertIsNone(cache.get('vio'))
+        cache.close()
+        with sqlite3.connect(self.db) as conn:
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM anal').fetchone()[0], 0)
+        # So does a new lexicon file
+        self.write_source('v.lex', 'ver\n')
+        self.assertNotEqual(AnalCache.build_hash(cache.dirs), cache.build)
+
+    def test_anal_word(self):
+        """A language's analyses are the same with and without its cache."""
+        language = spanish()
+        expected = [language.anal_word(word) for word in WORDS]
+        self.assertTrue(expected[0])
+        cache = language.open_anal_cache(self.db)
+        try:
+            for word, analyses in zip(WORDS, expected):
+                self.assertSameAnalyses(language.anal_word(word), analyses)
+            self.assertEqual((cache.hits, cache.misses), (0, len(WORDS)))
+            # Analyses from the database
+            cache = language.open_anal_cache(self.db)
+            for word, analyses in zip(WORDS, expected):
+                self.assertSameAnalyses(language.anal_word(word), analyses)
+            self.assertEqual((cache.hits, cache.misses), (len(WORDS), 0))
+        finally:
+            language.close_anal_cache()
+
+####
+#### Analyzing a corpus should give the same .anl file in one process or
+#### several, and when resumed after being interrupted.
+####
+
+CORPUS = ['La mujer vio la casa.', 'El hombre habla.', '', 'Vio la casa, y habla.',
+          'La mujer habla con el hombre.', 'xyz casa mujer']
+
+class TestAnalyzeCorpus(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.language = spanish()
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.corpus = os.path.join(self.directory, 'corpus.txt')
+        with open(self.corpus, 'w', encoding='utf-8') as file:
+            for line in CORPUS:
+                print(line, file=file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def analyze(self, name, **options):
+        """The lines of the .anl file written by analyze_corpus()."""
+        outfile = os.path.join(self.directory, name)
+        self.assertEqual(self.language.analyze_corpus(self.corpus, outfile, verbosity=0,
+                                                      **options),
+                         len(CORPUS))
+        self.assertFalse(os.path.exists(outfile + '.progress'))
+        with open(outfile, encoding='utf-8') as file:
+            return file.read().splitlines()
+
+    def test_parallel(self):
+        serial = self.analyze('serial.anl', processes=1, chunk_lines=2)
+        self.assertEqual(len(serial), len(CORPUS))
+        self.assertTrue(serial[0].startswith('la mujer vio;ver:v:'))
+        self.assertEqual(serial[2], '')
+        self.assertEqual(serial[-1].split()[0], 'xyz')
+        self.assertEqual(self.analyze('parallel.anl', processes=2, chunk_lines=2), serial)
+        self.assertEqual(self.analyze('one.anl', processes=2, chunk_lines=len(CORPUS)),
+                         serial)
+
+    def test_resume(self):
+        """A run interrupted after writing part of a chunk starts again after
+        the last completed chunk."""
+        expected = self.analyze('full.anl', processes=1)
+        outfile = os.path.join(self.directory, 'resumed.anl')
+        with open(outfile, 'w', encoding='utf-8') as file:
+            for line in expected[:2]:
+                print(line, file=file)
+            offset = file.tell()
+            # Part of the next chunk
+            print(expected[2], file=file)
+            print('garbage', file=file)
+        with open(outfile + '.progress', 'w') as file:
+            print(2, offset, file=file)
+        self.assertEqual(self.analyze('resumed.anl', processes=1, chunk_lines=2), expected)
+        # Without resume, the progress file is ignored
+        with open(outfile + '.progress', 'w') as file:
+            print(4, 0, file=file)
+        self.assertEqual(self.analyze('resumed.anl', processes=1, resume=False), expected)
+
+####
+#### FSTs loaded when they're first used should analyze and generate words
+#### as FSTs loaded with the morphology do.
+####
+
+class TestLazyMorphology(unittest.TestCase):
+
+    def setUp(self):
+        self.language = spanish()
+        self.morphology = self.language.morphology
+        self.saved = [(posmorph.unset_fsts(), posmorph.deferred)
+                      for posmorph in self.morphology.values()]
+
+    def tearDown(self):
+        for posmorph, (fsts, deferred) in zip(self.morphology.values(), self.saved):
+            posmorph.reset_fsts(fsts)
+            posmorph.deferred = deferred
+
+    def load(self, lazy):
+        """Analyses of WORDS and the words generated from them, with FSTs
+        loaded lazily or eagerly."""
+        for posmorph in self.morphology.values():
+            posmorph.unset_fsts()
+            posmorph.deferred = {}
+        self.language.load_morpho(guess=True, load_analyzed=False, lazy=lazy)
+        loaded = self.language.loaded_fsts()
+        results = []
+        for word in WORDS:
+            analyses = self.language.anal_word(word)
+            results.append([(a[0], a[1], a[2], repr(a[3])) for a in analyses])
+            for pos, root, cite, fs in analyses:
+                results.append(sorted(map(repr, self.morphology[pos].gen(root, fs))))
+        return loaded, results
+
+    def test_lazy(self):
+        loaded, lazy = self.load(True)
+        # Nothing is loaded until it's used
+        self.assertTrue(all(not fsts and deferred for fsts, deferred in loaded.values()))
+        loaded, eager = self.load(False)
+        self.assertTrue(all(fsts and not deferred for fsts, deferred in loaded.values()))
+        self.assertEqual(lazy, eager)
+        self.assertTrue(any(lazy))
+        # Generated words include the analyzed word
+        self.assertIn("'vio'", repr(lazy))
+
+####
+#### The prefilter should only skip words that an FST can't analyze.
+####
+
+class TestPrefilter(unittest.TestCase):
+
+    def setUp(self):
+        self.language = spanish()
+        self.language.load_morpho(guess=True, load_analyzed=False)
+        words = set(WORDS)
+        for line in CORPUS:
+            words.update(self.language.morphology.sep_punc(line).lower().split())
+        self.words = sorted(words) + ['hablábamos', 'vimos', 'casas', 'qqq', '']
+
+    def test_may_accept(self):
+        rejected = 0
+        for posmorph in self.language.morphology.values():
+            for guess in (False, True):
+                for word in self.words:
+                    if posmorph.anal(word, guess=guess):
+                        self.assertTrue(posmorph.may_accept(word, guess=guess), word)
+                    elif not posmorph.may_accept(word, guess=guess):
+                        rejected += 1
+        # Some words are skipped
+        self.assertGreater(rejected, 0)
+
+    def test_anal_word(self):
+        """Analyses are the same with and without the prefilter."""
+        expected = [repr(self.language.anal_word(word)) for word in self.words]
+        POSMorphology.prefilter = False
+        try:
+            self.assertEqual([repr(self.language.anal_word(word)) for word in self.words],
+                             expected)
+        finally:
+            POSMorphology.prefilter = True
+
+####
+#### Lexes in lexicon snapshots should be the same as freshly loaded ones
+#### when they are materialized.
+####
+
+def describe(lex):
+    """lex's attributes, as something that can be compared."""
+    # Getting an attribute of a stub materializes it; __dict__ doesn't
+    lex.name
+    return sorted((name, repr(value)) for name, value in lex.__dict__.items())
+
+def describe_lexicon(language):
+    return {key: [describe(lex) for lex in lexes]
+            for key, lexes in language.lexicon.items()}
+
+def load_spanish(pickle=False, **options):
+    return Language.load_langs(['es'], grammar='chunk', flatten=True, pickle=pickle,
+                               load_morpho=False, snapshot=True, verbosity=0,
+                               **options)[0]
+
+class TestLexSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        # Keep the snapshot out of the language directory
+        self.directory = tempfile.mkdtemp()
+        self.cache_dirs = ArtifactCache.directory, FST.BIN_DIR
+        ArtifactCache.set_directory(self.directory)
+        self.languages = dict(Language.LANGUAGES)
+
+    def tearDown(self):
+        ArtifactCache.directory, FST.BIN_DIR = self.cache_dirs
+        Language.LANGUAGES.clear()
+        Language.LANGUAGES.update(self.languages)
+        shutil.rmtree(self.directory)
+
+    def test_snapshot(self):
+        # Loaded from the source files, and a snapshot written
+        fresh = load_spanish(force=True)
+        path = Language.get_snapshotpath(['es'], 'chunk', True)
+        self.assertTrue(os.path.exists(path))
+        # Snapshots made from other source files aren't used
+        self.assertIsNone(LexSnapshot.load(path, 'other'))
+        expected = describe_lexicon(fresh)
+        # Loaded from the snapshot
+        del Language.LANGUAGES['es']
+        language = load_spanish()
+        self.assertIsNot(language, fresh)
+        lexes = [lex for lexes in language.lexicon.values() for lex in lexes]
+        self.assertTrue(all(type(lex) is LexStub for lex in lexes))
+        snapshot = lexes[0].__dict__['_stub'][0]
+        self.assertIsInstance(snapshot, LexSnapshot)
+        self.assertEqual(snapshot.loaded, 0)
+        described = describe_lexicon(language)
+        self.assertEqual(set(described), set(expected))
+        for key, lexes in expected.items():
+            self.assertEqual(described[key], lexes, key)
+        # Some Lexes have several keys
+        lexes = [lex for lexes in language.lexicon.values() for lex in lexes]
+        self.assertGreaterEqual(snapshot.loaded, len(set(map(id, lexes))))
+        self.assertTrue(all(type(lex) is Lex for lex in lexes))
+
+    def test_pickle(self):
+        """Languages loaded from a snapshot aren't pickled again, which would
+        unpickle all of their entries."""
+        load_spanish(force=True)
+        path = Language.get_snapshotpath(['es'], 'chunk', True)
+        directory = os.path.dirname(path)
+        files = sorted(os.listdir(directory))
+        del Language.LANGUAGES['es']
+        language = load_spanish(pickle=True)
+        self.assertTrue(language.pickled)
+        lexes = [lex for lexes in language.lexicon.values() for lex in lexes]
+        self.assertTrue(all(type(lex) is LexStub for lex in lexes))
+        self.assertEqual(lexes[0].__dict__['_stub'][0].loaded, 0)
+        self.assertEqual(sorted(os.listdir(directory)), files)
+
+####
+#### Artifacts are named by the contents of the files they're made from,
+#### and aren't written again when they're current.
+####
+
+class TestArtifactCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_dirs = ArtifactCache.directory, FST.BIN_DIR
+        ArtifactCache.set_directory(os.path.join(self.directory, 'cache'))
+        self.languages = dict(Language.LANGUAGES)
+
+    def tearDown(self):
+        ArtifactCache.directory, FST.BIN_DIR = self.cache_dirs
+        Language.LANGUAGES.clear()
+        Language.LANGUAGES.update(self.languages)
+        shutil.rmtree(self.directory)
+
+    def keys(self):
+        return (ArtifactCache.source_hash(self.directory, 'xx', 'xx'),
+                LexSnapshot.source_hash([self.directory], 'xx'))
+
+    def test_source_hash(self):
+        path = os.path.join(self.directory, 'xx.yaml')
+        with open(path, 'w') as stream:
+            stream.write('name: xx\n')
+        keys = self.keys()
+        # Only the contents of the files matter
+        os.utime(path, ns=(0, 0))
+        self.assertEqual(self.keys(), keys)
+        with open(path, 'w') as stream:
+            stream.write('name: yy\n')
+        changed = self.keys()
+        self.assertNotEqual(changed[0], keys[0])
+        self.assertNotEqual(changed[1], keys[1])
+
+    def test_load_pickle(self):
+        """A language loaded from its pickle without its lexicon isn't
+        pickled again."""
+        spanish().pickle('chunk', verbosity=0)
+        key = Language.get_picklekey('es', 'chunk')
+        path = ArtifactCache.get_path('es', 'chunk', 'language', key)
+        written = os.stat(path).st_mtime_ns
+        language = Language.load_pickle('es', 'chunk', lexicon=False, verbosity=0)
+        self.assertIsNone(language.lexicon)
+        self.assertTrue(language.pickled)
+        language = Language.load1('es', lexicon=False, grammar='chunk', verbosity=0)
+        self.assertIsNone(language.lexicon)
+        self.assertEqual(os.stat(path).st_mtime_ns, written)
+        # With its lexicon
+        language = Language.load_pickle('es', 'chunk', verbosity=0)
+        self.assertTrue(language.pickled)
+        self.assertTrue(language.lexicon)
+
+####
+#### Entries in the inheritance cache shouldn't change when the entries
+#### given to nodes do.
+####
+
+class TestInheritanceCache(unittest.TestCase):
+
+    def setUp(self):
+        self.lexicon = spanish().lexicon
+        self.lex = [lex for lex in self.lexicon['casa'] if lex.dims][0]
+
+    def test_light_clone(self):
+        copied = self.lex.light_clone()
+        self.assertEqual(set(copied.dims), set(self.lex.dims))
+        for abbrev, lexdim in copied.dims.items():
+            original = self.lex.dims[abbrev]
+            self.assertIsNot(lexdim, original)
+            self.assertIs(lexdim.lex, copied)
+            self.assertEqual(lexdim.attribs, original.attribs)
+            lexdim.attribs.clear()
+            self.assertTrue(original.attribs)
+        self.assertNotEqual(copied.cloned, self.lex.cloned)
+
+    def test_analyses_key(self):
+        """Analyses are keyed by Lex ids, so equal clones give equal keys."""
+        clone = self.lex.clone(disjoint=False, temp=True)
+        analyses = [(self.lex, {'tam': {'prt'}})]
+        self.assertEqual(Lexicon.analyses_key(analyses),
+                         Lexicon.analyses_key([(clone, {'tam': {'prt'}})]))
+        self.assertNotEqual(Lexicon.analyses_key(analyses),
+                            Lexicon.analyses_key([(self.lex, {'tam': {'prs'}})]))
+
+####
+#### The store of instantiated lexemes is bounded, and forms evicted from it
+#### get analyzed again.
+####
+
+class TestInstStore(unittest.TestCase):
+
+    FORMS = ['vio', 'habla', 'casa']
+
+    def setUp(self):
+        self.language = spanish()
+        if not self.language.morph_processing:
+            self.skipTest('No morphological analysis for es')
+        self.lexicon = self.language.lexicon
+        self.max_inst_cache = Lexicon.max_inst_cache
+        Lexicon.max_inst_cache = 2
+        self.lexicon.clear_inst_cache()
+
+    def tearDown(self):
+        Lexicon.max_inst_cache = self.max_inst_cache
+        self.lexicon.clear_inst_cache()
+
+    def add(self, form):
+        """Analyze form and store a lexeme for it."""
+        self.language.anal(form, form, verbose=False)
+        self.assertIn(form, self.language.morph_anal_cache)
+        lex = self.lexicon['casa'][0].clone(disjoint=False, temp=True)
+        self.lexicon.add_inst(form, [lex])
+        return lex
+
+    def test_evict(self):
+        vio, habla = self.add('vio'), self.add('habla')
+        self.assertEqual(self.lexicon.get_inst('vio'), [vio])
+        # habla is now the least recently used form
+        casa = self.add('casa')
+        self.assertEqual(list(self.lexicon.inst_cache), ['vio', 'casa'])
+        self.assertEqual(self.lexicon.get_inst('habla'), [])
+        self.assertEqual(self.lexicon.get_inst('casa'), [casa])
+        # Entry indices follow those of casa's entries in the lexicon
+        self.assertEqual(casa.entry_index, len(self.lexicon['casa']))
+        self.assertEqual((self.lexicon.inst_hits, self.lexicon.inst_misses), (2, 1))
+
+    def test_forget_anal(self):
+        for form in TestInstStore.FORMS:
+            self.add(form)
+        cache = self.language.morph_anal_cache
+        self.assertNotIn('vio', cache)
+        self.assertIn('habla', cache)
+        self.assertIn('casa', cache)
+        # The evicted form is analyzed again
+        self.language.anal('vio', 'vio', verbose=False)
+        self.assertIn('vio', cache)
+        self.lexicon.clear_inst_cache()
+        self.assertNotIn('habla', cache)
+        self.assertNotIn('casa', cache)
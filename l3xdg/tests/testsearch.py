@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+
+#   This file is part of the HLTDI L^3 project
+#       for parsing, generation, and translation within the
+#       framework of  Extensible Dependency Grammar.
+#
+#   Copyright (C) 2026 The HLTDI L^3 Team <gasser@cs.indiana.edu>
+#
+#   This program is free software: you can redistribute it and/or
+#   modify it under the terms of the GNU General Public License as
+#   published by the Free Software Foundation, either version 3 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import unittest, random, time, gc
+from .. xdg import *
+
+####
+#### Searching for solutions in different ways should find the same ones.
+#### Spanish chunk grammar.
+####
+
+SENTENCES = ['la mujer vio la casa',
+             'el hombre habla']
+
+def chunk(sentence):
+    """A parsing problem for sentence with the Spanish chunk grammar."""
+    return XDG(sentence, 'es', grammar='chunk', load_semantics=False,
+               flatten_lexicon=True, pickle=False, verbosity=0, report=0)
+
+def compile_chunk(sentence):
+    """Like chunk(), but reusing a cached problem if there is one."""
+    return XDG.compile(sentence, 'es', grammar='chunk', load_semantics=False,
+                       flatten_lexicon=True, pickle=False, verbosity=0, report=0)
+
+def values(problem, dstore):
+    """The values of the problem's variables in dstore, as something that can
+    be compared."""
+    result = {}
+    for name, var in problem.varsD.items():
+        value = var.get_value(dstore=dstore)
+        if isinstance(value, (set, frozenset, BitSet)):
+            value = frozenset(value)
+        result[name] = value
+    return result
+
+def solutions(problem, **options):
+    """The values of the variables in each of the solutions, in the order
+    found."""
+    return [values(problem, mg.dstore)
+            for mg in problem.solve(all_sols=True, verbose=0, interactive=False, **options)]
+
+class SearchTestCase(unittest.TestCase):
+    '''Superclass for search test cases; the solutions found in the usual
+    way are found once for each sentence.'''
+
+    baseline = {}
+
+    def baseline_solutions(self, sentence):
+        if sentence not in SearchTestCase.baseline:
+            SearchTestCase.baseline[sentence] = solutions(chunk(sentence))
+        return SearchTestCase.baseline[sentence]
+
+    def assertSameSolutions(self, found, sentence, ordered=True):
+        expected = self.baseline_solutions(sentence)
+        self.assertNotEqual(len(expected), 0, '{} has no solutions'.format(sentence))
+        if ordered:
+            self.assertEqual(found, expected)
+        else:
+            key = lambda sol: sorted(map(repr, sol.items()))
+            self.assertEqual(sorted(found, key=key), sorted(expected, key=key))
+
+class Step:
+    """A propagator for agenda tests: running it records its name in log and
+    calls change(dstore), which returns its state and the variables changed."""
+
+    def __init__(self, name, variables, log, change=None, priority=1,
+                 events=ALL_EVENTS, weight=1):
+        self.name = name
+        self.variables = variables
+        self.log = log
+        self.change = change
+        self.priority = priority
+        self.events = events
+        self.weight = weight
+
+    def __repr__(self):
+        return self.name
+
+    def run(self, dstore=None, verbosity=0, tracevar=None):
+        self.log.append(self.name)
+        if self.change:
+            return self.change(dstore)
+        return Constraint.sleeping, set()
+
+class TestAgenda(unittest.TestCase):
+    """Propagators run cheapest first, are only woken by the events they care
+    about and only once while they wait, and aren't woken once they are
+    entailed or have failed."""
+
+    def setUp(self):
+        self.dstore = DStore(name='root')
+        self.s0 = SVar('s0', set(), {0, 1, 2, 3}, 0, 4, rootDS=self.dstore)
+        self.s1 = SVar('s1', set(), {0, 1, 2, 3}, 0, 4, rootDS=self.dstore)
+        self.log = []
+
+    def steps(self, *steps):
+        for index, step in enumerate(steps):
+            step.id = index
+            step.bit = 1 << index
+            for var in step.variables:
+                var.propagators.append(step)
+        return steps
+
+    def upper(self, *variables):
+        """A change that removes 3 from the upper bounds of variables."""
+        def change(dstore):
+            return Constraint.sleeping, {v for v in variables
+                                         if v.strengthen_upper({0, 1, 2}, dstore=dstore)}
+        return change
+
+    def lower(self, var):
+        def change(dstore):
+            return Constraint.sleeping, {var} if var.strengthen_lower({0}, dstore=dstore) else set()
+        return change
+
+    def result(self, state):
+        return lambda dstore: (state, set())
+
+    def run_space(self, *initial):
+        space = CSpace(dstore=self.dstore, propagators=list(initial))
+        space.run()
+        return space
+
+    def test_priority(self):
+        a, b, c, d = self.steps(Step('a', [self.s0], self.log, self.upper(self.s0), priority=2),
+                                Step('b', [self.s0], self.log, priority=0),
+                                Step('c', [self.s1], self.log, priority=2),
+                                Step('d', [self.s1], self.log, priority=0))
+        self.run_space(a, c, d)
+        # b, woken by a, runs before c, which was waiting already; a wakes
+        # itself
+        self.assertEqual(self.log, ['d', 'a', 'b', 'c', 'a'])
+
+    def test_events(self):
+        t, u, l = self.steps(Step('t', [self.s0], self.log, self.upper(self.s0), events=LOWER_EVENT),
+                             Step('u', [self.s0], self.log, events=UPPER_EVENT),
+                             Step('l', [self.s0], self.log, events=LOWER_EVENT))
+        self.run_space(t)
+        self.assertEqual(self.log, ['t', 'u'])
+        self.log.clear()
+        t2, = self.steps(Step('t2', [], self.log, self.lower(self.s0)))
+        self.run_space(t2)
+        self.assertEqual(self.log, ['t2', 't', 'l'])
+
+    def test_once(self):
+        t, w = self.steps(Step('t', [], self.log, self.upper(self.s0, self.s1)),
+                          Step('w', [self.s0, self.s1], self.log))
+        self.run_space(t, w)
+        # w runs once, though both of its variables change
+        self.assertEqual(self.log, ['t', 'w'])
+
+    def test_entailed_failed(self):
+        e, f, t = self.steps(Step('e', [self.s0], self.log, self.result(Constraint.entailed), priority=0),
+                             Step('f', [self.s0], self.log, self.result(Constraint.failed),
+                                  priority=0, weight=0.5),
+                             Step('t', [], self.log, self.upper(self.s0)))
+        space = self.run_space(e, f, t)
+        # Neither e nor f is woken by t's change
+        self.assertEqual(self.log, ['e', 'f', 't'])
+        self.assertEqual((space.entailed_bits, space.failed_bits), (e.bit, f.bit))
+        self.assertEqual(space.failed_props, [f])
+        self.assertEqual(space.penalty, 0.5)
+        self.assertEqual(space.status, CSpace.distributable)
+
+    def test_penalty(self):
+        """Propagation stops when failures make the penalty too high."""
+        f1, f2, g = self.steps(Step('f1', [], self.log, self.result(Constraint.failed), weight=0.5),
+                               Step('f2', [], self.log, self.result(Constraint.failed), weight=0.5),
+                               Step('g', [], self.log))
+        space = self.run_space(f1, f2, g)
+        self.assertEqual(self.log, ['f1', 'f2'])
+        self.assertEqual(space.status, CSpace.failed)
+
+class TestFlatSearch(SearchTestCase):
+
+    def test_flat(self):
+        for sentence in SENTENCES:
+            self.assertSameSolutions(solutions(chunk(sentence), flat_dstore=True), sentence)
+
+class TestBitSetSearch(SearchTestCase):
+
+    def test_bitsets(self):
+        for sentence in SENTENCES:
+            self.assertSameSolutions(solutions(chunk(sentence), bitsets=True), sentence)
+
+class TestParallelSearch(SearchTestCase):
+
+    def test_parallel(self):
+        """Subtrees searched by other processes give the same solutions, in the
+        same order if results are merged in order."""
+        for sentence in SENTENCES:
+            found = solutions(chunk(sentence), search_algo=search.ParallelSmartSearch(processes=2, chunk=3))
+            self.assertSameSolutions(found, sentence, ordered=False)
+            self.assertEqual(solutions(chunk(sentence), search_algo=search.ParallelSmartSearch(processes=2, chunk=3)),
+                             found)
+
+    def test_unordered(self):
+        sentence = SENTENCES[0]
+        found = solutions(chunk(sentence),
+                          search_algo=search.ParallelSmartSearch(processes=3, chunk=2, ordered=False))
+        self.assertSameSolutions(found, sentence, ordered=False)
+
+class TestHeuristics(SearchTestCase):
+
+    def test_options(self):
+        """Other heuristics find the same solutions, perhaps in another order."""
+        sentence = SENTENCES[0]
+        for var_select in Distributor.var_heuristics:
+            for val_select in Distributor.val_heuristics:
+                found = solutions(chunk(sentence), var_select=var_select, val_select=val_select, seed=3)
+                self.assertSameSolutions(found, sentence, ordered=False)
+
+    def test_defaults_restored(self):
+        """Heuristics given to one solve() aren't used by the next one."""
+        sentence = SENTENCES[0]
+        x = chunk(sentence)
+        d = x.distributor
+        solutions(x, var_select='dom_wdeg', val_select='random', seed=5)
+        self.assertEqual((d.varsel_string, d.seed), ('dom_wdeg', 5))
+        self.assertSameSolutions(solutions(x), sentence)
+        self.assertEqual(d.var_select, Distributor.upper_select)
+        self.assertEqual(d.val_select, Distributor.smallest_select)
+        self.assertEqual((d.varsel_string, d.seed), ('upper', None))
+
+    def test_distributor_defaults(self):
+        """The heuristics a distributor was created with are its defaults."""
+        d = Distributor(var_select='first_fail', seed=7)
+        d.set_heuristics(var_select='impact', val_select='random', seed=1)
+        d.set_heuristics()
+        self.assertEqual(d.var_select, d.first_fail_select)
+        self.assertEqual(d.val_select, Distributor.smallest_select)
+        self.assertEqual(d.seed, 7)
+        self.assertRaises(ValueError, d.set_heuristics, var_select='unknown')
+
+class TestTrailSearch(SearchTestCase):
+
+    def test_trail(self):
+        """Depth-first search with a trail finds the same solutions as
+        depth-first search with cloned stores, with and without snapshots."""
+        for sentence in SENTENCES:
+            expected = solutions(chunk(sentence), search_algo=search.DFS())
+            self.assertSameSolutions(expected, sentence, ordered=False)
+            self.assertEqual(solutions(chunk(sentence), search_algo=search.DFS(trail=True)),
+                             expected)
+            self.assertEqual(solutions(chunk(sentence), search_algo=search.DFS(trail=True, snapshot=2)),
+                             expected)
+
+class TestBranchAndBound(SearchTestCase):
+    """Some propagators are made soft, so that solutions can violate them
+    and have penalties."""
+
+    sentence = SENTENCES[0]
+    k = 8
+
+    def setUp(self):
+        self.max_penalty = CSpace.max_penalty
+        CSpace.max_penalty = 2.5
+
+    def tearDown(self):
+        CSpace.max_penalty = self.max_penalty
+
+    def soft_chunk(self):
+        x = chunk(self.sentence)
+        r = random.Random(0)
+        for propagator in x.propagator_list:
+            if r.random() < 0.6:
+                propagator.weight = 0.7
+        return x
+
+    def penalties(self, search_algo):
+        return [node.state.penalty
+                for node in Solver(self.soft_chunk(), search_algo).run(tracevar=[])]
+
+    def test_k_best(self):
+        """The k best solutions have the k lowest penalties, in order."""
+        every = sorted(self.penalties(search.SmartSearch()))
+        # Penalties differ within the k best
+        self.assertGreater(len(every), self.k)
+        self.assertLess(every[0], every[self.k-1])
+        self.assertEqual(self.penalties(search.BranchAndBound(k=self.k)), every[:self.k])
+        self.assertEqual(self.penalties(search.BranchAndBound(k=1)), every[:1])
+
+    def test_optimal(self):
+        x = self.soft_chunk()
+        self.assertEqual(len(x.solve(all_sols=True, verbose=0, optimal=True, k_best=3)), 3)
+
+class TestBudget(SearchTestCase):
+
+    # Search nodes for test_partial(), enough to find some but not all solutions
+    nodes = 15
+
+    def test_budget(self):
+        self.assertIsNone(search.Budget().exceeded())
+        budget = search.Budget(time_limit=0.001)
+        time.sleep(0.01)
+        self.assertEqual(budget.exceeded(), 'time')
+        # The process "grows" by setting the size that Budget.memory() reports
+        memory = search.Budget.memory
+        size = [100 * 1048576]
+        search.Budget.memory = staticmethod(lambda: size[0])
+        try:
+            budget = search.Budget(memory_limit=1)
+            self.assertIsNone(budget.exceeded())
+            size[0] += 1048576
+            self.assertIsNone(budget.exceeded())
+            size[0] += 1
+            self.assertEqual(budget.exceeded(), 'memory')
+        finally:
+            search.Budget.memory = memory
+
+    def test_time_limit(self):
+        sentence = SENTENCES[0]
+        x = chunk(sentence)
+        found = solutions(x, time_limit=0.000001)
+        self.assertEqual(x.budget_hit, 'time')
+        self.assertLess(len(found), len(self.baseline_solutions(sentence)))
+        # The next search has no limit
+        self.assertSameSolutions(solutions(x), sentence)
+        self.assertIsNone(x.budget_hit)
+
+    def test_trail_time_limit(self):
+        """Depth-first search with a trail stops when its budget is used up."""
+        sentence = SENTENCES[0]
+        x = chunk(sentence)
+        found = solutions(x, search_algo=search.DFS(trail=True), time_limit=0.000001)
+        self.assertEqual(x.budget_hit, 'time')
+        self.assertLess(len(found), len(self.baseline_solutions(sentence)))
+        self.assertIsNone(x.deadline)
+        found = solutions(x, search_algo=search.DFS(trail=True))
+        self.assertIsNone(x.budget_hit)
+        self.assertSameSolutions(found, sentence, ordered=False)
+
+    def test_partial(self):
+        """A search that runs out of its budget returns the solutions it found
+        and its best incomplete state."""
+        sentence = SENTENCES[0]
+        expected = self.baseline_solutions(sentence)
+        x = chunk(sentence)
+        found = solutions(x, search_algo=NodeLimitedSearch(TestBudget.nodes))
+        self.assertEqual(x.budget_hit, 'time')
+        self.assertIsInstance(x.partial, CSpace)
+        self.assertGreater(len(found), 0)
+        self.assertLess(len(found), len(expected))
+        for solution in found:
+            self.assertIn(solution, expected)
+
+class NodeBudget:
+    """A budget that is used up after a number of search nodes, so that
+    searches stop at the same point each time."""
+
+    deadline = None
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def exceeded(self):
+        self.nodes -= 1
+        return 'time' if self.nodes < 0 else None
+
+class NodeLimitedSearch(search.SmartSearch):
+
+    def __init__(self, nodes):
+        search.SmartSearch.__init__(self)
+        self.nodes = nodes
+
+    def start_budget(self, problem):
+        search.SmartSearch.start_budget(self, problem)
+        return NodeBudget(self.nodes)
+
+class TestCompileCache(SearchTestCase):
+
+    def setUp(self):
+        # Load the language and analyze the words, so that problems are cached
+        # the first time
+        for sentence in SENTENCES:
+            compile_chunk(sentence)
+        XDG.clear_compiled()
+
+    def tearDown(self):
+        XDG.clear_compiled()
+
+    def test_reuse(self):
+        """A problem from the cache finds the same solutions as a new one,
+        each time it is solved."""
+        for sentence in SENTENCES:
+            x = compile_chunk(sentence)
+            self.assertSameSolutions(solutions(x), sentence)
+            y = compile_chunk(sentence)
+            self.assertIsNot(y, x)
+            # The new problem isn't created again
+            self.assertIs(y.varsL, x.varsL)
+            self.assertSameSolutions(solutions(y), sentence)
+            # Searching in another way doesn't change the cached problem
+            self.assertSameSolutions(solutions(y, search_algo=search.DFS(trail=True)),
+                                     sentence, ordered=False)
+            self.assertSameSolutions(solutions(compile_chunk(sentence)), sentence)
+        self.assertEqual((XDG.compile_hits, XDG.compile_misses), (2 * len(SENTENCES), len(SENTENCES)))
+
+    def test_earlier_solutions(self):
+        """Solving a problem from the cache doesn't change the multigraphs of
+        an earlier problem for the same sentence."""
+        sentence = SENTENCES[0]
+        x = compile_chunk(sentence)
+        multigraphs = x.solve(all_sols=True, verbose=0, interactive=False)
+        found = [values(x, mg.dstore) for mg in multigraphs]
+        self.assertSameSolutions(found, sentence)
+        self.assertSameSolutions(solutions(compile_chunk(sentence)), sentence)
+        self.assertEqual([values(x, mg.dstore) for mg in multigraphs], found)
+
+    def test_forget_copies(self):
+        """Domains in the stores of copies that are gone are deleted."""
+        sentence = SENTENCES[1]
+        x = compile_chunk(sentence)
+        solutions(x)
+        var = x.initial_undetermined[0]
+        self.assertGreater(len(var.dstores), 2)
+        del x
+        gc.collect()
+        y = compile_chunk(sentence)
+        compiled, = XDG.compiled.values()
+        self.assertEqual(set(var.dstores), {compiled.dstore, y.dstore})
+
+    def test_key(self):
+        sentence = SENTENCES[0]
+        key = XDG.compile_key(sentence, 'es', None, 'chunk', {})
+        self.assertEqual(XDG.compile_key(sentence.split(), 'es', [], 'chunk', {}), key)
+        self.assertNotEqual(XDG.compile_key(SENTENCES[1], 'es', None, 'chunk', {}), key)
+        self.assertNotEqual(XDG.compile_key(sentence, 'es', None, 'chunk', {'weaken': ['agr']}), key)
+        self.assertIsNone(XDG.compile_key(sentence, 'es', None, 'chunk', {'reload': True}))
+        self.assertIsNone(XDG.compile_key(sentence, 'es', None, 'chunk', {'create_princs': False}))
+
+    def test_analyses(self):
+        """Problems aren't reused when what analysis gives one of the words
+        changes."""
+        sentence = SENTENCES[0]
+        language = Language.LANGUAGES['es']
+        if not language.morph_processing:
+            self.skipTest('No morphological analysis for es')
+        options = {'load_semantics': False, 'flatten_lexicon': True, 'pickle': False}
+        key = XDG.compile_key(sentence, 'es', None, 'chunk', options)
+        language.forget_anal('vio')
+        try:
+            self.assertNotEqual(XDG.compile_key(sentence, 'es', None, 'chunk', options), key)
+        finally:
+            language.anal('vio', 'vio', verbose=False)
+        self.assertEqual(XDG.compile_key(sentence, 'es', None, 'chunk', options), key)
+
+    def test_reload(self):
+        """Problems made before a language is reloaded aren't reused."""
+        sentence = SENTENCES[1]
+        x = compile_chunk(sentence)
+        Language.load_langs(['es'], grammar='chunk', force=True, flatten=True, pickle=False,
+                            verbosity=0)
+        y = compile_chunk(sentence)
+        self.assertEqual(XDG.compile_misses, 2)
+        self.assertIsNot(y.varsL, x.varsL)
+        self.assertIs(y.language, Language.LANGUAGES['es'])
+        self.assertSameSolutions(solutions(y), sentence)
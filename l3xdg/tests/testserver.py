@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+#   This file is part of the HLTDI L^3 project
+#       for parsing, generation, and translation within the
+#       framework of  Extensible Dependency Grammar.
+#
+#   Copyright (C) 2026 The HLTDI L^3 Team <gasser@cs.indiana.edu>
+#
+#   This program is free software: you can redistribute it and/or
+#   modify it under the terms of the GNU General Public License as
+#   published by the Free Software Foundation, either version 3 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import unittest, os, tempfile, shutil
+from multiprocessing import AuthenticationError
+from .. server import XDGServer, XDGClient
+from .. xdg import XDG
+
+####
+#### A server's workers answer requests as a problem in this process would.
+#### Spanish chunk grammar.
+####
+
+SENTENCE = 'la mujer vio la casa'
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.server = XDGServer('es', workers=1, address=os.path.join(self.directory, 'l3.sock'))
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def test_authkey(self):
+        self.assertEqual(len(self.server.authkey), 32)
+        path = XDGServer.keypath(self.server.address)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+        self.assertRaises(AuthenticationError, XDGClient, self.server.address, b'l3xdg')
+
+    def test_requests(self):
+        problem = XDG(SENTENCE, 'es', grammar='chunk', load_semantics=False,
+                      flatten_lexicon=True, pickle=False, verbosity=0, report=0)
+        expected = len(problem.solve(all_sols=True, verbose=0, interactive=False))
+        with XDGClient(self.server.address) as client:
+            self.assertIn(client.ping()['pid'], self.server.workers)
+            response = client.parse(SENTENCE)
+            self.assertNotIn('error', response)
+            self.assertEqual(len(response['solutions']), expected)
+            self.assertTrue(all(s['display'] for s in response['solutions']))
+        # The key can be given instead of read from the key file
+        with XDGClient(self.server.address, self.server.authkey) as client:
+            self.assertIn('pid', client.ping())
+        self.server.stop()
+        self.assertFalse(os.path.exists(XDGServer.keypath(self.server.address)))
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+
+#   This file is part of the HLTDI L^3 project
+#       for parsing, generation, and translation within the
+#       framework of  Extensible Dependency Grammar.
+#
+#   Copyright (C) 2026 The HLTDI L^3 Team <gasser@cs.indiana.edu>
+#
+#   This program is free software: you can redistribute it and/or
+#   modify it under the terms of the GNU General Public License as
+#   published by the Free Software Foundation, either version 3 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from .. variable import *
+
+### Domain stores: the same changes made to the domains of variables in
+### ordinary DStores and in FlatDStores should leave the same domains.
+
+def make_vars(root):
+    """Variables with domains in root and ids, as a problem would give them."""
+    variables = [SVar('s0', set(), {0, 1, 2, 3}, 0, 2, rootDS=root),
+                 SVar('s1', {1}, {1, 2, 3}, 1, 3, rootDS=root),
+                 IVar('i0', {0, 1, 2}, rootDS=root),
+                 IVar('i1', {3, 4}, rootDS=root)]
+    for index, var in enumerate(variables):
+        var.id = index
+    return variables
+
+def strengthen(variables, dstore):
+    """Changes made in the same way to both kinds of store."""
+    s0, s1, i0, i1 = variables
+    s0.strengthen_upper({0, 2, 3}, dstore=dstore)
+    s0.strengthen_lower({2}, dstore=dstore)
+    s1.strengthen_upper_card(2, dstore=dstore)
+    i0.strengthen({1, 2}, dstore=dstore)
+
+def domains(variables, dstore):
+    """The domains of variables in dstore, as sets and ints."""
+    result = []
+    for var in variables:
+        if isinstance(var, SVar):
+            result.append((set(var.get_lower(dstore=dstore)), set(var.get_upper(dstore=dstore)),
+                           var.get_lower_card(dstore=dstore), var.get_upper_card(dstore=dstore)))
+        else:
+            result.append(set(var.get_domain(dstore=dstore)))
+    return result
+
+class TestFlatDStore(unittest.TestCase):
+
+    def setUp(self):
+        self.root = DStore(name='root')
+        self.variables = make_vars(self.root)
+        self.flat = FlatDStore.from_dstore(self.root, self.variables)
+
+    def test_initial(self):
+        self.assertEqual(domains(self.variables, self.flat),
+                         domains(self.variables, self.root))
+
+    def test_child(self):
+        child = self.root.make_child()
+        strengthen(self.variables, child)
+        flat_child = self.flat.make_child()
+        strengthen(self.variables, flat_child)
+        self.assertEqual(domains(self.variables, flat_child),
+                         domains(self.variables, child))
+        # The parents are unchanged
+        self.assertEqual(domains(self.variables, self.flat),
+                         domains(self.variables, self.root))
+
+    def test_siblings(self):
+        """Changes in one child aren't seen by its sibling, which shares its
+        parent's domains until it changes one."""
+        before = domains(self.variables, self.flat)
+        child1 = self.flat.make_child()
+        child2 = self.flat.make_child()
+        strengthen(self.variables, child1)
+        self.assertEqual(domains(self.variables, child2), before)
+        self.assertIs(child2.domains, self.flat.domains)
+        self.variables[3].strengthen({4}, dstore=child2)
+        self.assertEqual(domains(self.variables, child2)[3], {4})
+        self.assertEqual(domains(self.variables, child1)[3], {3, 4})
+        self.assertEqual(domains(self.variables, self.flat), before)
+
+    def test_grandchild(self):
+        child = self.root.make_child()
+        flat_child = self.flat.make_child()
+        strengthen(self.variables, child)
+        strengthen(self.variables, flat_child)
+        grandchild = child.make_child()
+        flat_grandchild = flat_child.make_child()
+        for dstore in (grandchild, flat_grandchild):
+            self.variables[0].determine({2, 3}, dstore=dstore)
+            self.variables[2].determine(2, dstore=dstore)
+        self.assertEqual(domains(self.variables, flat_grandchild),
+                         domains(self.variables, grandchild))
+        self.assertEqual(domains(self.variables, flat_child),
+                         domains(self.variables, child))
+
+### BitSets: set operations and comparisons should agree with those of
+### ordinary sets, and domains encoded as BitSets should change in the
+### same way as set domains.
+
+SETS1 = [set(), {0}, {1, 3, 5}, {0, 2, 3, 64, 130}, set(range(10))]
+
+class TestBitSet(unittest.TestCase):
+
+    def test_elements(self):
+        for s in SETS1:
+            b = BitSet(s)
+            self.assertEqual(set(b), s)
+            self.assertEqual(len(b), len(s))
+            self.assertEqual(bool(b), bool(s))
+            self.assertEqual(b, s)
+            for x in (0, 1, 3, 64, 200, -1, 'a'):
+                self.assertEqual(x in b, x in s)
+            if s:
+                self.assertEqual((b.min(), b.max()), (min(s), max(s)))
+        self.assertEqual(set(BitSet.span(3, 7)), set(range(3, 7)))
+        self.assertEqual(BitSet(range(2, 5)), {2, 3, 4})
+
+    def test_operations(self):
+        for s1 in SETS1:
+            for s2 in SETS1:
+                b1, b2 = BitSet(s1), BitSet(s2)
+                for b in (b2, s2):
+                    self.assertEqual(set(b1 | b), s1 | s2)
+                    self.assertEqual(set(b1 & b), s1 & s2)
+                    self.assertEqual(set(b1 - b), s1 - s2)
+                    self.assertEqual(set(b1 ^ b), s1 ^ s2)
+                    self.assertEqual(b1 <= b, s1 <= s2)
+                    self.assertEqual(b1 < b, s1 < s2)
+                    self.assertEqual(b1 >= b, s1 >= s2)
+                    self.assertEqual(b1.isdisjoint(b), s1.isdisjoint(s2))
+                # An ordinary set on the left gives an ordinary set
+                self.assertEqual(s1 | b2, s1 | s2)
+                self.assertIsInstance(s1 - b2, set)
+
+    def test_encode(self):
+        self.assertIsInstance(BitSet.encode({1, 2}), BitSet)
+        # Sets of other things aren't encoded
+        mixed = {1, (2, 3)}
+        self.assertIs(BitSet.encode(mixed), mixed)
+        self.assertEqual(BitSet({1}) | mixed, {1, (2, 3)})
+        self.assertRaises(ValueError, BitSet, {-1})
+
+    def test_union_all(self):
+        self.assertIsInstance(union_all([BitSet({1}), BitSet({2, 64})]), BitSet)
+        self.assertEqual(union_all([BitSet({1}), BitSet({2, 64})]), {1, 2, 64})
+        mixed = union_all([BitSet({1}), {2}])
+        self.assertIs(type(mixed), set)
+        self.assertEqual(mixed, {1, 2})
+        # With nothing to union, BitSets may not be in use
+        self.assertIs(type(union_all([])), set)
+
+    def test_domains(self):
+        """The same changes to set and BitSet domains."""
+        root = DStore(name='root')
+        variables = make_vars(root)
+        expected = root.make_child()
+        strengthen(variables, expected)
+        for var in variables:
+            var.encode_domains(dstore=root)
+        self.assertIsInstance(variables[0].get_upper(dstore=root), BitSet)
+        child = root.make_child()
+        strengthen(variables, child)
+        self.assertEqual(domains(variables, child), domains(variables, expected))
+
+### Trails: changes made in a TrailDStore are undone back to a mark, and a
+### snapshot of the store can be restored.
+
+class TestTrailDStore(unittest.TestCase):
+
+    def setUp(self):
+        self.root = DStore(name='root')
+        self.variables = make_vars(self.root)
+        self.trail = TrailDStore(name='trail', level=1, parent=self.root)
+
+    def test_undo(self):
+        before = domains(self.variables, self.trail)
+        undetermined = list(self.trail.undetermined)
+        mark = self.trail.mark()
+        strengthen(self.variables, self.trail)
+        expected = self.root.make_child()
+        strengthen(self.variables, expected)
+        self.assertEqual(domains(self.variables, self.trail), domains(self.variables, expected))
+        mark2 = self.trail.mark()
+        # Determining the variable removes it from the undetermined variables
+        self.variables[2].determine(1, dstore=self.trail)
+        self.assertEqual(self.variables[2].get_value(dstore=self.trail), 1)
+        self.assertNotIn(self.variables[2], self.trail.undetermined)
+        self.trail.undo(mark2)
+        self.assertEqual(domains(self.variables, self.trail), domains(self.variables, expected))
+        self.assertIsNone(self.variables[2].get_value(dstore=self.trail))
+        self.assertEqual(list(self.trail.undetermined), undetermined)
+        self.trail.undo(mark)
+        self.assertEqual(domains(self.variables, self.trail), before)
+        self.assertEqual(self.trail.mark(), mark)
+        # The parent isn't changed
+        self.assertEqual(domains(self.variables, self.root), before)
+
+    def test_absent(self):
+        """Undoing the first change to a feature in the store removes it again,
+        so that its value comes from the parent store."""
+        var = self.variables[0]
+        upper = var.get_upper(dstore=self.trail)
+        mark = self.trail.mark()
+        var.strengthen_upper({1}, dstore=self.trail)
+        self.assertIn('upper', var.dstores[self.trail])
+        self.trail.undo(mark)
+        self.assertNotIn('upper', var.dstores[self.trail])
+        self.assertEqual(var.get_upper(dstore=self.trail), upper)
+
+    def test_snapshot(self):
+        strengthen(self.variables, self.trail)
+        after = domains(self.variables, self.trail)
+        snap = self.trail.snapshot()
+        self.assertEqual(domains(self.variables, snap), after)
+        self.variables[3].determine(3, dstore=self.trail)
+        self.assertNotIn(self.variables[3], self.trail.undetermined)
+        self.trail.restore(snap)
+        self.assertEqual(domains(self.variables, self.trail), after)
+        self.assertIn(self.variables[3], self.trail.undetermined)
+        self.assertEqual(self.trail.trail, [])
@@ -0,0 +1,166 @@
+#   Trailing: domain stores whose changes can be undone, and depth-first
+#   search in a single such store.
+#
+########################################################################
+#
+#   This file is part of the HLTDI L^3 project
+#       for parsing, generation, and translation within the
+#       framework of  Extensible Dependency Grammar.
+#
+#   Copyright (C) 2010, 2011, 2012, 2013, 2014
+#   The HLTDI L^3 Team <gasser@cs.indiana.edu>
+#
+#   This program is free software: you can redistribute it and/or
+#   modify it under the terms of the GNU General Public License as
+#   published by the Free Software Foundation, either version 3 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# 2026.10.17
+# -- Created from the TrailDStore and trail search code in l3xdg and hiiktuu,
+#    which were nearly identical. Each package's TrailDStore combines Trail
+#    with its own DStore class; each solver's trail search calls trail_dfs()
+#    with functions to examine a state and to select a variable to
+#    distribute on.
+
+# Old value recorded for a feature that wasn't in a variable's dict
+_ABSENT = object()
+
+class TrailList(list):
+    """List of variables whose removals are recorded on the trail of a
+    TrailDStore."""
+
+    def __init__(self, variables, dstore):
+        list.__init__(self, variables)
+        self.dstore = dstore
+
+    def remove(self, var):
+        index = self.index(var)
+        del self[index]
+        self.dstore.trail.append((self, index, var))
+
+class Trail:
+    """Mixin for a domain store that search changes in place, recording each
+    change on a trail, so that going back to an earlier state means undoing
+    changes back to a mark on the trail. A snapshot of the store (an ordinary
+    child of its parent) can be saved and restored, for example to shorten the
+    trail during a long search. Subclasses also inherit from a DStore class and
+    call init_trail() after initializing it."""
+
+    # Class of the stores made by snapshot()
+    store_class = None
+    # Lists of variables kept by the store whose removals are recorded
+    trail_lists = ('undetermined',)
+
+    def init_trail(self, parent):
+        # (dict, feature, old value) or (list, index, variable)
+        self.trail = []
+        # Variables with domains in this store
+        self.touched = set()
+        for attrib in self.trail_lists:
+            setattr(self, attrib, TrailList(getattr(parent, attrib) if parent else [], self))
+
+    def record(self, var, dsdict, feature):
+        """Record the current value of feature in var's dict before it changes."""
+        self.trail.append((dsdict, feature, dsdict.get(feature, _ABSENT)))
+        self.touched.add(var)
+
+    def mark(self):
+        """A position on the trail to undo() back to."""
+        return len(self.trail)
+
+    def undo(self, mark):
+        """Undo the changes made since mark."""
+        trail = self.trail
+        while len(trail) > mark:
+            container, key, old = trail.pop()
+            if type(container) is dict:
+                if old is _ABSENT:
+                    container.pop(key, None)
+                else:
+                    container[key] = old
+            else:
+                list.insert(container, key, old)
+
+    def snapshot(self, name=''):
+        """An ordinary store with the current bindings, a child of this store's parent."""
+        snap = self.store_class(name=name or self.name, level=self.level,
+                                problem=self.problem, parent=self.parent)
+        for var in self.touched:
+            dsdict = var.dstores.get(self)
+            if dsdict:
+                var.dstores[snap] = dict(dsdict)
+        for attrib in self.trail_lists:
+            setattr(snap, attrib, list(getattr(self, attrib)))
+        return snap
+
+    def restore(self, snap):
+        """Return to the bindings in a snapshot, forgetting the trail."""
+        for var in self.touched:
+            var.dstores[self] = dict(var.dstores.get(snap, {}))
+        for attrib in self.trail_lists:
+            setattr(self, attrib, TrailList(getattr(snap, attrib), self))
+        self.trail = []
+
+def trail_dfs(state, examine, select, cutoff, snapshot=0, snap_name='T{}',
+              stop=None, tracevar=None):
+    """Depth-first search from state, whose dstore is a Trail store, generating
+    solutions. Only the current path is kept: for each level, the state and the
+    constraint used to distribute, and for each untried alternative, the
+    position on the trail to return to. If snapshot is n > 0, the store is saved
+    every n levels and the trail is cleared; backtracking above the latest
+    saved store restores the nearest one and recomputes the states below it.
+
+    examine(state) runs the state and returns a solution or None and whether
+    the state can be distributed; select(dstore) returns a variable and the two
+    constraints to distribute on; stop(), if given, ends the search when it
+    returns something true. Returns the number of states examined."""
+    dstore = state.dstore
+    # (state, variable, constraint) for each level of the current path
+    path = []
+    # Alternatives to try: (depth, trail mark, constraint)
+    alternatives = []
+    # Saved stores by depth
+    saved = {}
+    n = 0
+    while n < cutoff and not (stop and stop()):
+        solution, distributable = examine(state)
+        if solution is not None:
+            yield solution
+        n += 1
+        if distributable:
+            depth = state.depth
+            if snapshot and depth % snapshot == 0:
+                saved[depth] = dstore.snapshot(name=snap_name.format(depth))
+                dstore.trail = []
+            var, constraint1, constraint2 = select(dstore)
+            del path[depth:]
+            path.append((state, var, constraint1))
+            alternatives.append((depth, dstore.mark(), constraint2))
+            state = state.trail_child(var, constraint1, 'a')
+            continue
+        # Backtrack
+        if not alternatives:
+            break
+        depth, mark, constraint2 = alternatives.pop()
+        if saved and max(saved) > depth:
+            # The trail back to mark is gone; recompute from the nearest saved store
+            for d in [d for d in saved if d > depth]:
+                del saved[d]
+            start = max([d for d in saved if d <= depth])
+            dstore.restore(saved[start])
+            for parent, var, constraint in path[start:depth]:
+                parent.trail_child(var, constraint, '').run(tracevar=tracevar)
+        else:
+            dstore.undo(mark)
+        parent, var, constraint1 = path[depth]
+        path[depth] = (parent, var, constraint2)
+        state = parent.trail_child(var, constraint2, 'b')
+    return n
@@ -107,11 +107,34 @@
 #    so that equality is more sophisticated than just simple equality.
 # 2013.06.29
 # -- Copied to variable.pyx and cythonized.
+# 2026.10.17
+# -- FlatDStore: an alternative domain store that keeps the domains of all of
+#    a problem's variables in a single list indexed by variable id, copied
+#    on write when the store is cloned. Lookups don't have to climb the chain
+#    of parent stores, and discarded stores can be garbage collected.
+# 2026.10.17
+# -- Domains can be BitSets (see bitset.py); encode_domains() converts a
+#    variable's int domains in a dstore. strengthen_upper(), strengthen_lower()
+#    and discard_upper() use one bitwise operation instead of a subset test
+#    followed by an intersection or union.
+# 2026.10.17
+# -- Variable.set() records in the dstore what kind of change (event) happened to
+#    the variable, so that the solver only wakes up propagators that care about it.
+# 2026.10.17
+# -- TrailDStore: a single store for depth-first search that records every
+#    change to a domain (and to the list of undetermined variables) on a
+#    trail, so that the changes can be undone on backtracking instead of
+#    cloning the store.
+# 2026.10.17
+# -- The trail code is in trail.py, shared with hiiktuu. Undoing the change to
+#    a feature that wasn't in a variable's dict deletes it again.
 
 import random
 # For extracting stuff from variable names
 import re
 from .lex import unify_fs, unify_values, unify_fssets, elim_specializations
+from .bitset import *
+from .trail import Trail
 
 # Later make these constants depend on the XDG problem.
 MIN = 0
@@ -120,10 +143,26 @@ MAX = 200
 ALL = set(range(MAX))
 NONE = set()
 
+# Events: kinds of changes to a variable's domain, as bits
+LOWER_EVENT = 1
+UPPER_EVENT = 2
+CARD_EVENT = 4
+DET_EVENT = 8
+ALL_EVENTS = LOWER_EVENT | UPPER_EVENT | CARD_EVENT | DET_EVENT
+# The event for each feature; an IVar's domain is its upper bound
+FEATURE_EVENTS = {'lower': LOWER_EVENT, 'upper': UPPER_EVENT, 'dom': UPPER_EVENT,
+                  'lower_card': CARD_EVENT, 'upper_card': CARD_EVENT,
+                  'value': DET_EVENT}
+
 class DStore:
     """Domain store holding domains for variables. (Really the domains are held in
     dicts kept by the variables.)"""
 
+    # Whether the store holds the domains itself (see FlatDStore)
+    flat = False
+    # Changes to undo on backtracking (see TrailDStore)
+    trail = None
+
     def __init__(self, name='', level=0, problem=None, parent=None):
         """This store is a strengthening of parent store if there is one."""
         self.problem = problem
@@ -133,6 +172,8 @@ class DStore:
         self.level = level
         # Undetermined variables
         self.undetermined = []
+        # Events for variables changed since the solver last looked: {var: events}
+        self.var_events = {}
 
     def __repr__(self):
         return '<DS {}/{}>'.format(self.name, self.level)
@@ -160,12 +201,17 @@ class DStore:
                 for var in undet:
                     var.pprint(self, 4)
 
-    def clone(self, constraint=None, name='', project=False, verbosity=0):
-        """Create a new dstore by applying the basic constraint
-        to the bindings in this store."""
+    def make_child(self, name=''):
+        """Create a store that is a strengthening of this one."""
         new_store = DStore(name=name or self.name, level=self.level+1,
                            problem=self.problem, parent=self)
         self.children.append(new_store)
+        return new_store
+
+    def clone(self, constraint=None, name='', project=False, verbosity=0):
+        """Create a new dstore by applying the basic constraint
+        to the bindings in this store."""
+        new_store = self.make_child(name=name)
         new_store.undetermined = self.undetermined[:]
         if not project:
             constraint.infer(dstore=new_store, verbosity=0, tracevar=[])
@@ -174,6 +220,90 @@ class DStore:
                 var.determined(dstore=new_store, verbosity=0)
         return new_store
 
+class FlatDStore(DStore):
+    """Domain store that holds the domains itself, in a list of feature dicts
+    indexed by variable id. A child store shares the list (and the dicts) with its
+    parent until one of them changes a domain; only then is the list copied, and
+    only the dict of the variable that changes. Children are not recorded, so a
+    store is freed as soon as the search no longer refers to it.
+
+    Variables without an id (mostly constants created outside a problem) are
+    stored the usual way, in their own dstores dicts."""
+
+    flat = True
+
+    def __init__(self, name='', level=0, problem=None, parent=None, domains=None):
+        DStore.__init__(self, name=name, level=level, problem=problem, parent=parent)
+        self.domains = domains or []
+        # Whether self.domains belongs to this store alone
+        self.owner = False
+        # Ids of the variables whose feature dicts belong to this store alone
+        self.written = set()
+
+    def __repr__(self):
+        return '<FDS {}/{}>'.format(self.name, self.level)
+
+    @staticmethod
+    def from_dstore(dstore, variables):
+        """Create a FlatDStore with the bindings of variables in dstore
+        (normally the root store of a problem). variables must already have ids."""
+        chain = []
+        ds = dstore
+        while ds:
+            chain.append(ds)
+            ds = ds.parent
+        chain.reverse()
+        domains = [None] * (max([v.id for v in variables]) + 1 if variables else 0)
+        for var in variables:
+            entry = {}
+            for ds in chain:
+                entry.update(var.dstores.get(ds, {}))
+            domains[var.id] = entry
+        # dstore remains the parent so that variables without ids can still be found
+        flat = FlatDStore(name=dstore.name, level=dstore.level, problem=dstore.problem,
+                          parent=dstore, domains=domains)
+        flat.undetermined = dstore.undetermined[:]
+        return flat
+
+    def make_child(self, name=''):
+        """Create a store that shares this store's domains until one of them
+        changes."""
+        # From now on neither store can change the shared list or dicts in place
+        self.owner = False
+        self.written = set()
+        return FlatDStore(name=name or self.name, level=self.level+1,
+                          problem=self.problem, parent=self, domains=self.domains)
+
+    def get_feature(self, var, feature, default=None):
+        """The value of feature for var in this store."""
+        x = self.domains[var.id].get(feature)
+        if x is None:
+            return default
+        return x
+
+    def set_feature(self, var, feature, value):
+        """Set the value of feature for var, copying what is shared first."""
+        if not self.owner:
+            self.domains = self.domains[:]
+            self.owner = True
+        vid = var.id
+        if vid not in self.written:
+            self.domains[vid] = dict(self.domains[vid])
+            self.written.add(vid)
+        self.domains[vid][feature] = value
+
+class TrailDStore(Trail, DStore):
+    """Domain store for searching without cloning (see trail.py)."""
+
+    store_class = DStore
+
+    def __init__(self, name='', level=0, problem=None, parent=None):
+        DStore.__init__(self, name=name, level=level, problem=problem, parent=parent)
+        self.init_trail(parent)
+
+    def __repr__(self):
+        return '<TDS {}/{}>'.format(self.name, self.level)
+
 DS0 = DStore(name='top')
 
 class Variable:
@@ -190,6 +320,8 @@ class Variable:
                  principle=None):
         self.name = name
         self.problem = problem
+        # Index of the variable's domains in FlatDStores; assigned by the problem
+        self.id = None
         if problem:
             self.problem.add_variable(self)
         self.value = None
@@ -271,6 +403,8 @@ class Variable:
     def get(self, dstore, feature, default=None):
         """Returns a value for feature associated with dstore, recursively
         checking dstore's parent is nothing is found."""
+        if dstore.flat and self.id is not None:
+            return dstore.get_feature(self, feature, default)
         dstore_dict = self.dstores.get(dstore, {})
         x = dstore_dict.get(feature, None)
         if x != None:
@@ -283,10 +417,18 @@ class Variable:
     def set(self, dstore, feature, value):
         """Sets feature to be value in dstore, creating a dict for dstore if one doesn't exist."""
         dstore = dstore or self.rootDS
+        if value is not None:
+            events = dstore.var_events
+            events[self] = events.get(self, 0) | FEATURE_EVENTS.get(feature, ALL_EVENTS)
+        if dstore.flat and self.id is not None:
+            dstore.set_feature(self, feature, value)
+            return
         dsdict = self.dstores.get(dstore, None)
         if dsdict == None:
             dsdict = {'value': None}
             self.dstores[dstore] = dsdict
+        if dstore.trail is not None:
+            dstore.record(self, dsdict, feature)
         dsdict[feature] = value
 
     def get_value(self, dstore=None):
@@ -306,6 +448,10 @@ class Variable:
         '''Reinitialize the values and bounds on it.'''
         raise NotImplementedError("%s is an abstract class" % self.__class__.__name__)
 
+    def encode_domains(self, dstore=None):
+        '''Replace sets of ints in the variable's domains with BitSets.'''
+        raise NotImplementedError("%s is an abstract class" % self.__class__.__name__)
+
     def incr_rights(self, index):
         """Increment count of projector right-hand sides."""
         raise NotImplementedError("%s is an abstract class" % self.__class__.__name__)
@@ -441,7 +587,7 @@ class IVar(Variable):
                           weight=weight, principle=principle)
         # init_domain could be a list
         if init_domain:
-            if not isinstance(init_domain, set):
+            if not isinstance(init_domain, SETS):
                 init_domain = set(init_domain)
         else:
             init_domain = ALL.copy()
@@ -537,6 +683,13 @@ class IVar(Variable):
         self.set_domain(self.init_domain, dstore=dstore)
         self.set_value(None, dstore=dstore)
 
+    def encode_domains(self, dstore=None):
+        dstore = dstore or self.rootDS
+        dom = self.get_domain(dstore=dstore)
+        bits = BitSet.encode(dom)
+        if bits is not dom:
+            self.set_domain(bits, dstore=dstore)
+
     def det(self, check=False, dstore=None, verbosity=0):
         '''Attempt to determine variable.'''
         if verbosity > 1:
@@ -618,7 +771,7 @@ class IVar(Variable):
         """Is it impossible for variable to have value?
         Pattern matching may be wrong!"""
         domain = self.get_domain(dstore=dstore)
-        if not isinstance(value, set):
+        if not isinstance(value, SETS):
             value = {value}
         if pattern and (not domain or unify_fssets(value, domain)):
 #        if pattern and (not domain or () in domain):
@@ -711,14 +864,14 @@ class IVar(Variable):
 
     def strengthen(self, values, dstore=None, constraint=None, det=False):
         """Strengthens the domain by intersecting it with values."""
-        if not isinstance(values, set):
+        if not isinstance(values, SETS):
             values = {values}
         dom = self.get_domain(dstore=dstore)
         if not dom.issubset(values):
             if constraint:
                 string = '  {} strengthening {}, domain {} intersected with {}'
                 print(string.format(constraint, self, self.get_domain(dstore=dstore), values))
-            new_domain = dom & values
+            new_domain = dom.intersection(values)
             self.set_domain(new_domain, dstore=dstore)
             if det and len(new_domain) == 1:
 #                print('Determining', self)
@@ -776,9 +929,9 @@ class IVar(Variable):
         """Discard set or element from upper bound."""
 #        value = list(value)[0] if isinstance(value, set) else value
 #        return self.discard_value(value, dstore=dstore, constraint=constraint)
-        value = value if isinstance(value, set) else {value}
+        value = value if isinstance(value, SETS) else {value}
         dom = self.get_domain(dstore=dstore)
-        if value & dom:
+        if not dom.isdisjoint(value):
             new_dom = dom - value
             # If value and upper overlap
             if constraint:
@@ -818,7 +971,7 @@ class SVar(Variable):
         else:
             self.lower_domain = set()
         if upper_domain != None:
-            if not isinstance(upper_domain, set):
+            if not isinstance(upper_domain, SETS):
                 upper_domain = set(upper_domain)
             self.upper_domain = upper_domain
         else:
@@ -846,6 +999,14 @@ class SVar(Variable):
         self.set_upper_card(self.init_upper_card, dstore=dstore)
         self.set_value(None, dstore=dstore)
 
+    def encode_domains(self, dstore=None):
+        dstore = dstore or self.rootDS
+        for feature in ('lower', 'upper', 'value'):
+            values = self.get(dstore, feature)
+            bits = BitSet.encode(values)
+            if bits is not values:
+                self.set(dstore, feature, bits)
+
     def set_lower(self, lower, dstore=None):
         self.set(dstore, 'lower', lower)
 
@@ -990,7 +1151,7 @@ class SVar(Variable):
         Only used in SimpleEqualitySelection which is only used in the
         two Government principles.
         Pattern matching may be wrong!!!"""
-        if not isinstance(value, set):
+        if not isinstance(value, SETS):
             value = {value}
         upper = self.get_upper(dstore=dstore)
         lower = self.get_lower(dstore=dstore)
@@ -1164,7 +1325,7 @@ class SVar(Variable):
         """If pattern is True, determine at unification of value and upper bound."""
         if self.is_determined(dstore=dstore):
             return False
-        value = value if isinstance(value, set) else {value}
+        value = value if isinstance(value, SETS) else {value}
         orig_upper = self.get_upper(dstore=dstore)
         orig_lower = self.get_lower(dstore=dstore)
         upper = self.get_upper(dstore=dstore)
@@ -1222,11 +1383,19 @@ class SVar(Variable):
         If det is True, attempt to determine variable.
         """
         upper = self.get_upper(dstore=dstore)
-        if not isinstance(upper, set):
+        if not isinstance(upper, SETS):
             print("{}'s upper {} is not set".format(self, upper))
-        if not upper.issubset(upper2):
+        if isinstance(upper, BitSet) and not pattern:
+            # One bitwise intersection tells us whether anything changes
+            new_upper = upper.intersection(upper2)
+            changed = new_upper.mask != upper.mask
+        else:
+            new_upper = None
+            changed = not upper.issubset(upper2)
+        if changed:
             # Use unification if pattern is True; !!! for now assume this always succeeds
-            new_upper = unify_fssets(upper, upper2) if pattern else upper.intersection(upper2)
+            if new_upper is None:
+                new_upper = unify_fssets(upper, upper2) if pattern else upper.intersection(upper2)
             lower_card = self.get_lower_card(dstore=dstore)
             if pattern and reduce:
                 elim_specializations(new_upper)
@@ -1265,8 +1434,8 @@ class SVar(Variable):
     def discard_upper(self, value, dstore=None, constraint=None):
         """Discard set or element from upper bound."""
         upper = self.get_upper(dstore=dstore)
-        value = value if isinstance(value, set) else {value}
-        if value & upper:
+        value = value if isinstance(value, SETS) else {value}
+        if not upper.isdisjoint(value):
             new_upper = upper - value
             lower = self.get_lower(dstore=dstore)
             if len(new_upper) < len(lower) and constraint:
@@ -1284,8 +1453,16 @@ class SVar(Variable):
         lower = self.get_lower(dstore=dstore)
 #        if constraint:
 #            print('  {} attempting to strengthen lower bound of {} with {}'.format(constraint, self, lower2))
-        if not lower.issuperset(lower2):
+        if isinstance(lower, BitSet):
+            # One bitwise union tells us whether anything changes
             new_lower = lower.union(lower2)
+            changed = new_lower != lower
+        else:
+            new_lower = None
+            changed = not lower.issuperset(lower2)
+        if changed:
+            if new_lower is None:
+                new_lower = lower.union(lower2)
             upper = self.get_upper(dstore=dstore)
             upper_card = self.get_upper_card(dstore=dstore)
             if not new_lower.issubset(upper) and constraint:
@@ -1485,13 +1662,17 @@ class Determined(Variable):
     def is_determined(self, dstore=None):
         return True
 
+    def encode_domains(self, dstore=None):
+        """Constants keep their values."""
+        pass
+
 class DetIVar(Determined, IVar):
 
     def __init__(self, name='', value=0, dstore=None):
         Variable.__init__(self, name, rootDS=dstore)
         Determined.__init__(self, value, dstore)
         # value could be the empty set
-        self.init_domain = value if isinstance(value, set) else {value}
+        self.init_domain = value if isinstance(value, SETS) else {value}
         self.default_value = value
 
     def __repr__(self):
@@ -1519,7 +1700,7 @@ class DetIVar(Determined, IVar):
         if feature == 'value':
             return self.value
         if feature == 'dom':
-            if isinstance(self.value, set):
+            if isinstance(self.value, SETS):
                 return self.value
             else:
                 return {self.value}
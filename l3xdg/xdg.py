@@ -130,6 +130,41 @@
 # 2014.02.04
 # -- Method (record_solution()), which records occurrence of entries in a selected
 #    solution.
+# 2026.10.17
+# -- Variables get ids when they're added to the problem, so that solve() can
+#    optionally run the search with FlatDStores (flat_dstore=True).
+# 2026.10.17
+# -- solve() can encode int domains as BitSets before searching (bitsets=True).
+# 2026.10.17
+# -- solve() takes the names of the variable and value selection heuristics
+#    (var_select, val_select) and a seed for the random ones.
+# 2026.10.17
+# -- solve() uses FlatDStores when the search algorithm requires them, as
+#    search.ParallelSmartSearch does.
+# 2026.10.17
+# -- solve(optimal=True) returns only the k_best solutions with the lowest
+#    penalties, found with branch-and-bound search.
+# 2026.10.17
+# -- solve() takes a time_limit (seconds) and memory_limit (megabytes). When
+#    one is exceeded, the solutions found so far are returned, budget_hit says
+#    which limit was hit, and partial is the best incomplete CSpace.
+# 2026.10.17
+# -- XDG.compile() keeps compiled problems in an LRU cache keyed by language,
+#    grammar, tokens, and constructor options. A problem taken from the cache
+#    gets back its initial domains (restore_initial()), so it is solved again
+#    without recreating nodes, variables, and propagators.
+#    The key includes the identities of the loaded languages and their
+#    lexicons, so problems made before languages are reloaded or given new
+#    lexicons aren't reused.
+# 2026.10.17
+# -- XDG.compile() returns a new copy of the cached problem each time
+#    (initial_copy()), with its own root dstore, instead of restoring and
+#    returning the cached problem itself, so solving it again doesn't change
+#    the multigraphs of earlier solutions. The key also includes the words'
+#    morphological analyses.
+# 2026.10.17
+# -- solve(all_sols=False, interactive=False) returns the first solution
+#    without prompting for more.
 #########################################################################
 
 # imports search
@@ -146,6 +181,8 @@ from .disambig import *
 import itertools
 # Type checking
 import inspect
+# For the cache of compiled problems
+import collections, copy, weakref
 
 from .utils import PARSE, GENERATE, TRANSLATE
 
@@ -156,6 +193,14 @@ class XDG(CSP):
     is considered a 'language'.
     """
 
+    # Compiled problems, least recently used first: {key: XDG}
+    compiled = collections.OrderedDict()
+    # Maximum number of compiled problems to keep
+    max_compiled = 64
+    # Cache hits and misses
+    compile_hits = 0
+    compile_misses = 0
+
     def __init__(self, sentence, lang='en', target=None, grammar='tiny',
                  lexicon=None, solver=None,
                  load_semantics=True, transfer_xlex=False,
@@ -185,6 +230,8 @@ class XDG(CSP):
                  flatten_lexicon=False,
                  # Whether to pickle a newly created (or flattened) lexicon
                  pickle=False,
+                 # Whether to load lexicons from a snapshot, writing one if there isn't one
+                 snapshot=False,
                  # Whether to instantiate principles
                  create_princs=True,
                  distributor=None,
@@ -208,6 +255,7 @@ class XDG(CSP):
             # load them
             languages = Language.load_langs(lang_ids, analysis=True, generation=True, lexicon=True,
                                             force=reload, pickle=pickle, flatten=flatten_lexicon,
+                                            snapshot=snapshot,
                                             load_morpho=True, grammar=grammar, semantics=True,
                                             verbosity=verbosity)
         else:
@@ -334,6 +382,8 @@ class XDG(CSP):
 
         ## Variable and propagator dictionaries (only for debugging?)
         self.varsD = {}
+        # All variables in order of creation; a variable's id is its index here
+        self.varsL = []
         # We don't want propagators associated directly with determined variables,
         # which are mainly constants, so store them in a problem-specific dict:
         # {var: propagators}
@@ -405,6 +455,7 @@ class XDG(CSP):
         '''Start over with new variables, constraints, and principle instances.'''
         self.dstore = DStore(self.name)
         self.varsD = {}
+        self.varsL = []
         self.propsD = {}
         for dim in self.dim_objs:
             dim.dstore = self.dstore
@@ -423,6 +474,146 @@ class XDG(CSP):
         CSP.__init__(self, self.name, self.dstore,
                      distributor=distributor)
 
+    @classmethod
+    def compile(cls, sentence, lang='en', target=None, grammar='tiny',
+                verbosity=0, report=1, **options):
+        """Return a problem for sentence, made from one with the same language(s),
+        grammar, tokens, analyses, and options if one is in the cache; otherwise
+        create it and cache it, evicting the least recently used problem if there
+        are more than max_compiled. Each call returns a new problem with its own
+        domain stores (initial_copy()), so solving it doesn't change the
+        solutions of problems returned by earlier calls."""
+        if not isinstance(sentence, str):
+            # The constructor adds the EOS word to a list
+            sentence = list(sentence)
+        key = cls.compile_key(sentence, lang, target, grammar, options)
+        if key is None:
+            return cls(sentence, lang=lang, target=target, grammar=grammar,
+                       verbosity=verbosity, report=report, **options)
+        problem = cls.compiled.get(key)
+        if problem:
+            cls.compile_hits += 1
+            cls.compiled.move_to_end(key)
+            if report:
+                print('Reusing compiled XDG {}'.format(problem))
+            return problem.initial_copy()
+        cls.compile_misses += 1
+        problem = cls(sentence[:], lang=lang, target=target, grammar=grammar,
+                      verbosity=verbosity, report=report, **options)
+        if None in key[4]:
+            # The constructor loaded the languages, so the key doesn't say which
+            # ones the problem was made with or the analyses it got
+            return problem
+        problem.save_initial()
+        cls.compiled[key] = problem
+        while len(cls.compiled) > cls.max_compiled:
+            cls.compiled.popitem(last=False)
+        return problem.initial_copy()
+
+    @staticmethod
+    def compile_key(sentence, lang, target, grammar, options):
+        """Key for the compiled problem cache, or None if the problem shouldn't be
+        cached (the lexicon is to be reloaded, or principles aren't instantiated).
+        The key includes the identities of the languages and their lexicons,
+        so that a problem isn't reused after they're reloaded, and what
+        morphological analysis would give the problem for each word (which
+        depends on what the language has cached), so that it isn't reused
+        when that changes."""
+        if options.get('reload') or not options.get('create_princs', True):
+            return None
+        if isinstance(sentence, str):
+            sentence = sentence.split()
+        if not isinstance(target, (list, tuple)):
+            target = [target] if target else []
+        languages = [lang] + list(target)
+        if options.get('load_semantics', True):
+            languages.append('sem')
+        # Languages that aren't loaded yet are None
+        languages = [Language.LANGUAGES.get(l) if isinstance(l, str) else l for l in languages]
+        loaded = tuple((id(l), id(l.lexicon)) if l else None for l in languages)
+        language = languages[0]
+        analyses = None
+        if language and language.morph_processing:
+            preproc = language.preproc
+            analyses = repr([language.anal(word, preproc(word) if preproc else word,
+                                           cache=False, verbose=False)
+                             for word in sentence])
+        if not isinstance(lang, str):
+            lang = lang.abbrev
+        target = tuple(t if isinstance(t, str) else t.abbrev for t in target)
+        # Lists and dicts in the options (pre_arcs, dims, etc.) are represented
+        # by their reprs
+        return (lang, target, grammar, tuple(sentence), loaded, analyses,
+                repr(sorted(options.items())))
+
+    @classmethod
+    def clear_compiled(cls):
+        """Empty the compiled problem cache and reset its counts."""
+        cls.compiled.clear()
+        cls.compile_hits = cls.compile_misses = 0
+
+    def save_initial(self):
+        """Save the initial domains of the variables and the initially undetermined
+        variables so that copies of the problem can be made (initial_copy())."""
+        root = self.dstore
+        self.initial_domains = [XDG.copy_domains(var.dstores.get(root, {}))
+                                for var in self.varsL]
+        self.initial_undetermined = root.undetermined[:]
+        # Copies made so far: [(weak reference to copy, its root dstore)]
+        self.copies = []
+
+    def initial_copy(self):
+        """A new problem in the state saved with save_initial(). It shares this
+        problem's nodes, variables, and propagators, but has its own root dstore
+        with the initial domains, so the two can be solved separately. The
+        domains in the dstores of copies that no longer exist are deleted."""
+        self.forget_copies()
+        problem = copy.copy(self)
+        root = DStore(self.name)
+        for var, domains in zip(self.varsL, self.initial_domains):
+            var.dstores[root] = XDG.copy_domains(domains)
+        root.undetermined = self.initial_undetermined[:]
+        problem.dstore = root
+        problem.initial = CSpace(name='', dstore=root, propagators=self.propagators,
+                                 depth=0, verbosity=0)
+        problem.distributor = copy.copy(self.distributor)
+        problem.distributor.problem = problem
+        problem.distributor.set_heuristics()
+        problem.solver = None
+        problem.solutions = []
+        problem.budget_hit = None
+        problem.partial = None
+        problem.deadline = None
+        problem.copies = []
+        self.copies.append((weakref.ref(problem), root))
+        return problem
+
+    def forget_copies(self):
+        """Delete the variables' domains in the dstores of copies made by
+        initial_copy() that have been garbage collected."""
+        dead = {root for ref, root in self.copies if ref() is None}
+        if not dead:
+            return
+        self.copies = [(ref, root) for ref, root in self.copies if root not in dead]
+        # Root of each dstore
+        roots = {}
+        for var in self.varsL:
+            for dstore in list(var.dstores):
+                if dstore not in roots:
+                    top = dstore
+                    while top.parent:
+                        top = top.parent
+                    roots[dstore] = top
+                if roots[dstore] in dead:
+                    del var.dstores[dstore]
+
+    @staticmethod
+    def copy_domains(domains):
+        """Copy a variable's dict of value and domains for a DStore, copying any
+        mutable sets in it."""
+        return {feature: (value.copy() if isinstance(value, set) else value)
+                for feature, value in domains.items()}
+
     def get_dim_classes(self, language, ign_semantics=False,
                         transfer=True):
         '''Find classes for language dimension abbreviations.'''
@@ -691,7 +882,9 @@ class XDG(CSP):
         form = self.language.gen(root, feats)
 
     def add_variable(self, var):
-        """Add variable to dictionary with its name as key."""
+        """Add variable to dictionary with its name as key, and give it an id."""
+        var.id = len(self.varsL)
+        self.varsL.append(var)
         self.varsD[var.name] = var
         
 #    def remove_variable(self, var):
@@ -989,11 +1182,27 @@ class XDG(CSP):
     def solve(self, tracevar=None, 
               # Different kinds of verbosity
               verbose=True, prop_verbosity=0, dist_verbosity=0, morf_verbosity=0, 
-              search_algo=search.SmartSearch(),
+              # The search; a new SmartSearch if None
+              search_algo=None,
               all_sols=True, timeit=False,
+              # Whether to search with FlatDStores rather than ordinary DStores
+              flat_dstore=False,
+              # Whether to represent int domains as BitSets during search
+              bitsets=False,
+              # Distributor heuristics (names or functions) and seed for random ones
+              var_select=None, val_select=None, seed=None,
+              # Whether to return only the k_best solutions with the lowest penalties
+              optimal=False, k_best=1,
+              # Budget for the search: seconds and megabytes
+              time_limit=None, memory_limit=None,
+              # Whether to ask before looking for another solution when all_sols
+              # is False; if not, only the first solution is returned
+              interactive=True,
               save=True):
         '''Instantiate Solver with self as its problem; return multigraphs as
-        solutions, one at a time.'''
+        solutions, one at a time. If the search uses up its budget (time_limit,
+        memory_limit), the solutions found so far are returned; self.budget_hit is
+        'time' or 'memory' and self.partial is the best incomplete CSpace.'''
 
         # Principles have to have been instantiated, and the propagators need
         # to have been created
@@ -1010,6 +1219,21 @@ class XDG(CSP):
 
         multigraphs = []
 
+        if bitsets:
+            self.encode_domains()
+        # A search keeps its budget and partial results, so each solve() needs its own
+        search_algo = search_algo or search.SmartSearch()
+        if flat_dstore or search_algo.flat:
+            self.flatten_dstore()
+
+        self.distributor.set_heuristics(var_select=var_select, val_select=val_select,
+                                        seed=seed)
+
+        if optimal:
+            search_algo = search.BranchAndBound(cutoff=search_algo.cutoff, k=k_best)
+
+        search_algo.set_budget(time_limit=time_limit, memory_limit=memory_limit)
+
         proceed = True
         solver = Solver(self, search_algo)
 
@@ -1020,6 +1244,7 @@ class XDG(CSP):
             solutions = solver.run(test_verbosity=prop_verbosity or verbose,
                                    expand_verbosity=dist_verbosity or verbose, 
                                    tracevar=tracevar, timeit=timeit)
+            self.record_budget(search_algo)
             return [Multigraph(self, self.arc_dims, self.if_dims, solution.state.dstore,
                                morf_verbosity=morf_verbosity) \
                         for solution in solutions]
@@ -1036,14 +1261,37 @@ class XDG(CSP):
                 if self.report:
                     print('FOUND SOLUTION', multigraph)
                 multigraphs.append(multigraph)
-                if not input('\nSEARCH FOR ANOTHER SOLUTION? [yes/NO] '):
+                if not interactive or not input('\nSEARCH FOR ANOTHER SOLUTION? [yes/NO] '):
                     proceed = False
         except StopIteration:
             if self:
                 print('No more solutions')
+        self.record_budget(search_algo)
 
         return multigraphs
+
+    def record_budget(self, search_algo):
+        '''Record whether the search used up its budget and its best incomplete state.'''
+        self.budget_hit = search_algo.budget_hit
+        self.partial = search_algo.partial.state if search_algo.partial else None
+        if self.budget_hit:
+            print('Search budget ({}) used up for {}'.format(self.budget_hit, self))
         
+    def flatten_dstore(self):
+        '''Replace the initial state with one whose DStore is a FlatDStore holding
+        the current domains of all of the problem's variables.'''
+        if self.dstore.flat:
+            return
+        self.dstore = FlatDStore.from_dstore(self.dstore, self.varsL)
+        self.initial = CSpace(name='', dstore=self.dstore, propagators=self.propagators,
+                              depth=0, verbosity=0)
+
+    def encode_domains(self):
+        '''Replace the sets of ints in the variables' domains in the initial DStore
+        with BitSets.'''
+        for var in self.varsL:
+            var.encode_domains(dstore=self.dstore)
+
     def diff_sols(self, sol_list, maximum=10):
         """Return a list of variables that differ in pairs of solutions from
         those in sol_list. Makes no more than maximum comparisons.
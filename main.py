@@ -34,6 +34,7 @@
 
 __version__ = 2.0
 import l3xdg
+import l3xdg.server
 # Profiling
 import cProfile
 import pstats
@@ -275,26 +276,30 @@ def xdg(sentences, source='en', target=[],
         semantics=True, transfer=False, weaken=None, project=False,
         dims=None, princs=None, grammar='tiny',
         reload=False, flatten=True, all_sols=True, pickle=True,
-        verbosity=0, timeit=False):
+        verbosity=0, timeit=False, cache=False, snapshot=False):
     '''
     reload: whether to recreate the lexicon for the languages
+    cache: whether to reuse compiled problems for sentences seen before
+    snapshot: whether to load lexicons from a compiled snapshot (made the
+      first time)
     '''
     if not isinstance(sentences, list):
         sentences = [sentences]
     if target and not isinstance(target, list):
         target = [target]
-    xdgs = [l3xdg.XDG(sentence, source, target=target,
-                      load_semantics=semantics, reload=reload,
-                      process=process,
-                      pre_arcs=arcs, pre_agrs=agrs,
-                      flatten_lexicon=flatten,
-                      transfer_xlex=transfer,
-                      weaken=weaken, dims=dims, princs=princs,
-                      grammar=grammar, create_princs=create_princs,
-                      project=project, pickle=pickle,
-                      distributor=distributor, 
-                      verbosity=verbosity) \
-                      for sentence in sentences]
+    make = l3xdg.XDG.compile if cache else l3xdg.XDG
+    xdgs = [make(sentence, source, target=target,
+                 load_semantics=semantics, reload=reload,
+                 process=process,
+                 pre_arcs=arcs, pre_agrs=agrs,
+                 flatten_lexicon=flatten,
+                 transfer_xlex=transfer,
+                 weaken=weaken, dims=dims, princs=princs,
+                 grammar=grammar, create_princs=create_princs,
+                 project=project, pickle=pickle, snapshot=snapshot,
+                 distributor=distributor, 
+                 verbosity=verbosity) \
+                 for sentence in sentences]
     if solve and create_princs:
         return [x.solve(all_sols=all_sols, timeit=timeit, verbose=verbosity) for x in xdgs]
     else:
@@ -380,12 +385,13 @@ def trans(sentence, source, target, dims=None, grammar='tiny',
 def chunk(s, language='es',
           project=False, solve=False, dims=None,
           all_sols=False,
-          reload=False, timeit=False, flatten=True, pickle=True):
+          reload=False, timeit=False, flatten=True, pickle=True,
+          cache=False, snapshot=False):
     return xdg(s, source=language,
                grammar='chunk', dims=dims, semantics=False,
                all_sols=all_sols, solve=solve, project=project,
                reload=reload, flatten=flatten, pickle=pickle,
-               timeit=timeit)[0]
+               timeit=timeit, cache=cache, snapshot=snapshot)[0]
 
 def trunk(s, source='es', target='gn',
           all_sols=True, solve=False,
@@ -395,6 +401,28 @@ def trunk(s, source='es', target='gn',
                all_sols=all_sols, solve=solve, 
                project=project, timeit=timeit)[0]
 
+##########################################################################
+##########################################################################
+### To serve parsing and translation requests from worker processes that
+### share the languages loaded once by the server (see l3xdg/server.py).
+###
+### Example:
+###
+### >>> serve('es', ['gn'], workers=16, address='/tmp/l3.sock')
+###
+### and in another process:
+###
+### >>> c = l3xdg.server.XDGClient('/tmp/l3.sock')
+### >>> c.translate('la mujer vio la casa')
+
+def serve(source='es', targets=['gn'], grammar='chunk', workers=16,
+          address=None, cache=False, max_requests=0, snapshot=False):
+    server = l3xdg.server.XDGServer(source, targets, grammar=grammar,
+                                    workers=workers, address=address,
+                                    cache=cache, max_requests=max_requests,
+                                    snapshot=snapshot)
+    server.serve_forever()
+
 ##########################################################################
 ##########################################################################
 ### To load a set of languages that will participate in parsing,
@@ -411,12 +439,13 @@ def trunk(s, source='es', target='gn',
 ###
 
 def load_langs(langs, grammar='tiny', force=True,
-               flatten=True, pickle=True, learn=False):
+               flatten=True, pickle=True, learn=False, snapshot=False):
     return l3xdg.Language.load_langs(langs, grammar=grammar,
                                      force=force,
                                      flatten=flatten,
                                      learn=learn,
-                                     pickle=pickle)
+                                     pickle=pickle,
+                                     snapshot=snapshot)
 
 ##########################################################################
 ##########################################################################
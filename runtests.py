@@ -2,6 +2,10 @@
 
 ## 2011.03.10
 #  -- Added constraint satisfaction tests
+## 2026.10.17
+#  -- Added domain store, search, FST, and language tests
+## 2026.10.18
+#  -- Added server tests
 
 import unittest
 
@@ -11,6 +15,24 @@ from l3xdg.tests.testconstraints import *
 ### Constraint satisfaction tests
 from l3xdg.tests.testcs import *
 
+### Domain store tests
+from l3xdg.tests.testvariable import *
+
+### Search tests
+from l3xdg.tests.testsearch import *
+
+### FST tests
+from l3xdg.tests.testfst import *
+
+### Language tests
+from l3xdg.tests.testlanguage import *
+
+### Server tests
+from l3xdg.tests.testserver import *
+
+### Hiiktuu constraint satisfaction tests
+import hiiktuu.tests.testcs
+
 ### Load and run particular tests
 loader = unittest.defaultTestLoader
 runner = unittest.TextTestRunner(verbosity=1)
@@ -127,6 +149,118 @@ def seqselect_proj():
     suite = loader.loadTestsFromName('l3xdg.tests.testconstraints.TestProjectors.seqselect_set')
     runner.run(suite)
 
+## Domain store tests
+def dstores():
+    print('Running domain store tests')
+    runner.run(loader.loadTestsFromTestCase(TestFlatDStore))
+
+def bitsets():
+    print('Running BitSet tests')
+    runner.run(loader.loadTestsFromTestCase(TestBitSet))
+
+def trails():
+    print('Running trail tests')
+    runner.run(loader.loadTestsFromTestCase(TestTrailDStore))
+
+## Search tests
+def agenda():
+    print('Running propagation agenda tests')
+    runner.run(loader.loadTestsFromTestCase(TestAgenda))
+
+def flat_search():
+    print('Running flat domain store search tests')
+    runner.run(loader.loadTestsFromTestCase(TestFlatSearch))
+
+def bitset_search():
+    print('Running BitSet domain search tests')
+    runner.run(loader.loadTestsFromTestCase(TestBitSetSearch))
+
+def parallel_search():
+    print('Running parallel search tests')
+    runner.run(loader.loadTestsFromTestCase(TestParallelSearch))
+
+def trail_search():
+    print('Running trail search tests')
+    runner.run(loader.loadTestsFromTestCase(TestTrailSearch))
+
+def branch_and_bound():
+    print('Running branch and bound tests')
+    runner.run(loader.loadTestsFromTestCase(TestBranchAndBound))
+
+def budgets():
+    print('Running search budget tests')
+    runner.run(loader.loadTestsFromTestCase(TestBudget))
+
+def compile_cache():
+    print('Running compiled problem cache tests')
+    runner.run(loader.loadTestsFromTestCase(TestCompileCache))
+
+def heuristics():
+    print('Running variable and value selection heuristic tests')
+    runner.run(loader.loadTestsFromTestCase(TestHeuristics))
+
+def hiiktuu_heuristics():
+    print('Running Hiiktuu variable and value selection heuristic tests')
+    runner.run(loader.loadTestsFromName('hiiktuu.tests.testcs.TestHeuristics'))
+
+def hiiktuu_budgets():
+    print('Running Hiiktuu search budget tests')
+    runner.run(loader.loadTestsFromName('hiiktuu.tests.testcs.TestBudget'))
+
+## FST tests
+def binary_fsts():
+    print('Running compiled binary FST tests')
+    runner.run(loader.loadTestsFromTestCase(TestBinaryFST))
+
+def fst_indices():
+    print('Running FST index tests')
+    runner.run(loader.loadTestsFromTestCase(TestFSTIndex))
+
+def minimization():
+    print('Running FST minimization tests')
+    runner.run(loader.loadTestsFromTestCase(TestMinimize))
+
+def compose_cache():
+    print('Running cascade composition cache tests')
+    runner.run(loader.loadTestsFromTestCase(TestComposeCache))
+
+def unify_memo():
+    print('Running FSSet unification memo tests')
+    runner.run(loader.loadTestsFromTestCase(TestUnifyMemo))
+
+## Language tests
+def anal_caches():
+    print('Running analysis cache tests')
+    runner.run(loader.loadTestsFromTestCase(TestAnalCache))
+
+def corpus_analysis():
+    print('Running corpus analysis tests')
+    runner.run(loader.loadTestsFromTestCase(TestAnalyzeCorpus))
+
+def lazy_morphology():
+    print('Running lazy morphology loading tests')
+    runner.run(loader.loadTestsFromTestCase(TestLazyMorphology))
+
+def prefilter():
+    print('Running analysis prefilter tests')
+    runner.run(loader.loadTestsFromTestCase(TestPrefilter))
+
+def artifact_cache():
+    print('Running artifact cache tests')
+    runner.run(loader.loadTestsFromTestCase(TestArtifactCache))
+
+def inst_store():
+    print('Running instantiated lexeme store tests')
+    runner.run(loader.loadTestsFromTestCase(TestInstStore))
+
+def inheritance_cache():
+    print('Running inheritance cache tests')
+    runner.run(loader.loadTestsFromTestCase(TestInheritanceCache))
+
+def lex_snapshots():
+    print('Running lexicon snapshot tests')
+    runner.run(loader.loadTestsFromTestCase(TestLexSnapshot))
+
 ## All parsing tests
 def parse():
     print('Running all parsing tests')
@@ -150,6 +284,10 @@ def parse_qu():
     qu_suite = loader.loadTestsFromName('l3xdg.tests.testcs.ParseTestCase.quechua')
     runner.run(qu_suite)
 
+def server():
+    print('Running server tests')
+    runner.run(loader.loadTestsFromTestCase(TestServer))
+
 def parse_am():
     print('Running parsing tests for Amharic')
     am_suite = loader.loadTestsFromName('l3xdg.tests.testcs.ParseTestCase.amharic')